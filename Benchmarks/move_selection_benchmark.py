@@ -0,0 +1,50 @@
+import random
+import timeit
+
+import chess
+
+from calculation_utils import SortedLinkedList, TopMovesSelector, MoveAndEval
+
+# Compares the intuition move selectors, adding the moves of one node with random evaluations.
+# Run from the repository root: python -m Benchmarks.move_selection_benchmark
+BRANCHING_FACTORS = [30, 40, 50]
+INTUITION_SPREADS = [5, 10]
+REPETITIONS = 2000
+
+
+def _moves_and_evals(branching_factor, randomizer):
+    moves = [chess.Move(square, (square + 8) % 64) for square in range(branching_factor)]
+    return [(move, round(randomizer.uniform(-3, 3), 2)) for move in moves]
+
+
+def select_with_sorted_linked_list(moves_and_evals, intuition_spread, maximizing_side):
+    selector = SortedLinkedList(max_length=intuition_spread, maximizing_side=maximizing_side)
+    for move, evaluation in moves_and_evals:
+        selector.add_move_and_eval(MoveAndEval(move, evaluation))
+    return list(selector.get_moves())
+
+
+def select_with_top_moves_selector(moves_and_evals, intuition_spread, maximizing_side):
+    selector = TopMovesSelector(max_length=intuition_spread, maximizing_side=maximizing_side)
+    for move, evaluation in moves_and_evals:
+        selector.add(move, evaluation)
+    return selector.get_moves()
+
+
+def main():
+    randomizer = random.Random(0)
+    print(f'{"moves":>6} {"spread":>6} {"linked list us":>15} {"heap us":>8} {"speedup":>8}')
+    for branching_factor in BRANCHING_FACTORS:
+        nodes = [_moves_and_evals(branching_factor, randomizer) for _ in range(REPETITIONS)]
+        for intuition_spread in INTUITION_SPREADS:
+            timings = []
+            for select in (select_with_sorted_linked_list, select_with_top_moves_selector):
+                seconds = timeit.timeit(lambda: [select(node, intuition_spread, index % 2 == 0)
+                                                 for index, node in enumerate(nodes)], number=1)
+                timings.append(seconds / REPETITIONS * 1e6)
+            print(f'{branching_factor:>6} {intuition_spread:>6} {timings[0]:>15.1f} {timings[1]:>8.1f} '
+                  f'{timings[0] / timings[1]:>7.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+import argparse
+import os
+import sys
+import time
+
+import chess
+
+from Search.search_board import SearchBoard, perft
+
+# Checks the move making of the search board: the number of move sequences of every depth (perft) from a standard
+# set of positions, counted by playing the moves on a SearchBoard, has to match the counts known from other engines
+# and the counts of python-chess. Run from the repository root: python -m Benchmarks.perft --depth 3
+PERFT_POSITIONS_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                    'data/benchmarks/perft.epd')
+
+
+def read_perft_positions(path=PERFT_POSITIONS_PATH):
+    # id, board and depth -> known number of move sequences, from the D1, D2, ... operations
+    positions = []
+    with open(path) as file:
+        for line in file:
+            if line.strip():
+                board, operations = chess.Board.from_epd(line.strip())
+                counts = {int(name[1:]): count for name, count in operations.items() if name.startswith('D')}
+                positions.append((operations.get('id', board.fen()), board, counts))
+    return positions
+
+
+def timed_perft(board: chess.Board, depth: int):
+    started_at = time.perf_counter()
+    return perft(board, depth), time.perf_counter() - started_at
+
+
+def run_perft(positions, max_depth: int, print_positions=True):
+    # Returns the mismatches
+    mismatches = []
+    for position_id, board, counts in positions:
+        for depth in sorted(depth for depth in counts if depth <= max_depth):
+            search_board_count, search_board_seconds = timed_perft(SearchBoard.from_board(board), depth)
+            python_chess_count, python_chess_seconds = timed_perft(board.copy(), depth)
+            if not search_board_count == python_chess_count == counts[depth]:
+                mismatches.append(f'{position_id} depth {depth}: {search_board_count} with the search board, '
+                                  f'{python_chess_count} with python-chess, {counts[depth]} expected')
+            if print_positions:
+                print(f'{position_id:28} depth {depth} {search_board_count:>9} {search_board_seconds:>8.2f}s, '
+                      f'python-chess {python_chess_count:>9} {python_chess_seconds:>8.2f}s')
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Counts the move sequences of standard positions (perft).')
+    parser.add_argument('--positions', default=PERFT_POSITIONS_PATH, help='EPD file with D1, D2, ... operations')
+    parser.add_argument('--depth', type=int, default=3)
+    arguments = parser.parse_args()
+
+    mismatches = run_perft(read_perft_positions(arguments.positions), arguments.depth)
+    for mismatch in mismatches:
+        print(f'mismatch, {mismatch}')
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
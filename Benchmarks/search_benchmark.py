@@ -0,0 +1,179 @@
+import argparse
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+import chess
+
+from engine import Engine, MinMaxEvaluator
+from Search.search_deadline import SearchDeadline
+from Search.search_statistics import SearchStatistics
+from Search.transposition_table import TranspositionTable
+
+# Searches a fixed set of positions to a fixed depth and reports the nodes, the speed, the time to every depth and
+# the best move of each. The results can be saved as a JSON baseline, and a later run compared with it fails when
+# it searches more nodes or fewer nodes per second than the threshold allows.
+# Run from the repository root: python -m Benchmarks.search_benchmark --depth 4 --save-baseline baseline.json
+POSITIONS_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                              'data/benchmarks/positions.epd')
+PRUNING_SWITCHES = ['USE_NULL_MOVE_PRUNING', 'USE_LATE_MOVE_REDUCTIONS', 'USE_FUTILITY_PRUNING', 'USE_RAZORING']
+
+
+def read_positions(path=POSITIONS_PATH):
+    positions = []
+    with open(path) as file:
+        for line in file:
+            if line.strip():
+                board, operations = chess.Board.from_epd(line.strip())
+                positions.append((operations.get('id', board.fen()), board,
+                                  [move.uci() for move in operations.get('bm', [])]))
+    return positions
+
+
+def benchmark_position(board: chess.Board, depth: int):
+    # Every position is searched with an empty transposition table, so the results don't depend on the order
+    engine = Engine()
+    statistics = SearchStatistics()
+    transposition_table = TranspositionTable(engine.TRANSPOSITION_TABLE_SIZE_MB)
+    time_to_depth, best_move = [], None
+    started_at = time.perf_counter()
+    for completed_depth, best_move, _ in engine.iterate_depths(board, SearchDeadline(None), transposition_table,
+                                                               statistics, engine.create_move_orderer(),
+                                                               max_depth=depth):
+        time_to_depth.append(round(time.perf_counter() - started_at, 4))
+    seconds = time.perf_counter() - started_at
+    nodes = statistics.nodes + statistics.quiescence_nodes
+    return {'nodes': statistics.nodes,
+            'quiescence_nodes': statistics.quiescence_nodes,
+            'evaluations': statistics.evaluations,
+            'seconds': round(seconds, 4),
+            'nodes_per_second': round(nodes / seconds, 1),
+            'evaluations_per_second': round(statistics.evaluations / seconds, 1),
+            'time_to_depth': time_to_depth,
+            'best_move': best_move.uci() if best_move else None}
+
+
+def run_benchmark(positions, depth: int, print_positions=True):
+    results = {'depth': depth, 'positions': {}}
+    for position_id, board, expected_moves in positions:
+        result = benchmark_position(board, depth)
+        result['expected_moves'] = expected_moves
+        results['positions'][position_id] = result
+        if print_positions:
+            print(f'{position_id:28} {result["best_move"] or "-":6} {result["nodes"] + result["quiescence_nodes"]:>9} '
+                  f'nodes {result["seconds"]:>8.2f}s {result["nodes_per_second"]:>9.0f} nodes/s '
+                  f'{result["evaluations_per_second"]:>9.0f} evals/s')
+
+    nodes = sum(result['nodes'] + result['quiescence_nodes'] for result in results['positions'].values())
+    evaluations = sum(result['evaluations'] for result in results['positions'].values())
+    seconds = sum(result['seconds'] for result in results['positions'].values())
+    results['total'] = {'nodes': nodes, 'evaluations': evaluations, 'seconds': round(seconds, 4),
+                        'nodes_per_second': round(nodes / seconds, 1) if seconds else 0.0,
+                        'evaluations_per_second': round(evaluations / seconds, 1) if seconds else 0.0}
+    return results
+
+
+def solved_positions(results):
+    # Positions with a bm operation whose best move was found, a rough measure of the playing strength
+    return sum(result['best_move'] in result['expected_moves'] for result in results['positions'].values())
+
+
+@contextmanager
+def search_switches(switches):
+    saved_switches = {name: getattr(MinMaxEvaluator, name) for name in switches}
+    for name, value in switches.items():
+        setattr(MinMaxEvaluator, name, value)
+    try:
+        yield
+    finally:
+        for name, value in saved_switches.items():
+            setattr(MinMaxEvaluator, name, value)
+
+
+def compare_pruning(positions, depth: int):
+    # The benchmark with the default forward pruning, with each technique switched the other way in turn, and
+    # without any. Playing strength in games is measured by tournament.py, e.g. with
+    # {"search": {"USE_NULL_MOVE_PRUNING": false}}.
+    configurations = {'default': {}}
+    configurations.update({f'{"without" if getattr(MinMaxEvaluator, name) else "with"} {name}':
+                           {name: not getattr(MinMaxEvaluator, name)} for name in PRUNING_SWITCHES})
+    configurations['no pruning'] = {name: False for name in PRUNING_SWITCHES}
+    expected = sum(bool(expected_moves) for _, _, expected_moves in positions)
+    comparison = {}
+    for configuration, switches in configurations.items():
+        with search_switches(switches):
+            results = run_benchmark(positions, depth, print_positions=False)
+        comparison[configuration] = dict(results['total'], solved=solved_positions(results))
+        total = comparison[configuration]
+        print(f'{configuration:36} {total["nodes"]:>9} nodes {total["seconds"]:>8.2f}s '
+              f'{total["nodes_per_second"]:>9.0f} nodes/s {total["solved"]}/{expected} best moves found')
+    return comparison
+
+
+def compare_with_baseline(results, baseline, threshold: float):
+    # Regressions beyond the threshold, e.g. 0.1 for 10%. Node counts don't depend on the machine, nodes per
+    # second are only comparable between runs on the same machine.
+    if results['depth'] != baseline['depth']:
+        return [f'the baseline was searched to depth {baseline["depth"]}, not {results["depth"]}']
+    regressions = []
+    for position_id, result in results['positions'].items():
+        baseline_result = baseline['positions'].get(position_id)
+        if baseline_result is None:
+            continue
+        nodes = result['nodes'] + result['quiescence_nodes']
+        baseline_nodes = baseline_result['nodes'] + baseline_result['quiescence_nodes']
+        if nodes > baseline_nodes * (1 + threshold):
+            regressions.append(f'{position_id}: {nodes} nodes, {baseline_nodes} in the baseline')
+    nodes_per_second, baseline_nodes_per_second = (results['total']['nodes_per_second'],
+                                                   baseline['total']['nodes_per_second'])
+    if nodes_per_second < baseline_nodes_per_second * (1 - threshold):
+        regressions.append(f'{nodes_per_second:.0f} nodes/s, {baseline_nodes_per_second:.0f} in the baseline')
+    return regressions
+
+
+def best_move_changes(results, baseline):
+    return [f'{position_id}: {result["best_move"]}, {baseline["positions"][position_id]["best_move"]} in the baseline'
+            for position_id, result in results['positions'].items()
+            if position_id in baseline['positions'] and
+            result['best_move'] != baseline['positions'][position_id]['best_move']]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmarks the search on a fixed set of positions.')
+    parser.add_argument('--positions', default=POSITIONS_PATH, help='EPD file, with optional id and bm operations')
+    parser.add_argument('--depth', type=int, default=4)
+    parser.add_argument('--save-baseline', help='writes the results to this JSON file')
+    parser.add_argument('--baseline', help='JSON results of an earlier run to compare with')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help='fails when the nodes grow or the nodes per second drop by more than this fraction')
+    parser.add_argument('--pruning', action='store_true',
+                        help='compares the search with and without each forward pruning technique')
+    arguments = parser.parse_args()
+
+    if arguments.pruning:
+        compare_pruning(read_positions(arguments.positions), arguments.depth)
+        return
+
+    results = run_benchmark(read_positions(arguments.positions), arguments.depth)
+    total = results['total']
+    print(f'total {total["nodes"]} nodes {total["seconds"]:.2f}s {total["nodes_per_second"]:.0f} nodes/s '
+          f'{total["evaluations_per_second"]:.0f} evals/s')
+    if arguments.save_baseline:
+        with open(arguments.save_baseline, 'w') as file:
+            json.dump(results, file, indent=2)
+    if arguments.baseline:
+        with open(arguments.baseline) as file:
+            baseline = json.load(file)
+        for change in best_move_changes(results, baseline):
+            print(f'best move changed, {change}')
+        regressions = compare_with_baseline(results, baseline, arguments.threshold)
+        for regression in regressions:
+            print(f'regression, {regression}')
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,178 @@
+import argparse
+import collections
+import heapq
+import io
+import itertools
+import multiprocessing
+import os
+import struct
+import tempfile
+
+import chess
+import chess.pgn
+from chess.polyglot import zobrist_hash
+
+# Compiles PGN game databases into a polyglot opening book. The games are read as a stream and parsed by a process
+# pool. The (position key, move) counts are kept in memory only up to a limit, then spilled to disk as a sorted run,
+# and the runs are merged into the book at the end. So the memory use does not grow with the size of the database.
+POLYGLOT_ENTRY = struct.Struct('>QHHI')  # key, move, weight, learn
+RUN_RECORD = struct.Struct('>QHQ')  # key, move, count
+MAX_WEIGHT = 0xFFFF
+
+BookFilters = collections.namedtuple('BookFilters', ['max_ply', 'min_rating', 'color'])
+CompilationReport = collections.namedtuple('CompilationReport', ['games', 'used_games', 'positions', 'entries'])
+
+
+def encode_book_move(board: chess.Board, move: chess.Move):
+    # Polyglot writes castling as the king taking its own rook
+    to_square = move.to_square
+    if board.is_castling(move):
+        rook_file = 7 if board.is_kingside_castling(move) else 0
+        to_square = chess.square(rook_file, chess.square_rank(move.from_square))
+    promotion_part = move.promotion - 1 if move.promotion else 0
+    return to_square | (move.from_square << 6) | (promotion_part << 12)
+
+
+def split_games(lines):
+    # Yields the text of every game, without parsing it. A game starts at a header line which follows movetext.
+    game_lines, in_movetext = [], False
+    for line in lines:
+        if line.startswith('[') and in_movetext:
+            yield ''.join(game_lines)
+            game_lines, in_movetext = [], False
+        elif line.strip() and not line.startswith('['):
+            in_movetext = True
+        game_lines.append(line)
+    if in_movetext:
+        yield ''.join(game_lines)
+
+
+def read_game_texts(pgn_paths):
+    for pgn_path in pgn_paths:
+        with open(pgn_path, encoding='utf-8', errors='replace') as pgn_file:
+            yield from split_games(pgn_file)
+
+
+def is_rated_enough(headers, min_rating):
+    if min_rating is None:
+        return True
+    try:
+        return min(int(headers.get('WhiteElo', '')), int(headers.get('BlackElo', ''))) >= min_rating
+    except ValueError:  # unrated players
+        return False
+
+
+def count_game_moves(game_texts, filters: BookFilters):
+    # Worker: parses games and counts every (position key, book move) pair of the moves which pass the filters
+    counts = collections.Counter()
+    used_games = 0
+    for game_text in game_texts:
+        game = chess.pgn.read_game(io.StringIO(game_text))
+        if game is None or game.errors or not is_rated_enough(game.headers, filters.min_rating):
+            continue
+        used_games += 1
+        board = game.board()
+        for move in itertools.islice(game.mainline_moves(), filters.max_ply):
+            if filters.color is None or board.turn == filters.color:
+                counts[(zobrist_hash(board), encode_book_move(board, move))] += 1
+            board.push(move)
+    return len(game_texts), used_games, counts
+
+
+def write_run(counts, run_directory, run_index):
+    run_path = os.path.join(run_directory, f'run_{run_index}.bin')
+    with open(run_path, 'wb') as run_file:
+        for (key, move), count in sorted(counts.items()):
+            run_file.write(RUN_RECORD.pack(key, move, count))
+    return run_path
+
+
+def read_run(run_path):
+    with open(run_path, 'rb') as run_file:
+        while record := run_file.read(RUN_RECORD.size):
+            yield RUN_RECORD.unpack(record)
+
+
+def merge_runs(run_paths):
+    # (key, move, count) in key and move order, the counts of all the runs summed up
+    merged_records = heapq.merge(*[read_run(run_path) for run_path in run_paths])
+    for (key, move), records in itertools.groupby(merged_records, key=lambda record: record[:2]):
+        yield key, move, sum(record[2] for record in records)
+
+
+def book_entries(counted_moves, min_frequency):
+    # Polyglot entries of the moves played at least min_frequency times. The weight is the move count, scaled down
+    # when a position has a move more frequent than a weight can hold.
+    for key, moves in itertools.groupby(counted_moves, key=lambda counted_move: counted_move[0]):
+        moves = [(move, count) for _, move, count in moves if count >= min_frequency]
+        if not moves:
+            continue
+        max_count = max(count for _, count in moves)
+        for move, count in sorted(moves, key=lambda move_and_count: -move_and_count[1]):
+            weight = count if max_count <= MAX_WEIGHT else max(1, count * MAX_WEIGHT // max_count)
+            yield key, move, weight
+
+
+def compile_book(pgn_paths, book_path, max_ply=20, min_frequency=1, min_rating=None, color=None,
+                 workers=multiprocessing.cpu_count(), games_per_chunk=200, max_counts_in_memory=1_000_000):
+    filters = BookFilters(max_ply, min_rating, color)
+    counts = collections.Counter()
+    games = used_games = positions = entries = 0
+    with tempfile.TemporaryDirectory() as run_directory, multiprocessing.Pool(workers) as pool:
+        run_paths = []
+
+        def add_chunk_counts(chunk_result):
+            nonlocal games, used_games, positions
+            chunk_games, chunk_used_games, chunk_counts = chunk_result
+            games += chunk_games
+            used_games += chunk_used_games
+            positions += sum(chunk_counts.values())
+            counts.update(chunk_counts)
+            if len(counts) >= max_counts_in_memory:
+                run_paths.append(write_run(counts, run_directory, len(run_paths)))
+                counts.clear()
+
+        # Only a few chunks per worker are read ahead, so a large database is never in memory
+        pending_chunks = collections.deque()
+        game_texts = read_game_texts(pgn_paths)
+        while chunk := list(itertools.islice(game_texts, games_per_chunk)):
+            pending_chunks.append(pool.apply_async(count_game_moves, (chunk, filters)))
+            if len(pending_chunks) > 2 * workers:
+                add_chunk_counts(pending_chunks.popleft().get())
+        while pending_chunks:
+            add_chunk_counts(pending_chunks.popleft().get())
+        if counts:
+            run_paths.append(write_run(counts, run_directory, len(run_paths)))
+            counts.clear()
+
+        with open(book_path, 'wb') as book_file:
+            for key, move, weight in book_entries(merge_runs(run_paths), min_frequency):
+                book_file.write(POLYGLOT_ENTRY.pack(key, move, weight, 0))
+                entries += 1
+    return CompilationReport(games, used_games, positions, entries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compiles PGN files into a polyglot opening book.')
+    parser.add_argument('pgn', nargs='+', help='PGN files with the games')
+    parser.add_argument('--book', required=True, help='the polyglot book to write')
+    parser.add_argument('--max-ply', type=int, default=20, help='only the moves of the first plies are kept')
+    parser.add_argument('--min-frequency', type=int, default=1, help='moves played fewer times are left out')
+    parser.add_argument('--min-rating', type=int, help='games with a player rated lower are left out')
+    parser.add_argument('--color', choices=['white', 'black'], help='only the moves of this side, for a repertoire')
+    parser.add_argument('--workers', type=int, default=multiprocessing.cpu_count())
+    parser.add_argument('--games-per-chunk', type=int, default=200)
+    parser.add_argument('--max-counts-in-memory', type=int, default=1_000_000,
+                        help='counted moves kept in memory before they are spilled to disk')
+    arguments = parser.parse_args()
+
+    color = None if arguments.color is None else arguments.color == 'white'
+    report = compile_book(arguments.pgn, arguments.book, arguments.max_ply, arguments.min_frequency,
+                          arguments.min_rating, color, arguments.workers, arguments.games_per_chunk,
+                          arguments.max_counts_in_memory)
+    print(f'{report.games} games read, {report.used_games} used, {report.positions} moves counted, '
+          f'{report.entries} book entries written to {arguments.book}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+import functools
+import random
+from multiprocessing import shared_memory
+
+import chess
+import numpy as np
+from chess.polyglot import Entry, zobrist_hash
+
+POLYGLOT_ENTRY = np.dtype([('key', '>u8'), ('raw_move', '>u2'), ('weight', '>u2'), ('learn', '>u4')])
+
+
+def decode_book_move(board: chess.Board, raw_move: int):
+    to_square = raw_move & 0x3f
+    from_square = (raw_move >> 6) & 0x3f
+    promotion_part = (raw_move >> 12) & 0x7
+    move = chess.Move(from_square, to_square, promotion_part + 1 if promotion_part else None)
+    # Polyglot writes castling as the king taking its own rook
+    if board.kings & chess.BB_SQUARES[from_square] and board.rooks & board.occupied_co[board.turn] & \
+            chess.BB_SQUARES[to_square]:
+        king_to_file = 6 if chess.square_file(to_square) > chess.square_file(from_square) else 2
+        move = chess.Move(from_square, chess.square(king_to_file, chess.square_rank(from_square)))
+    return move
+
+
+class OpeningBookIndex:
+    # Polyglot books loaded once into NumPy arrays sorted by Zobrist key, so a probe is two binary searches in
+    # memory instead of a binary search over the book file. The arrays are read-only and can be put in shared
+    # memory, so worker processes attach to one copy of the book instead of loading their own.
+    def __init__(self, keys: np.ndarray, raw_moves: np.ndarray, weights: np.ndarray, learns: np.ndarray,
+                 shared_book: shared_memory.SharedMemory | None = None):
+        self.keys = keys
+        self.raw_moves = raw_moves
+        self.weights = weights
+        self.learns = learns
+        self.shared_book = shared_book
+        for array in (keys, raw_moves, weights, learns):
+            array.flags.writeable = False
+
+    @classmethod
+    def from_files(cls, *paths: str):
+        entries = np.concatenate([np.fromfile(path, dtype=POLYGLOT_ENTRY) for path in paths])
+        entries = entries[np.argsort(entries['key'], kind='stable')]
+        return cls(entries['key'].astype(np.uint64), entries['raw_move'].astype(np.uint16),
+                   entries['weight'].astype(np.uint16), entries['learn'].astype(np.uint32))
+
+    @staticmethod
+    def _shared_layout(size: int):
+        # Offsets of keys, learns, raw moves and weights. The widest arrays go first, so all of them are aligned.
+        return 0, 8 * size, 12 * size, 14 * size, 16 * size
+
+    @classmethod
+    def attach(cls, name: str, size: int):
+        # Attaches to a book shared by another process
+        shared_book = shared_memory.SharedMemory(name=name)
+        return cls(*cls._shared_arrays(shared_book, size), shared_book)
+
+    @classmethod
+    def _shared_arrays(cls, shared_book: shared_memory.SharedMemory, size: int):
+        keys_at, learns_at, raw_moves_at, weights_at, _ = cls._shared_layout(size)
+        return (np.ndarray(size, np.uint64, shared_book.buf, keys_at),
+                np.ndarray(size, np.uint16, shared_book.buf, raw_moves_at),
+                np.ndarray(size, np.uint16, shared_book.buf, weights_at),
+                np.ndarray(size, np.uint32, shared_book.buf, learns_at))
+
+    def share(self):
+        # A copy of the book in shared memory, which other processes attach to by its name and size
+        shared_book = shared_memory.SharedMemory(create=True, size=max(1, self._shared_layout(len(self))[-1]))
+        arrays = self._shared_arrays(shared_book, len(self))
+        for shared_array, array in zip(arrays, (self.keys, self.raw_moves, self.weights, self.learns)):
+            shared_array[:] = array
+        return OpeningBookIndex(*arrays, shared_book)
+
+    @property
+    def name(self):
+        return self.shared_book.name if self.shared_book else None
+
+    def __len__(self):
+        return len(self.keys)
+
+    def find_all(self, board: chess.Board, minimum_weight=1):
+        # Legal book moves of the position, in the book order
+        key = np.uint64(zobrist_hash(board))
+        first = int(np.searchsorted(self.keys, key, 'left'))
+        last = int(np.searchsorted(self.keys, key, 'right'))
+        entries = []
+        for raw_move, weight, learn in zip(self.raw_moves[first:last].tolist(), self.weights[first:last].tolist(),
+                                           self.learns[first:last].tolist()):
+            if weight < minimum_weight:
+                continue
+            move = decode_book_move(board, raw_move)
+            if board.is_legal(move):
+                entries.append(Entry(int(key), raw_move, weight, learn, move))
+        return entries
+
+    def get(self, board: chess.Board, default=None, minimum_weight=1):
+        # The entry with the highest weight, the first of them on a tie
+        return max(self.find_all(board, minimum_weight), key=lambda entry: entry.weight, default=default)
+
+    def choice(self, board: chess.Board, randomizer: random.Random | None = None):
+        # A random entry, each as likely as its weight. Raises IndexError when the position is not in the book,
+        # like MemoryMappedReader.choice.
+        entries = self.find_all(board)
+        if not entries:
+            raise IndexError()
+        return (randomizer or random).choices(entries, weights=[entry.weight for entry in entries])[0]
+
+    def close(self):
+        # The arrays are views of the shared memory, which can't be closed while they exist
+        if self.shared_book is not None:
+            self.keys = self.raw_moves = self.weights = self.learns = None
+            self.shared_book.close()
+
+    def unlink(self):
+        if self.shared_book is not None:
+            self.shared_book.unlink()
+
+
+@functools.lru_cache(maxsize=None)
+def load_opening_book(*paths: str):
+    # Every book is loaded only once per process
+    return OpeningBookIndex.from_files(*paths)
@@ -0,0 +1,13 @@
+import os
+
+# The repertoires of data/openings, found from any working directory
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'openings')
+WHITE_REPERTOIRE = os.path.join(DATA_DIR, 'white_repertoire.bin')
+BLACK_REPERTOIRE = os.path.join(DATA_DIR, 'black_repertoire.bin')
+
+
+def load_opening_books(*paths: str):
+    # One book per path, the repertoires by default. opening_book_index needs numpy, so it is imported only here,
+    # when the books are used.
+    from OpeningBooks.opening_book_index import load_opening_book
+    return [load_opening_book(path) for path in paths or (WHITE_REPERTOIRE, BLACK_REPERTOIRE)]
@@ -0,0 +1,52 @@
+import numpy as np
+import chess
+
+from PositionEvaluation.piece_square_tables import piece_square_tables, recompile_if_weights_changed
+from PositionEvaluation.terminal_detection import has_safe_king_move, terminal_evaluation
+
+# Planes of the packed bitboards: white pawns, knights, ..., kings, then the same for black
+PLANES = [(color, piece_type) for color in (chess.WHITE, chess.BLACK) for piece_type in chess.PIECE_TYPES]
+
+
+def weight_tables():
+    # (12, 64) weights, built from the compiled tables, so they follow any recompilation of the weights
+    return np.array([piece_square_tables[color][piece_type] for color, piece_type in PLANES], dtype=np.float64)
+
+
+def byte_weight_tables(weights: np.ndarray):
+    # The dot product of a plane with its 64 weights is split into its 8 bytes: (96, 256) tables holding the summed
+    # weights of the squares set in every possible byte value, so a position costs 96 lookups instead of 768 products
+    bits_of_byte_values = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1, bitorder='little')
+    return weights.reshape(len(PLANES) * 8, 8) @ bits_of_byte_values.T.astype(np.float64)
+
+
+def boards_to_bitboards(boards):
+    # (N, 12) packed uint64 bitboards. Only the raw board masks are read in Python, splitting them by color is vectorised.
+    raw_bitboards = np.array([(board.pawns, board.knights, board.bishops, board.rooks, board.queens, board.kings,
+                               board.occupied_co[chess.WHITE], board.occupied_co[chess.BLACK]) for board in boards],
+                             dtype='<u8').reshape(len(boards), 8)
+    pieces_by_type = raw_bitboards[:, :6]
+    return np.concatenate((pieces_by_type & raw_bitboards[:, 6:7], pieces_by_type & raw_bitboards[:, 7:8]), axis=1)
+
+
+def evaluate_bitboards(bitboards: np.ndarray):
+    # Material and every evaluation_functions_mapping term for (N, 12) packed bitboards, byte i of a bitboard
+    # holding squares 8 * i to 8 * i + 7
+    as_bytes = bitboards.astype('<u8').view(np.uint8).reshape(len(bitboards), len(PLANES) * 8)
+    tables = byte_weight_tables(weight_tables())
+    return tables[np.arange(len(PLANES) * 8), as_bytes].sum(axis=1)
+
+
+def evaluate_positions_batch(boards, game_state_evaluation=True):
+    boards = list(boards)
+    if not boards:
+        return np.empty(0, dtype=np.float64)
+    recompile_if_weights_changed()
+    evaluations = evaluate_bitboards(boards_to_bitboards(boards))
+    if game_state_evaluation:
+        # The same results as board.is_game_over() and PositionEvaluator.finished_game_evaluation, several times cheaper
+        for index, board in enumerate(boards):
+            game_over_eval = terminal_evaluation(board, has_safe_king_move(board) or any(board.generate_legal_moves()))
+            if game_over_eval is not None:
+                evaluations[index] = game_over_eval
+    return evaluations
@@ -0,0 +1,51 @@
+from array import array
+
+import PositionEvaluation.piece_square_tables as piece_square_tables
+from PositionEvaluation.piece_square_tables import recompile_if_weights_changed
+
+
+class EvaluationCache:
+    # Static evaluations by zobrist key, in two arrays: a position replaces whatever was in its slot. The arrays are
+    # allocated by the first store, so an engine whose evaluations never go through the cache, e.g. with the
+    # incremental evaluation, doesn't pay for them. The evaluation of a position depends on the weights only, so the
+    # cache is kept between searches and cleared when the weights have changed.
+    ENTRY_SIZE_IN_BYTES = 16  # an unsigned 64 bit key and a double
+
+    def __init__(self, memory_limit_mb: float = 4):
+        self.size = max(1, int(memory_limit_mb * 1024 * 1024) // self.ENTRY_SIZE_IN_BYTES)
+        self.keys = array('Q')  # 0 is an empty slot
+        self.evaluations = array('d')
+        self.hits = 0
+        self.misses = 0
+        self.weights = piece_square_tables.compiled_weights
+
+    def clear(self):
+        self.keys = array('Q')
+        self.evaluations = array('d')
+        self.hits = 0
+        self.misses = 0
+
+    def check_weights(self):
+        # Called before every search, as the weights may be changed between moves, e.g. by tournament.py. The tables
+        # are compiled again from the new weights, and the evaluations of the old ones are dropped.
+        recompile_if_weights_changed()
+        if piece_square_tables.compiled_weights != self.weights:
+            self.weights = piece_square_tables.compiled_weights
+            self.clear()
+
+    def get(self, key: int):
+        keys = self.keys
+        index = key % self.size
+        if keys and keys[index] == key:
+            self.hits += 1
+            return self.evaluations[index]
+        self.misses += 1
+        return None
+
+    def store(self, key: int, evaluation: float):
+        if not self.keys:
+            self.keys = array('Q', [0]) * self.size
+            self.evaluations = array('d', [0.0]) * self.size
+        index = key % self.size
+        self.keys[index] = key
+        self.evaluations[index] = evaluation
@@ -0,0 +1,70 @@
+import functools
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+from PositionEvaluation.evaluation_functions_mappings import evaluation_functions_mapping
+from PositionEvaluation.position_evaluator import PositionEvaluator
+
+# Switched off on the engine given to timed_evaluation_terms, they evaluate without the terms
+ENGINE_SWITCHES_OFF_WHILE_TIMED = ('USE_INCREMENTAL_EVALUATION', 'USE_EVALUATION_CACHE')
+
+
+class EvaluationTermTimings:
+    def __init__(self):
+        self.calls = defaultdict(int)
+        self.seconds = defaultdict(float)
+        self.evaluations = 0  # positions evaluated by the terms
+
+    def timed(self, name, eval_func):
+        @functools.wraps(eval_func)
+        def timed_eval_func(*args, **kwargs):
+            started_at = time.perf_counter()
+            try:
+                return eval_func(*args, **kwargs)
+            finally:
+                self.seconds[name] += time.perf_counter() - started_at
+                self.calls[name] += 1
+        return timed_eval_func
+
+    def counted(self, static_evaluation):
+        @functools.wraps(static_evaluation)
+        def counted_static_evaluation(*args, **kwargs):
+            self.evaluations += 1
+            return static_evaluation(*args, **kwargs)
+        return counted_static_evaluation
+
+    def summary(self):
+        return '\n'.join([f'{self.evaluations} positions evaluated'] +
+                         [f'{name}: {self.calls[name]} calls {self.seconds[name]:.4f}s'
+                          for name in sorted(self.seconds, key=self.seconds.get, reverse=True)])
+
+
+@contextmanager
+def timed_evaluation_terms(engine=None):
+    # Times every term of evaluation_functions_mapping while the context is open. The terms are wrapped only
+    # inside it, so evaluation costs nothing extra otherwise. The bitboard evaluation and the move deltas of the
+    # intuition never call the terms, so they are switched off meanwhile, and so are the incremental evaluation and
+    # the evaluation cache of the engine given, so every position its searches evaluate is evaluated piece by piece.
+    # The search is slower for it.
+    timings = EvaluationTermTimings()
+    original_eval_funcs = dict(evaluation_functions_mapping)
+    original_static_evaluation = PositionEvaluator.static_evaluation
+    switches = [(PositionEvaluator, 'USE_BITBOARD_EVALUATION')] + \
+        [(engine, name) for name in ENGINE_SWITCHES_OFF_WHILE_TIMED if engine is not None]
+    original_switches = [(owner, name, vars(owner).get(name)) for owner, name in switches]
+    for owner, name, _ in original_switches:
+        setattr(owner, name, False)
+    PositionEvaluator.static_evaluation = timings.counted(original_static_evaluation)
+    for name, eval_func in original_eval_funcs.items():
+        evaluation_functions_mapping[name] = timings.timed(name, eval_func)
+    try:
+        yield timings
+    finally:
+        evaluation_functions_mapping.update(original_eval_funcs)
+        PositionEvaluator.static_evaluation = original_static_evaluation
+        for owner, name, value in original_switches:
+            if value is None:  # the engine used the class setting
+                delattr(owner, name)
+            else:
+                setattr(owner, name, value)
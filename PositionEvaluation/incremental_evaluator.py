@@ -0,0 +1,70 @@
+from PositionEvaluation.piece_square_tables import piece_square_tables
+from PositionEvaluation.position_evaluator import PositionEvaluator
+from PositionEvaluation.terminal_detection import terminal_evaluation
+import chess
+
+
+def piece_square_evaluation(piece: chess.Piece, square: chess.Square):
+    # What a single piece on a single square adds to the static evaluation
+    return piece_square_tables[piece.color][piece.piece_type][square]
+
+
+class IncrementalEvaluator:
+    # Follows board.push/board.pop inside the search and updates the static evaluation from the squares
+    # the move changes, so the leaves don't have to evaluate every piece again.
+    def __init__(self, board: chess.Board):
+        self.static_eval = PositionEvaluator().evaluate_position(board, game_state_evaluation=False)
+        self.eval_stack = []
+
+    def push(self, board: chess.Board, move: chess.Move):
+        self.eval_stack.append(self.static_eval)
+        self.static_eval += self.move_delta(board, move)
+        board.push(move)
+
+    def pop(self, board: chess.Board):
+        move = board.pop()
+        self.static_eval = self.eval_stack.pop()
+        return move
+
+    def evaluate(self, board: chess.Board):
+        game_over_eval = terminal_evaluation(board, any(board.generate_legal_moves()))
+        if game_over_eval is not None:
+            return game_over_eval
+        return self.static_eval
+
+    @staticmethod
+    def move_delta(board: chess.Board, move: chess.Move):
+        # Must be called before the move is pushed
+        if not move:  # null move
+            return 0
+
+        piece = board.piece_at(move.from_square)
+        delta = -piece_square_evaluation(piece, move.from_square)
+
+        if board.is_castling(move):
+            rank = chess.square_rank(move.from_square)
+            kingside = board.is_kingside_castling(move)
+            rook = chess.Piece(chess.ROOK, piece.color)
+            if board.piece_at(move.to_square) == rook:  # castling written as king takes rook
+                rook_from_square = move.to_square
+            else:
+                rook_from_square = chess.square(7 if kingside else 0, rank)
+            king_to_square = chess.square(6 if kingside else 2, rank)
+            rook_to_square = chess.square(5 if kingside else 3, rank)
+            delta += piece_square_evaluation(piece, king_to_square)
+            delta += piece_square_evaluation(rook, rook_to_square) - piece_square_evaluation(rook, rook_from_square)
+            return delta
+
+        if move.promotion:
+            delta += piece_square_evaluation(chess.Piece(move.promotion, piece.color), move.to_square)
+        else:
+            delta += piece_square_evaluation(piece, move.to_square)
+
+        if board.is_en_passant(move):
+            captured_square = chess.square(chess.square_file(move.to_square), chess.square_rank(move.from_square))
+            delta -= piece_square_evaluation(chess.Piece(chess.PAWN, not piece.color), captured_square)
+        else:
+            captured_piece = board.piece_at(move.to_square)
+            if captured_piece:
+                delta -= piece_square_evaluation(captured_piece, move.to_square)
+        return delta
@@ -0,0 +1,103 @@
+from PositionEvaluation.evaluation_functions_mappings import evaluation_functions_mapping
+from PositionEvaluation.evaluation_functions import get_material_evaluation
+import definitions_and_factor_weights
+import chess
+import copy
+
+# The per piece evaluation functions depend only on the piece and its square, so they are compiled once into
+# tables indexed as table[color][piece_type][square]. The tables are filled in place, so they can be imported.
+positional_piece_square_tables = [[None] * 7, [None] * 7]  # evaluation_functions_mapping terms only
+piece_square_tables = [[None] * 7, [None] * 7]  # material included
+
+# (color, piece_type, squares mask, weight). piece_type None stands for all the pieces of the color.
+bitboard_terms = []
+
+# The weights and square lists of definitions_and_factor_weights the tables are compiled from, and their values at
+# the last compilation
+WEIGHT_NAMES = ('piece_values_dict', 'positional_values_dict', 'pawn_at_rank', 'close_central_squares',
+                'broad_central_squares')
+compiled_weights = None
+
+
+def _function_table(eval_func, piece_type: chess.PieceType, color: chess.Color):
+    piece = chess.Piece(piece_type, color)
+    return [eval_func(piece, square) for square in chess.SQUARES]
+
+
+def _masks_by_value(table):
+    masks = {}
+    for square, value in enumerate(table):
+        if value:
+            masks[value] = masks.get(value, 0) | chess.BB_SQUARES[square]
+    return masks
+
+
+def weights_snapshot():
+    return repr([getattr(definitions_and_factor_weights, name) for name in WEIGHT_NAMES])
+
+
+def current_weights():
+    # A copy, e.g. to be sent to another process
+    return {name: copy.deepcopy(getattr(definitions_and_factor_weights, name)) for name in WEIGHT_NAMES}
+
+
+def set_weights(weights):
+    # In place, as the evaluation functions hold the dicts and lists of definitions_and_factor_weights. The tables are
+    # compiled again by the next search.
+    for name, values in weights.items():
+        current_values = getattr(definitions_and_factor_weights, name)
+        if isinstance(current_values, list):
+            current_values[:] = values
+        else:
+            current_values.clear()
+            current_values.update(values)
+
+
+def compile_piece_square_tables():
+    global compiled_weights
+    compiled_weights = weights_snapshot()
+    new_bitboard_terms = []
+    for color in chess.COLORS:
+        for piece_type in chess.PIECE_TYPES:
+            positional_table = [0] * 64
+            for eval_func in evaluation_functions_mapping.values():
+                for square, value in enumerate(_function_table(eval_func, piece_type, color)):
+                    positional_table[square] += value
+            material = get_material_evaluation(chess.Piece(piece_type, color))
+            positional_piece_square_tables[color][piece_type] = positional_table
+            piece_square_tables[color][piece_type] = [material + value for value in positional_table]
+            if material:
+                new_bitboard_terms.append((color, piece_type, chess.BB_ALL, material))
+
+        for eval_func in evaluation_functions_mapping.values():
+            tables = [_function_table(eval_func, piece_type, color) for piece_type in chess.PIECE_TYPES]
+            if all(table == tables[0] for table in tables):  # the term doesn't depend on the piece type
+                new_bitboard_terms += [(color, None, mask, value) for value, mask in _masks_by_value(tables[0]).items()]
+            else:
+                for piece_type, table in zip(chess.PIECE_TYPES, tables):
+                    new_bitboard_terms += [(color, piece_type, mask, value)
+                                           for value, mask in _masks_by_value(table).items()]
+    bitboard_terms[:] = new_bitboard_terms
+
+
+def recompile_if_weights_changed():
+    # The weights may be changed at runtime, e.g. by tournament.py, so every search checks them before it starts.
+    # Returns whether the tables were compiled again.
+    if weights_snapshot() == compiled_weights:
+        return False
+    compile_piece_square_tables()
+    return True
+
+
+def evaluate_from_bitboards(board: chess.Board):
+    # Every term is popcount(pieces & squares) * weight, instead of a function call per piece and term
+    occupied_co = board.occupied_co
+    pieces_by_type = (None, board.pawns, board.knights, board.bishops, board.rooks, board.queens, board.kings)
+    evaluation = 0
+    for color, piece_type, mask, weight in bitboard_terms:
+        pieces = occupied_co[color] if piece_type is None else pieces_by_type[piece_type] & occupied_co[color]
+        evaluation += (pieces & mask).bit_count() * weight
+    return evaluation
+
+
+compile_piece_square_tables()
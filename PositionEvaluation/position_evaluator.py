@@ -1,33 +1,45 @@
 from PositionEvaluation.evaluation_functions_mappings import *
 from PositionEvaluation.evaluation_functions import *
+from PositionEvaluation.piece_square_tables import positional_piece_square_tables, evaluate_from_bitboards
+from PositionEvaluation.terminal_detection import checkmate_evaluation, terminal_evaluation
+from PositionEvaluation.evaluation_cache import EvaluationCache
+from Search.search_board import SearchBoard
 import chess
 
 
 class PositionEvaluator:
+    USE_BITBOARD_EVALUATION = True  # False evaluates piece by piece by the evaluation terms, the moves as well
+
+    def __init__(self, evaluation_cache: EvaluationCache | None = None):
+        # Looked up for the boards of a search only, which keep their zobrist key. Hashing a chess.Board costs more
+        # than evaluating it.
+        self.evaluation_cache = evaluation_cache
+
     def evaluate_position_statically_from_move(self, board: chess.Board, move: chess.Move,
                                                current_board_static_eval: float | None = None):
-        if not current_board_static_eval:
+        if not current_board_static_eval or not self.USE_BITBOARD_EVALUATION:
             board.push(move)
             move_eval = self.evaluate_position(board, game_state_evaluation=True, static_evaluation=True)
             board.pop()
         else:
-            board.push(move)
-
-            if board.is_game_over():
-                move_eval = self.finished_game_evaluation(board)
+            # Only a check can mate and only a capture can leave insufficient material, so the other moves are
+            # not played on the board
+            if board.gives_check(move) or board.is_capture(move):
+                board.push(move)
+                move_eval = terminal_evaluation(board, any(board.generate_legal_moves()))
                 board.pop()
-                return move_eval
-            board.pop()
+                if move_eval is not None:
+                    return move_eval
 
             move_eval = current_board_static_eval
 
             # Correction for moved piece and captured piece only
-            for eval_func in evaluation_functions_mapping:
-                move_eval -= evaluation_functions_mapping[eval_func](board.piece_at(move.from_square), move.from_square)
-                move_eval += evaluation_functions_mapping[eval_func](board.piece_at(move.from_square), move.to_square)
-                captured_piece = board.piece_at(move.to_square)
-                if captured_piece:
-                    move_eval -= evaluation_functions_mapping[eval_func](board.piece_at(move.to_square), move.to_square)
+            moved_piece = board.piece_at(move.from_square)
+            moved_piece_table = positional_piece_square_tables[moved_piece.color][moved_piece.piece_type]
+            move_eval += moved_piece_table[move.to_square] - moved_piece_table[move.from_square]
+            captured_piece = board.piece_at(move.to_square)
+            if captured_piece:
+                move_eval -= positional_piece_square_tables[captured_piece.color][captured_piece.piece_type][move.to_square]
 
         return move_eval
 
@@ -39,26 +51,45 @@ class PositionEvaluator:
 
         evaluation = 0
         evaluation += total_possible_moves_advantage_evaluation(board) if dynamic_evaluation else 0
-        if static_evaluation:
-            for square in chess.SquareSet(board.occupied):
-                piece = board.piece_at(square)
-                evaluation += get_material_evaluation(piece)
-                for eval_func in evaluation_functions_mapping:
-                    evaluation += evaluation_functions_mapping[eval_func](piece, square)
+        if static_evaluation and self.evaluation_cache is not None and isinstance(board, SearchBoard):
+            static_eval = self.evaluation_cache.get(board.zobrist_key)
+            if static_eval is None:
+                static_eval = self.static_evaluation(board)
+                self.evaluation_cache.store(board.zobrist_key, static_eval)
+            evaluation += static_eval
+        elif static_evaluation:
+            evaluation += self.static_evaluation(board)
 
         return evaluation
 
+    def static_evaluation(self, board: chess.Board):
+        if self.USE_BITBOARD_EVALUATION:
+            return evaluate_from_bitboards(board)
+        evaluation = 0
+        for square in chess.SquareSet(board.occupied):
+            piece = board.piece_at(square)
+            evaluation += get_material_evaluation(piece)
+            for eval_func in evaluation_functions_mapping:
+                evaluation += evaluation_functions_mapping[eval_func](piece, square)
+        return evaluation
+
+    @staticmethod
+    def evaluate_positions_batch(boards, game_state_evaluation=True):
+        # Static evaluation of many boards at once with NumPy, imported only when batches are used
+        from PositionEvaluation.batch_evaluation import evaluate_positions_batch
+        return evaluate_positions_batch(boards, game_state_evaluation)
+
     @staticmethod
     def finished_game_evaluation(board: chess.Board):
         # white is True, black is False, None is draw
         winner = board.outcome().winner
         if winner is True:
             if board.is_checkmate():
-                return float(2030 - (len(board.move_stack) // 2))
+                return checkmate_evaluation(board)
             return float(2000)
         if winner is False:
             if board.is_checkmate():
-                return -float(2030 - (len(board.move_stack) // 2))
+                return checkmate_evaluation(board)
             return -float(2000)
         if winner is None:
             return float(0)
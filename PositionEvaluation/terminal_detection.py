@@ -0,0 +1,62 @@
+import chess
+
+# Game over checks for the search, cheaper than board.is_game_over(). Checkmate and stalemate are read from the move
+# list a node generates anyway, the draws which need no move generation are found from the bitboards and the
+# halfmove clock. The results are the same as PositionEvaluator.finished_game_evaluation.
+SEVENTY_FIVE_MOVES_IN_HALFMOVES = 150
+FIVEFOLD_REPETITION_MIN_HALFMOVES = 16  # a position can't occur for the fifth time in fewer reversible halfmoves
+
+
+def checkmate_evaluation(board: chess.Board):
+    # The side to move is checkmated. A quicker mate is worth more.
+    mate_eval = float(2030 - (len(board.move_stack) // 2))
+    return -mate_eval if board.turn else mate_eval
+
+
+def is_insufficient_material(board: chess.Board):
+    # Same as board.is_insufficient_material(), for both sides at once
+    if board.pawns or board.rooks or board.queens:
+        return False
+    if board.knights:
+        return chess.popcount(board.occupied) <= 3  # a single knight against a bare king
+    return not board.bishops & chess.BB_DARK_SQUARES or not board.bishops & chess.BB_LIGHT_SQUARES
+
+
+def is_seventy_five_moves_draw(board: chess.Board):
+    # A checkmate on the last move still counts
+    return board.halfmove_clock >= SEVENTY_FIVE_MOVES_IN_HALFMOVES and any(board.generate_legal_moves())
+
+
+def is_draw_without_move_generation(board: chess.Board):
+    # Insufficient material, the seventy-five move rule and fivefold repetition
+    if is_insufficient_material(board) or is_seventy_five_moves_draw(board):
+        return True
+    return board.halfmove_clock >= FIVEFOLD_REPETITION_MIN_HALFMOVES and board.is_fivefold_repetition()
+
+
+def has_safe_king_move(board: chess.Board):
+    # A king move to a square no enemy piece attacks is legal, in check or not. Found without generating the moves,
+    # and true in most positions, so only the others need the legal moves to tell whether the game is over.
+    king = board.king(board.turn)
+    if king is None:
+        return False
+    occupied_without_king = board.occupied ^ chess.BB_SQUARES[king]
+    for square in chess.scan_forward(chess.BB_KING_ATTACKS[king] & ~board.occupied_co[board.turn]):
+        if not board.attackers_mask(not board.turn, square, occupied_without_king):
+            return True
+    return False
+
+
+def evaluation_without_legal_moves(board: chess.Board):
+    if board.is_check():
+        return checkmate_evaluation(board)
+    return float(0)  # stalemate
+
+
+def terminal_evaluation(board: chess.Board, has_legal_moves: bool):
+    # The evaluation of a finished game, None when the game goes on
+    if not has_legal_moves:
+        return evaluation_without_legal_moves(board)
+    if is_draw_without_move_generation(board):
+        return float(0)
+    return None
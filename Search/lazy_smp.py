@@ -0,0 +1,113 @@
+import multiprocessing
+import queue
+
+import chess
+
+from Search.search_deadline import SearchDeadline
+from Search.shared_transposition_table import SharedTranspositionTable
+from Search.search_statistics import SearchStatistics
+
+
+def _search_worker(worker_index, table_name, memory_limit_mb, jobs, results, stop_event):
+    from engine import Engine  # imported in the worker, engine.py imports this module
+
+    transposition_table = SharedTranspositionTable(memory_limit_mb, name=table_name)
+    engine = Engine()
+    engine.transposition_table = transposition_table
+    # Half of the workers start one ply deeper, so the workers don't search the same depths in lockstep
+    first_depth = 1 + worker_index % 2
+    try:
+        while True:
+            job = jobs.get()
+            if job is None:
+                break
+            search_id, root_fen, moves, max_depth, move_time, age, settings = job
+            board = chess.Board(root_fen)
+            for move in moves:
+                board.push_uci(move)
+            engine.apply_search_settings(settings)
+            transposition_table.age = age
+
+            deadline = SearchDeadline(move_time, stop_event)
+            statistics = SearchStatistics()
+            try:
+                for depth, best_move, best_move_eval in engine.iterate_depths(
+                        board, deadline, transposition_table, statistics, engine.create_move_orderer(),
+                        min(first_depth, max_depth), max_depth):
+                    # No best move without legal moves at the root
+                    principal_variation = [move.uci() for move in engine.LAST_PRINCIPAL_VARIATION or []]
+                    results.put((search_id, worker_index, depth, best_move and best_move.uci(), best_move_eval,
+                                 principal_variation, statistics.nodes, statistics.quiescence_nodes))
+            finally:
+                # The worker is idle again
+                results.put((search_id, worker_index, None, None, None, None, statistics.nodes,
+                             statistics.quiescence_nodes))
+    finally:
+        transposition_table.close()
+
+
+class LazySMPSearch:
+    # Lazy SMP: every worker process searches the same root with iterative deepening. They share nothing but the
+    # transposition table, so a worker finds the cutoffs and hash moves the others have already stored.
+    # The main process plays the move of the deepest completed search.
+    RESULT_POLL_SECONDS = 0.1
+
+    def __init__(self, workers: int, memory_limit_mb: float = 64):
+        self.transposition_table = SharedTranspositionTable(memory_limit_mb)
+        self.stop_event = multiprocessing.Event()
+        self.results = multiprocessing.Queue()
+        self.jobs = [multiprocessing.Queue() for _ in range(workers)]
+        self.processes = [multiprocessing.Process(target=_search_worker,
+                                                  args=(worker_index, self.transposition_table.name, memory_limit_mb,
+                                                        self.jobs[worker_index], self.results, self.stop_event),
+                                                  daemon=True)
+                          for worker_index in range(workers)]
+        for process in self.processes:
+            process.start()
+        self.search_id = 0
+
+    def search(self, board: chess.Board, max_depth: int, move_time: float | None = None, settings=None):
+        # Returns best move, its evaluation, the depth it was found at, the nodes and quiescence nodes searched by all
+        # the workers, and the principal variation of the worker that found the best move
+        self.search_id += 1
+        self.transposition_table.new_search()
+        self.stop_event.clear()
+        root = board.root()
+        job = (self.search_id, root.fen(), [move.uci() for move in board.move_stack], max_depth, move_time,
+               self.transposition_table.age, settings or {})
+        for jobs in self.jobs:
+            jobs.put(job)
+
+        best_depth, best_move, best_move_eval, best_principal_variation = 0, None, None, []
+        running_workers, nodes, quiescence_nodes = len(self.processes), 0, 0
+        while running_workers:
+            try:
+                search_id, worker_index, depth, move, move_eval, principal_variation, worker_nodes, \
+                    worker_quiescence_nodes = self.results.get(timeout=self.RESULT_POLL_SECONDS)
+            except queue.Empty:
+                if not all(process.is_alive() for process in self.processes):
+                    raise RuntimeError('A search worker process has stopped')
+                continue
+            if search_id != self.search_id:
+                continue
+            if depth is None:
+                running_workers -= 1
+                nodes += worker_nodes
+                quiescence_nodes += worker_quiescence_nodes
+            elif depth > best_depth:
+                best_depth, best_move_eval = depth, move_eval
+                best_move = chess.Move.from_uci(move) if move else None
+                best_principal_variation = [chess.Move.from_uci(uci) for uci in principal_variation]
+                if depth >= max_depth or abs(move_eval) >= 1000:
+                    self.stop_event.set()
+        return best_move, best_move_eval, best_depth, nodes, quiescence_nodes, best_principal_variation
+
+    def close(self):
+        for jobs in self.jobs:
+            jobs.put(None)
+        for process in self.processes:
+            process.join(timeout=1)
+            if process.is_alive():
+                process.terminate()
+        self.transposition_table.close()
+        self.transposition_table.unlink()
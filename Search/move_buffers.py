@@ -0,0 +1,113 @@
+from array import array
+
+import chess
+from chess import scan_reversed
+
+from definitions_and_factor_weights import piece_values_dict
+from Search.move_encoding import encode_move
+
+# The moves of a node are kept as 16 bit integers (see move_encoding.py) in buffers allocated once for the whole
+# search, one per ply, with their ordering scores and material gains in parallel arrays. So generating and ordering
+# the moves of a node allocates no move objects, lists or tuples. A chess.Move is looked up only for the moves which
+# are played. The moves are picked best first one at a time, as a cutoff usually comes before they are all needed.
+MAX_MOVES = 256  # no position has more than 218 legal moves
+PROMOTION_PIECE_TYPES = (chess.QUEEN, chess.ROOK, chess.BISHOP, chess.KNIGHT)
+PIECE_TYPES = (chess.PAWN, chess.KNIGHT, chess.BISHOP, chess.ROOK, chess.QUEEN, chess.KING)
+LAST_RANKS = {chess.WHITE: chess.BB_RANK_8, chess.BLACK: chess.BB_RANK_1}
+
+
+class MoveBuffers:
+    def __init__(self, plies: int):
+        self.moves = []
+        self.scores = []
+        self.gains = []
+        self.allocate(plies)
+
+    def allocate(self, plies: int):
+        # Buffers for plies 0 to plies, the ones already allocated are kept
+        while len(self.moves) < plies + 1:
+            self.moves.append(array('H', bytes(2 * MAX_MOVES)))
+            self.scores.append(array('d', bytes(8 * MAX_MOVES)))
+            self.gains.append(array('d', bytes(8 * MAX_MOVES)))
+
+    def generate_captures(self, board: chess.Board, ply: int):
+        # Pseudo-legal captures and promotions, scored most valuable victim first, then least valuable attacker.
+        # Returns how many. A move leaving the king in check has to be skipped once played.
+        moves, scores, gains = self.moves[ply], self.scores[ply], self.gains[ply]
+        turn = board.turn
+        them = board.occupied_co[not turn]
+        occupied = board.occupied
+        piece_type_at = board.piece_type_at
+        count = 0
+        for attacker in PIECE_TYPES:
+            attackers = board.pieces_mask(attacker, turn)
+            for from_square in scan_reversed(attackers):
+                if attacker == chess.PAWN:
+                    targets = chess.BB_PAWN_ATTACKS[turn][from_square] & them
+                elif attacker == chess.KNIGHT:
+                    targets = chess.BB_KNIGHT_ATTACKS[from_square] & them
+                elif attacker == chess.KING:
+                    targets = chess.BB_KING_ATTACKS[from_square] & them
+                else:
+                    targets = 0
+                    if attacker != chess.ROOK:
+                        targets = chess.BB_DIAG_ATTACKS[from_square][chess.BB_DIAG_MASKS[from_square] & occupied]
+                    if attacker != chess.BISHOP:
+                        targets |= chess.BB_RANK_ATTACKS[from_square][chess.BB_RANK_MASKS[from_square] & occupied] | \
+                            chess.BB_FILE_ATTACKS[from_square][chess.BB_FILE_MASKS[from_square] & occupied]
+                    targets &= them
+                for to_square in scan_reversed(targets):
+                    victim = piece_type_at(to_square)
+                    if attacker == chess.PAWN and chess.BB_SQUARES[to_square] & LAST_RANKS[turn]:
+                        count = self._add_promotions(ply, count, from_square, to_square, victim)
+                    else:
+                        moves[count] = from_square | (to_square << 6)
+                        scores[count] = victim * 10 - attacker
+                        gains[count] = piece_values_dict[victim]
+                        count += 1
+
+        pawns = board.pieces_mask(chess.PAWN, turn)
+        # Promotions without a capture
+        pushed_to_last_rank = (pawns << 8 if turn else pawns >> 8) & LAST_RANKS[turn] & ~occupied
+        for to_square in scan_reversed(pushed_to_last_rank):
+            count = self._add_promotions(ply, count, to_square - 8 if turn else to_square + 8, to_square, None)
+        if board.ep_square is not None:
+            for from_square in scan_reversed(pawns & chess.BB_PAWN_ATTACKS[not turn][board.ep_square]):
+                moves[count] = from_square | (board.ep_square << 6)
+                scores[count] = chess.PAWN * 10 - chess.PAWN
+                gains[count] = piece_values_dict[chess.PAWN]
+                count += 1
+        return count
+
+    def _add_promotions(self, ply: int, count: int, from_square: int, to_square: int, victim: int | None):
+        moves, scores, gains = self.moves[ply], self.scores[ply], self.gains[ply]
+        gain = piece_values_dict[victim] if victim else 0
+        for promotion in PROMOTION_PIECE_TYPES:
+            moves[count] = from_square | (to_square << 6) | (promotion << 12)
+            scores[count] = (victim or 0) * 10 - chess.PAWN + promotion * 10
+            gains[count] = gain + piece_values_dict[promotion] - piece_values_dict[chess.PAWN]
+            count += 1
+        return count
+
+    def add_moves(self, board: chess.Board, ply: int, legal_moves, score_move):
+        # Legal moves generated by python-chess, scored by score_move(board, move). Returns how many.
+        moves, scores = self.moves[ply], self.scores[ply]
+        count = 0
+        for move in legal_moves:
+            moves[count] = encode_move(move)
+            scores[count] = score_move(board, move)
+            count += 1
+        return count
+
+    def pick_best(self, ply: int, index: int, count: int):
+        # Swaps the best scored of the moves from index on into index, and returns it
+        moves, scores, gains = self.moves[ply], self.scores[ply], self.gains[ply]
+        best_index, best_score = index, scores[index]
+        for other_index in range(index + 1, count):
+            if scores[other_index] > best_score:
+                best_index, best_score = other_index, scores[other_index]
+        if best_index != index:
+            moves[index], moves[best_index] = moves[best_index], moves[index]
+            scores[index], scores[best_index] = best_score, scores[index]
+            gains[index], gains[best_index] = gains[best_index], gains[index]
+        return moves[index]
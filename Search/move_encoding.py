@@ -0,0 +1,29 @@
+import chess
+
+# Moves packed into 16 bits: from square (6 bits), to square (6 bits), promotion piece type (3 bits).
+# 0 (a1a1) is never a legal move, so it stands for "no move".
+NO_MOVE = 0
+
+
+def encode_move(move: chess.Move | None):
+    if not move:
+        return NO_MOVE
+    return move.from_square | (move.to_square << 6) | ((move.promotion or 0) << 12)
+
+
+def decode_move(encoded_move: int):
+    if encoded_move == NO_MOVE:
+        return None
+    return chess.Move(encoded_move & 63, (encoded_move >> 6) & 63, (encoded_move >> 12) or None)
+
+
+_decoded_moves = [None] * (1 << 16)  # encoded move -> its chess.Move, created the first time it is needed
+
+
+def decoded_move(encoded_move: int):
+    # Like decode_move, but every move object is created only once and then shared, so the search doesn't
+    # allocate one for every move it plays
+    move = _decoded_moves[encoded_move]
+    if move is None:
+        move = _decoded_moves[encoded_move] = decode_move(encoded_move)
+    return move
@@ -0,0 +1,100 @@
+import chess
+from chess import BB_SQUARES
+
+from Search.move_buffers import MAX_MOVES
+from Search.move_encoding import encode_move
+
+
+class MoveOrderer:
+    # Orders the moves of the brute force plies, so alpha-beta finds its cutoffs early: hash move, captures and
+    # promotions by MVV-LVA, killer moves, then quiet moves by the history table. The killer and history tables
+    # are kept for the whole search of one move.
+    KILLER_MOVES_PER_PLY = 2
+    # Scores of score_moves, above any history score: hash move, then captures and promotions plus their MVV-LVA
+    # score, then killer moves minus their place in the killer list
+    HASH_MOVE_SCORE = 3e12
+    CAPTURE_SCORE = 2e12
+    KILLER_MOVE_SCORE = 1e12
+    __slots__ = ('killer_moves', 'history')
+
+    def __init__(self):
+        self.killer_moves = {}  # ply -> quiet moves which caused a cutoff, the latest first
+        self.history = [0] * (2 * 64 * 64)  # (color, from square, to square) -> cutoffs weighted by depth
+
+    @staticmethod
+    def _history_index(color: chess.Color, move: chess.Move):
+        return (color * 64 + move.from_square) * 64 + move.to_square
+
+    @staticmethod
+    def capture_score(board: chess.Board, move: chess.Move):
+        # Most valuable victim first, then least valuable attacker
+        if board.is_en_passant(move):
+            victim = chess.PAWN
+        else:
+            victim = board.piece_type_at(move.to_square) or 0
+        attacker = board.piece_type_at(move.from_square)
+        return victim * 10 - attacker + (move.promotion or 0) * 10
+
+    def order_moves(self, board: chess.Board, hash_move: chess.Move | None = None):
+        first_moves, captures, quiet_moves = [], [], []
+        for move in board.legal_moves:
+            if move == hash_move:
+                first_moves.append(move)
+            elif move.promotion or board.is_capture(move):
+                captures.append((self.capture_score(board, move), move))
+            else:
+                quiet_moves.append(move)
+
+        captures.sort(key=lambda capture: capture[0], reverse=True)
+        first_moves += [move for _, move in captures]
+
+        killer_moves = [move for move in self.killer_moves.get(board.ply(), []) if move in quiet_moves]
+        first_moves += killer_moves
+        history, turn = self.history, board.turn
+        quiet_moves = [move for move in quiet_moves if move not in killer_moves]
+        quiet_moves.sort(key=lambda move: history[self._history_index(turn, move)], reverse=True)
+        return first_moves + quiet_moves
+
+    def score_moves(self, board: chess.Board, move_buffers, ply: int, hash_move: chess.Move | None = None):
+        # The legal moves in the order of order_moves, as scores in the move buffer of the ply, so the search picks
+        # them best first one at a time and never sorts the moves after a cutoff. The scores differ by at least one,
+        # so the fraction subtracted by generation order breaks the ties as the stable sort does. Returns how many.
+        # The moves are compared as 16 bit integers, and captures found from the bitboards, as in capture_score
+        moves, scores = move_buffers.moves[ply], move_buffers.scores[ply]
+        hash_move = encode_move(hash_move)
+        killer_moves = [encode_move(move) for move in self.killer_moves.get(board.ply(), ())]
+        history, turn = self.history, board.turn
+        history_offset = turn * 64 * 64
+        them = board.occupied_co[not turn]
+        en_passant_square = board.ep_square if board.ep_square is not None else -1
+        pawns = board.pawns
+        piece_type_at = board.piece_type_at
+        count = 0
+        for move in board.generate_legal_moves():
+            from_square, to_square, promotion = move.from_square, move.to_square, move.promotion
+            encoded_move = from_square | (to_square << 6) | ((promotion or 0) << 12)
+            if encoded_move == hash_move:
+                score = self.HASH_MOVE_SCORE
+            elif promotion or BB_SQUARES[to_square] & them or \
+                    to_square == en_passant_square and BB_SQUARES[from_square] & pawns:
+                en_passant = to_square == en_passant_square and BB_SQUARES[from_square] & pawns
+                victim = chess.PAWN if en_passant else piece_type_at(to_square) or 0
+                score = self.CAPTURE_SCORE + victim * 10 - piece_type_at(from_square) + (promotion or 0) * 10
+            elif encoded_move in killer_moves:
+                score = self.KILLER_MOVE_SCORE - killer_moves.index(encoded_move)
+            else:
+                score = history[history_offset + from_square * 64 + to_square]
+            moves[count] = encoded_move
+            scores[count] = score - count / MAX_MOVES
+            count += 1
+        return count
+
+    def record_cutoff(self, board: chess.Board, move: chess.Move, depth: int):
+        if move.promotion or board.is_capture(move):
+            return
+        ply = board.ply()
+        killer_moves = self.killer_moves.setdefault(ply, [])
+        if move not in killer_moves:
+            killer_moves.insert(0, move)
+            del killer_moves[self.KILLER_MOVES_PER_PLY:]
+        self.history[self._history_index(board.turn, move)] += depth * depth
@@ -0,0 +1,41 @@
+import chess
+
+from PositionEvaluation.terminal_detection import is_seventy_five_moves_draw
+from Search.transposition_table import position_key
+
+
+class RepetitionHistory:
+    # Zobrist keys of the positions before the searched one: the game so far, then the current search line.
+    # Only the positions since the last capture or pawn move can repeat, so a repetition is found by looking back
+    # halfmove clock plies, instead of replaying the board's move stack as python-chess does.
+    REPETITIONS_TO_DRAW = 5  # fivefold repetition ends the game, as in board.outcome()
+
+    def __init__(self, board: chess.Board):
+        plies = min(board.halfmove_clock, len(board.move_stack))
+        replayed_board = board.copy(stack=plies)
+        keys = []
+        for _ in range(plies):
+            replayed_board.pop()
+            keys.append(position_key(replayed_board))
+        self.keys = keys[::-1]
+
+    def push(self, key: int):
+        self.keys.append(key)
+
+    def pop(self):
+        self.keys.pop()
+
+    def is_repetition(self, key: int, halfmove_clock: int):
+        # The same side is to move every second ply
+        repetitions = 1
+        earliest_index = max(len(self.keys) - halfmove_clock, 0)
+        for index in range(len(self.keys) - 2, earliest_index - 1, -2):
+            if self.keys[index] == key:
+                repetitions += 1
+                if repetitions >= self.REPETITIONS_TO_DRAW:
+                    return True
+        return False
+
+    def is_draw(self, board: chess.Board, key: int):
+        # Fivefold repetition or the seventy-five move rule, for the position with this key
+        return self.is_repetition(key, board.halfmove_clock) or is_seventy_five_moves_draw(board)
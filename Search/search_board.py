@@ -0,0 +1,197 @@
+import chess
+import chess.polyglot
+from chess import BB_SQUARES
+
+# The board the search plays its moves on. chess.Board.push saves a snapshot of the whole board on every move and the
+# polyglot key of a position is computed again from every piece. The search board keeps an undo stack of small tuples
+# instead, and updates the piece bitboards and its polyglot zobrist key move by move. Move generation, check
+# detection and the rest are those of python-chess. A board is converted once at the search root, for standard chess
+# only; it is meant to be pushed and popped by the search, copies of it are plain chess.Board.
+ZOBRIST_KEYS = chess.polyglot.POLYGLOT_RANDOM_ARRAY
+# color -> piece type -> square -> key, in the order of chess.polyglot.ZobristHasher
+PIECE_KEYS = [[[ZOBRIST_KEYS[64 * ((piece_type - 1) * 2 + color) + square] for square in chess.SQUARES]
+               if piece_type else None for piece_type in range(7)] for color in (chess.BLACK, chess.WHITE)]
+CASTLING_CORNERS = ((chess.BB_H1, 768), (chess.BB_A1, 769), (chess.BB_H8, 770), (chess.BB_A8, 771))
+EN_PASSANT_KEYS = ZOBRIST_KEYS[772:780]
+TURN_KEY = ZOBRIST_KEYS[780]
+
+
+def castling_key(castling_rights: int):
+    # The rights have to be clean (chess.Board.clean_castling_rights), then a corner tells the side and the color
+    key = 0
+    for corner, index in CASTLING_CORNERS:
+        if castling_rights & corner:
+            key ^= ZOBRIST_KEYS[index]
+    return key
+
+
+class SearchBoard(chess.Board):
+    def __init__(self, fen: str | None = chess.STARTING_FEN):
+        super().__init__(fen)
+        self.castling_rights = self.clean_castling_rights()
+        self.zobrist_key = chess.polyglot.zobrist_hash(self)
+        # Per move: key, castling rights, en passant square, halfmove clock and promoted pieces before it, then the
+        # captured piece type and its square, and the square of the rook when castling
+        self.undo_stack = []
+        self.keys_before_root = []  # Of the game since the last capture or pawn move, for the repetitions
+        self.root_board = None
+
+    @classmethod
+    def from_board(cls, board: chess.Board):
+        search_board = cls(board.fen())
+        search_board.move_stack = board.move_stack.copy()  # mate evaluations count the moves of the game
+        search_board.root_board = board.copy()
+        replayed_board = board.copy(stack=min(board.halfmove_clock, len(board.move_stack)))
+        while replayed_board.move_stack:
+            replayed_board.pop()
+            search_board.keys_before_root.append(chess.polyglot.zobrist_hash(replayed_board))
+        search_board.keys_before_root.reverse()
+        return search_board
+
+    def to_board(self):
+        board = self.root_board.copy() if self.root_board else chess.Board(self.fen())
+        for move in self.move_stack[len(self.move_stack) - len(self.undo_stack):]:
+            board.push(move)
+        return board
+
+    def copy(self, *, stack: bool | int = True):
+        return self.to_board().copy(stack=stack)
+
+    def _xor_piece(self, piece_type: chess.PieceType, color: chess.Color, mask: chess.Bitboard):
+        # Puts the piece on the squares of the mask, or takes it away from them
+        if piece_type == chess.PAWN:
+            self.pawns ^= mask
+        elif piece_type == chess.KNIGHT:
+            self.knights ^= mask
+        elif piece_type == chess.BISHOP:
+            self.bishops ^= mask
+        elif piece_type == chess.ROOK:
+            self.rooks ^= mask
+        elif piece_type == chess.QUEEN:
+            self.queens ^= mask
+        else:
+            self.kings ^= mask
+        self.occupied ^= mask
+        self.occupied_co[color] ^= mask
+
+    def _en_passant_key(self):
+        # Only when a pawn of the side to move could capture, as in chess.polyglot
+        ep_square = self.ep_square
+        if ep_square and chess.BB_PAWN_ATTACKS[not self.turn][ep_square] & self.pawns & self.occupied_co[self.turn]:
+            return EN_PASSANT_KEYS[ep_square & 7]
+        return 0
+
+    def push(self, move: chess.Move):
+        # The move has to be pseudo-legal or a null move
+        turn = self.turn
+        key = self.zobrist_key
+        undo = (key, self.castling_rights, self.ep_square, self.halfmove_clock, self.promoted)
+        key ^= self._en_passant_key() ^ TURN_KEY
+        ep_square = self.ep_square
+        self.ep_square = None
+        self.halfmove_clock += 1
+        if not turn:
+            self.fullmove_number += 1
+        captured_piece_type = capture_square = rook_square = None
+
+        if move:
+            from_square, to_square = move.from_square, move.to_square
+            from_mask, to_mask = BB_SQUARES[from_square], BB_SQUARES[to_square]
+            piece_type = self.piece_type_at(from_square)
+            own_keys = PIECE_KEYS[turn]
+            castling_rights = self.castling_rights
+            if piece_type == chess.KING and (to_mask & self.occupied_co[turn] or
+                                             abs((to_square & 7) - (from_square & 7)) > 1):
+                # Castling, also written as the king taking its rook
+                rook_square = to_square if to_mask & self.occupied_co[turn] else \
+                    from_square + 3 if to_square > from_square else from_square - 4
+                king_to_square, rook_to_square = (from_square + 2, from_square + 1) if rook_square > from_square \
+                    else (from_square - 2, from_square - 1)
+                self._xor_piece(chess.KING, turn, from_mask | BB_SQUARES[king_to_square])
+                self._xor_piece(chess.ROOK, turn, BB_SQUARES[rook_square] | BB_SQUARES[rook_to_square])
+                key ^= own_keys[chess.KING][from_square] ^ own_keys[chess.KING][king_to_square] ^ \
+                    own_keys[chess.ROOK][rook_square] ^ own_keys[chess.ROOK][rook_to_square]
+                self.promoted &= ~(from_mask | BB_SQUARES[rook_square])
+            else:
+                if to_mask & self.occupied:
+                    captured_piece_type, capture_square = self.piece_type_at(to_square), to_square
+                elif piece_type == chess.PAWN and to_square == ep_square and (to_square - from_square) & 7:
+                    captured_piece_type, capture_square = chess.PAWN, to_square - 8 if turn else to_square + 8
+                if captured_piece_type:
+                    self._xor_piece(captured_piece_type, not turn, BB_SQUARES[capture_square])
+                    key ^= PIECE_KEYS[not turn][captured_piece_type][capture_square]
+                    self.halfmove_clock = 0
+                placed_piece_type = move.promotion or piece_type
+                self._xor_piece(piece_type, turn, from_mask)
+                self._xor_piece(placed_piece_type, turn, to_mask)
+                key ^= own_keys[piece_type][from_square] ^ own_keys[placed_piece_type][to_square]
+                promoted = self.promoted & from_mask or move.promotion
+                self.promoted &= ~(from_mask | to_mask | (BB_SQUARES[capture_square] if captured_piece_type else 0))
+                if promoted:
+                    self.promoted |= to_mask
+                if piece_type == chess.PAWN:
+                    self.halfmove_clock = 0
+                    if abs(to_square - from_square) == 16:
+                        self.ep_square = (from_square + to_square) // 2
+
+            castling_rights &= ~(from_mask | to_mask | (BB_SQUARES[rook_square] if rook_square is not None else 0))
+            if piece_type == chess.KING:
+                castling_rights &= ~(chess.BB_RANK_1 if turn else chess.BB_RANK_8)
+            if castling_rights != self.castling_rights:
+                key ^= castling_key(self.castling_rights) ^ castling_key(castling_rights)
+                self.castling_rights = castling_rights
+
+        self.turn = not turn
+        key ^= self._en_passant_key()
+        self.zobrist_key = key
+        self.move_stack.append(move)
+        self.undo_stack.append(undo + (captured_piece_type, capture_square, rook_square))
+
+    def pop(self):
+        move = self.move_stack.pop()
+        (self.zobrist_key, self.castling_rights, self.ep_square, self.halfmove_clock, self.promoted,
+         captured_piece_type, capture_square, rook_square) = self.undo_stack.pop()
+        turn = self.turn = not self.turn
+        if not turn:
+            self.fullmove_number -= 1
+        if move:
+            from_square, to_square = move.from_square, move.to_square
+            if rook_square is not None:
+                king_to_square, rook_to_square = (from_square + 2, from_square + 1) if rook_square > from_square \
+                    else (from_square - 2, from_square - 1)
+                self._xor_piece(chess.KING, turn, BB_SQUARES[from_square] | BB_SQUARES[king_to_square])
+                self._xor_piece(chess.ROOK, turn, BB_SQUARES[rook_square] | BB_SQUARES[rook_to_square])
+            else:
+                placed_piece_type = self.piece_type_at(to_square)
+                self._xor_piece(placed_piece_type, turn, BB_SQUARES[to_square])
+                self._xor_piece(chess.PAWN if move.promotion else placed_piece_type, turn, BB_SQUARES[from_square])
+                if captured_piece_type:
+                    self._xor_piece(captured_piece_type, not turn, BB_SQUARES[capture_square])
+        return move
+
+    def is_repetition(self, count: int = 3):
+        # From the keys of the earlier positions with the same side to move, since the last capture or pawn move,
+        # instead of replaying the moves
+        keys = [undo[0] for undo in self.undo_stack[::-1]]  # the latest first
+        earlier_keys = keys[1::2] + self.keys_before_root[::-1][(len(keys) + 1) % 2::2]
+        repetitions = 1
+        for key in earlier_keys[:self.halfmove_clock // 2]:
+            if key == self.zobrist_key:
+                repetitions += 1
+                if repetitions >= count:
+                    return True
+        return False
+
+
+def perft(board: chess.Board, depth: int):
+    # The number of move sequences of the depth, to check the move making against known counts
+    if depth == 0:
+        return 1
+    if depth == 1:
+        return board.legal_moves.count()
+    nodes = 0
+    for move in board.generate_legal_moves():
+        board.push(move)
+        nodes += perft(board, depth - 1)
+        board.pop()
+    return nodes
@@ -0,0 +1,31 @@
+import time
+
+
+class SearchTimeout(Exception):
+    pass
+
+
+class SearchDeadline:
+    CHECK_STOP_EVERY_N_NODES = 64
+
+    def __init__(self, seconds: float | None, stop_event=None):
+        # Without seconds the search is limited only by the stop event, which another process can set
+        self.ends_at = time.perf_counter() + seconds if seconds is not None else float('inf')
+        self.stop_event = stop_event
+        self.nodes = 0
+
+    def check(self):
+        # Called on every node, so an expired search is abandoned within a single node evaluation
+        self.nodes += 1
+        if time.perf_counter() >= self.ends_at:
+            raise SearchTimeout()
+        if self.stop_event and self.nodes % self.CHECK_STOP_EVERY_N_NODES == 0 and self.stop_event.is_set():
+            raise SearchTimeout()
+
+    @property
+    def expired(self):
+        return time.perf_counter() >= self.ends_at or bool(self.stop_event and self.stop_event.is_set())
+
+    @property
+    def time_left(self):
+        return max(0.0, self.ends_at - time.perf_counter())
@@ -0,0 +1,68 @@
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager, nullcontext
+
+
+class SearchStatistics:
+    # What one suggest_move did. The search counts only when it is given a statistics object.
+    __slots__ = ('nodes', 'quiescence_nodes', 'nodes_per_depth', 'beta_cutoffs', 'first_move_cutoffs',
+                 'static_evaluations', 'delta_evaluations', 'terminal_evaluations', 'intuition_list_sizes', 'book_hits',
+                 'null_move_cutoffs', 'razored_nodes', 'futile_moves', 'late_move_reductions', 'late_move_researches',
+                 'principal_variation_researches', 'aspiration_researches', 'phase_seconds')
+
+    def __init__(self):
+        self.nodes = 0
+        self.quiescence_nodes = 0  # counted apart from nodes, which are the nodes of the full width search
+        self.nodes_per_depth = Counter()  # depth left to search -> nodes
+        self.beta_cutoffs = 0
+        self.first_move_cutoffs = 0  # cutoffs by the first move searched, a measure of the move ordering
+        self.static_evaluations = 0
+        self.delta_evaluations = 0  # moves scored for the intuition from the evaluation before the move
+        self.terminal_evaluations = 0  # finished games: checkmate, stalemate and draws
+        self.intuition_list_sizes = Counter()  # moves considered by an intuition node -> nodes
+        self.book_hits = 0
+        self.null_move_cutoffs = 0
+        self.razored_nodes = 0
+        self.futile_moves = 0  # quiet moves pruned near the leaves
+        self.late_move_reductions = 0  # late quiet moves resolved by a reduced search
+        self.late_move_researches = 0  # late quiet moves searched again to the full depth
+        self.principal_variation_researches = 0  # moves searched again with the full window after a null window
+        self.aspiration_researches = 0  # roots searched again with a wider window
+        self.phase_seconds = defaultdict(float)  # e.g. 'book', 'depth 3' -> seconds
+
+    @property
+    def evaluations(self):
+        return self.static_evaluations + self.delta_evaluations + self.terminal_evaluations
+
+    @property
+    def first_move_cutoff_rate(self):
+        return self.first_move_cutoffs / self.beta_cutoffs if self.beta_cutoffs else 0.0
+
+    @contextmanager
+    def timed_phase(self, phase: str):
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phase_seconds[phase] += time.perf_counter() - started_at
+
+    def summary(self):
+        phases = ', '.join(f'{phase} {seconds:.3f}s' for phase, seconds in self.phase_seconds.items())
+        depths = ', '.join(f'{depth}: {nodes}' for depth, nodes in sorted(self.nodes_per_depth.items(), reverse=True))
+        intuition_list_sizes = ', '.join(f'{size}: {nodes}' for size, nodes in sorted(self.intuition_list_sizes.items()))
+        return '\n'.join([f'nodes {self.nodes}, quiescence nodes {self.quiescence_nodes}, book hits {self.book_hits}',
+                          f'nodes per depth left {{{depths}}}',
+                          f'beta cutoffs {self.beta_cutoffs}, by the first move {self.first_move_cutoff_rate:.1%}',
+                          f'evaluations: static {self.static_evaluations}, delta {self.delta_evaluations}, '
+                          f'terminal {self.terminal_evaluations}',
+                          f'intuition list sizes {{{intuition_list_sizes}}}',
+                          f'pruning: null move cutoffs {self.null_move_cutoffs}, razored nodes {self.razored_nodes}, '
+                          f'futile moves {self.futile_moves}, late move reductions {self.late_move_reductions}, '
+                          f'searched again {self.late_move_researches}',
+                          f'searched again with a wider window: moves {self.principal_variation_researches}, '
+                          f'roots {self.aspiration_researches}',
+                          f'phases: {phases}'])
+
+
+def timed_phase(statistics: SearchStatistics | None, phase: str):
+    return statistics.timed_phase(phase) if statistics else nullcontext()
@@ -0,0 +1,94 @@
+from multiprocessing import shared_memory
+
+import chess
+
+from Search.move_encoding import encode_move, decode_move
+from Search.transposition_table import TranspositionTable, TranspositionTableEntry
+
+
+class SharedTranspositionTable(TranspositionTable):
+    # A transposition table in shared memory, so several search processes can use it at once.
+    # Every entry is 3 words: a check word, the packed data and the score. Writes are not locked. The check word is
+    # key ^ data ^ score, so an entry written by two processes at the same time fails the check and reads as a miss.
+    ENTRY_SIZE_IN_BYTES = 24
+    WORDS_PER_ENTRY = 3
+    STORED_FLAG = 1 << 34  # tells an empty slot apart from a depth 0 entry
+
+    def __init__(self, memory_limit_mb: float = 64, name: str | None = None):
+        self.size = max(1, int(memory_limit_mb * 1024 * 1024) // self.ENTRY_SIZE_IN_BYTES)
+        buffer_size = self.size * self.ENTRY_SIZE_IN_BYTES
+        # Without a name a new zeroed table is created, with a name the processes attach to an existing one
+        self.shared_memory = shared_memory.SharedMemory(name=name, create=name is None, size=buffer_size)
+        self.name = self.shared_memory.name
+        self.buffer = self.shared_memory.buf[:buffer_size]
+        self.words = self.buffer.cast('Q')
+        self.scores = self.buffer.cast('d')
+        self.age = 0
+        self.stored_entries = 0
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _pack(depth: int, bound: int, age: int, best_move: chess.Move | None):
+        return min(depth, 255) | (bound << 8) | (age << 10) | (encode_move(best_move) << 18) | \
+            SharedTranspositionTable.STORED_FLAG
+
+    def _read(self, index: int):
+        # (key, data, score) of a valid entry, otherwise None
+        position = index * self.WORDS_PER_ENTRY
+        check, data, score_bits = self.words[position], self.words[position + 1], self.words[position + 2]
+        if not data:
+            return None
+        key = check ^ data ^ score_bits
+        if key % self.size != index:  # torn write
+            return None
+        return key, data, self.scores[position + 2]
+
+    def clear(self):
+        self.buffer[:] = bytes(len(self.buffer))
+        self.stored_entries = 0
+        self.hits = 0
+        self.misses = 0
+
+    def probe(self, key: int):
+        stored = self._read(key % self.size)
+        if stored is None or stored[0] != key:
+            self.misses += 1
+            return None
+        self.hits += 1
+        _, data, score = stored
+        return TranspositionTableEntry(key, data & 255, score, (data >> 8) & 3, decode_move((data >> 18) & 0xFFFF),
+                                       (data >> 10) & 255)
+
+    def store(self, key: int, depth: int, score: float, bound: int, best_move: chess.Move | None):
+        index = key % self.size
+        stored = self._read(index)
+        if stored is None:
+            self.stored_entries += 1
+        else:
+            stored_key, stored_data, _ = stored
+            if (stored_data >> 10) & 255 == self.age and stored_data & 255 > depth:
+                return
+            if stored_key == key and best_move is None:
+                best_move = decode_move((stored_data >> 18) & 0xFFFF)
+
+        position = index * self.WORDS_PER_ENTRY
+        data = self._pack(depth, bound, self.age, best_move)
+        self.words[position + 1] = data
+        self.scores[position + 2] = score
+        self.words[position] = key ^ data ^ self.words[position + 2]
+
+    def get_best_move(self, key: int):
+        stored = self._read(key % self.size)
+        if stored is None or stored[0] != key:
+            return None
+        return decode_move((stored[1] >> 18) & 0xFFFF)
+
+    def close(self):
+        self.words.release()
+        self.scores.release()
+        self.buffer.release()
+        self.shared_memory.close()
+
+    def unlink(self):
+        self.shared_memory.unlink()
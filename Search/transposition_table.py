@@ -0,0 +1,94 @@
+from collections import namedtuple
+
+import chess
+import chess.polyglot
+
+from Search.search_board import SearchBoard
+
+EXACT = 0
+LOWER_BOUND = 1  # the real evaluation is at least the stored score
+UPPER_BOUND = 2  # the real evaluation is at most the stored score
+
+TranspositionTableEntry = namedtuple('TranspositionTableEntry',
+                                     ['key', 'depth', 'score', 'bound', 'best_move', 'age'])
+
+
+def position_key(board: chess.Board):
+    if isinstance(board, SearchBoard):
+        return board.zobrist_key  # kept up to date move by move
+    return chess.polyglot.zobrist_hash(board)
+
+
+def bound_for_score(score, alpha, beta):
+    if score <= alpha:
+        return UPPER_BOUND
+    if score >= beta:
+        return LOWER_BOUND
+    return EXACT
+
+
+class TranspositionTable:
+    # Rough size of one stored entry (the tuple, its fields and the slot pointing to it).
+    ENTRY_SIZE_IN_BYTES = 160
+
+    def __init__(self, memory_limit_mb: float = 64):
+        self.size = max(1, int(memory_limit_mb * 1024 * 1024) // self.ENTRY_SIZE_IN_BYTES)
+        self.slots = [None] * self.size
+        self.age = 0
+        self.stored_entries = 0
+        self.hits = 0
+        self.misses = 0
+
+    def new_search(self):
+        # Entries from previous searches are kept, but they will be the first to be replaced.
+        self.age = (self.age + 1) % 256
+
+    def clear(self):
+        self.slots = [None] * self.size
+        self.stored_entries = 0
+        self.hits = 0
+        self.misses = 0
+
+    def probe(self, key: int):
+        entry = self.slots[key % self.size]
+        if entry is not None and entry.key == key:
+            self.hits += 1
+            return entry
+        self.misses += 1
+        return None
+
+    def store(self, key: int, depth: int, score: float, bound: int, best_move: chess.Move | None):
+        index = key % self.size
+        current_entry = self.slots[index]
+        if current_entry is None:
+            self.stored_entries += 1
+        elif current_entry.age == self.age and current_entry.depth > depth:
+            # Depth preferred replacement: a deeper result from the current search is more valuable
+            return
+        elif current_entry.key == key and best_move is None:
+            best_move = current_entry.best_move
+
+        self.slots[index] = TranspositionTableEntry(key, depth, score, bound, best_move, self.age)
+
+    def get_best_move(self, key: int):
+        entry = self.slots[key % self.size]
+        if entry is not None and entry.key == key:
+            return entry.best_move
+        return None
+
+    @staticmethod
+    def cutoff_score(entry: TranspositionTableEntry, depth: int, alpha: float, beta: float):
+        # Returns the stored score when it is enough to resolve the node, otherwise None
+        if entry.depth < depth:
+            return None
+        if entry.bound == EXACT:
+            return entry.score
+        if entry.bound == LOWER_BOUND and entry.score >= beta:
+            return entry.score
+        if entry.bound == UPPER_BOUND and entry.score <= alpha:
+            return entry.score
+        return None
+
+    @property
+    def fill_rate(self):
+        return self.stored_entries / self.size
@@ -0,0 +1,71 @@
+import json
+import os
+import tempfile
+from unittest import TestCase
+
+from batch_analysis import AnalysisSettings, analyse_files, analyse_game, read_checkpoint, write_checkpoint
+
+GAMES = """[Event "First"]
+
+1. e4 e5 2. Qh5 Nc6 1-0
+
+[Event "Second"]
+
+1. d4 d5 1/2-1/2
+
+"""
+
+POSITIONS = """3k4/8/3K4/5R2/8/8/8/8 w - - id "mate in one";
+4k3/8/8/8/8/8/8/4K2R w K - id "rook up";
+"""
+
+
+class BatchAnalysisTest(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.pgn_path = os.path.join(self.directory.name, 'games.pgn')
+        self.epd_path = os.path.join(self.directory.name, 'positions.epd')
+        self.output_path = os.path.join(self.directory.name, 'analysis.jsonl')
+        with open(self.pgn_path, 'w') as pgn_file:
+            pgn_file.write(GAMES)
+        with open(self.epd_path, 'w') as epd_file:
+            epd_file.write(POSITIONS)
+        self.settings = AnalysisSettings(depth=1, move_time=None)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _read_output(self):
+        with open(self.output_path) as output_file:
+            return [json.loads(line) for line in output_file]
+
+    def test_analyse_game_returns_every_position_before_a_move(self):
+        results = analyse_game(GAMES.split('[Event "Second"]')[0], self.settings)
+
+        self.assertEqual([result['played_move'] for result in results], ['e2e4', 'e7e5', 'd1h5', 'b8c6'])
+        self.assertEqual([result['ply'] for result in results], [0, 1, 2, 3])
+        self.assertTrue(all(result['depth'] == 1 and result['nodes'] > 0 for result in results))
+
+    def test_results_are_written_in_the_input_order(self):
+        positions = analyse_files([self.pgn_path, self.epd_path], self.output_path, self.settings, workers=2,
+                                  units_per_chunk=1)
+
+        results = self._read_output()
+        self.assertEqual(positions, 8)
+        self.assertEqual([result['unit'] for result in results], [0, 0, 0, 0, 1, 1, 2, 3])
+        self.assertEqual(results[6]['id'], 'mate in one')
+        self.assertEqual(results[6]['best_move'], 'f5f8')
+        self.assertEqual(read_checkpoint(self.output_path + '.checkpoint'),
+                         {'units': 4, 'output_size': os.path.getsize(self.output_path)})
+
+    def test_an_interrupted_run_is_resumed_from_the_checkpoint(self):
+        analyse_files([self.pgn_path], self.output_path, self.settings, workers=1, units_per_chunk=1)
+        first_game_size = len(''.join(json.dumps(result) + '\n' for result in self._read_output()
+                                      if result['unit'] == 0))
+        # Interrupted after the first game, with some results of the second game already written
+        write_checkpoint(self.output_path + '.checkpoint', {'units': 1, 'output_size': first_game_size})
+
+        positions = analyse_files([self.pgn_path, self.epd_path], self.output_path, self.settings, workers=1)
+
+        self.assertEqual(positions, 4)
+        self.assertEqual([result['unit'] for result in self._read_output()], [0, 0, 0, 0, 1, 1, 2, 3])
@@ -0,0 +1,51 @@
+import random
+from unittest import TestCase
+
+import chess
+import numpy as np
+
+from PositionEvaluation.batch_evaluation import boards_to_bitboards, evaluate_bitboards, weight_tables, \
+    evaluate_positions_batch
+from PositionEvaluation.position_evaluator import PositionEvaluator
+
+
+class BatchEvaluationTest(TestCase):
+    def test_boards_to_bitboards_has_a_bitboard_per_color_and_piece_type(self):
+        bitboards = boards_to_bitboards([chess.Board()])
+
+        self.assertEqual(bitboards.shape, (1, 12))
+        self.assertEqual(int(bitboards[0, 0]), chess.BB_RANK_2)  # white pawns
+        self.assertEqual(int(bitboards[0, 11]), chess.BB_E8)  # black king
+
+    def test_evaluate_bitboards_is_the_dot_product_with_the_weight_tables(self):
+        bitboards = boards_to_bitboards([chess.Board(), chess.Board(fen='4k3/8/8/3Q4/8/8/8/4K3 w - - 0 1')])
+        unpacked = np.unpackbits(bitboards.view(np.uint8).reshape(2, 12, 8), axis=-1, bitorder='little')
+
+        expected = unpacked.reshape(2, 12 * 64) @ weight_tables().reshape(12 * 64)
+        self.assertTrue(np.allclose(evaluate_bitboards(bitboards), expected))
+
+    def test_batch_evaluation_is_the_same_as_evaluating_one_position_at_a_time(self):
+        randomizer = random.Random(5)
+        boards = []
+        board = chess.Board()
+        while len(boards) < 200:
+            if board.is_game_over():
+                board = chess.Board()
+            board.push(randomizer.choice(list(board.legal_moves)))
+            boards.append(board.copy(stack=False))
+
+        evaluations = evaluate_positions_batch(boards)
+
+        position_evaluator = PositionEvaluator()
+        for board, evaluation in zip(boards, evaluations):
+            self.assertAlmostEqual(evaluation, position_evaluator.evaluate_position(board))
+
+    def test_finished_games_are_evaluated_as_finished(self):
+        boards = [chess.Board(fen='k1R5/8/1K6/8/8/8/8/8 b - - 0 1'), chess.Board(fen='k7/1R6/2K5/8/8/8/8/8 b - - 0 1')]
+
+        evaluations = PositionEvaluator.evaluate_positions_batch(boards)
+
+        self.assertEqual(list(evaluations), [PositionEvaluator.finished_game_evaluation(board) for board in boards])
+
+    def test_empty_batch(self):
+        self.assertEqual(len(evaluate_positions_batch([])), 0)
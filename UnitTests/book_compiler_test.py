@@ -0,0 +1,78 @@
+import os
+import tempfile
+from unittest import TestCase
+
+import chess
+from chess.polyglot import MemoryMappedReader
+
+from OpeningBooks.book_compiler import compile_book, split_games, encode_book_move, book_entries, MAX_WEIGHT
+from OpeningBooks.opening_book_index import decode_book_move
+
+GAMES = """[Event "First"]
+[WhiteElo "2400"]
+[BlackElo "2300"]
+
+1. e4 e5 2. Nf3 Nc6 1-0
+
+[Event "Second"]
+[WhiteElo "2000"]
+[BlackElo "2500"]
+
+1. e4 c5 2. Nf3 d6 0-1
+
+[Event "Third"]
+
+1. d4 { a comment } d5 2. c4 1/2-1/2
+
+"""
+
+
+class BookCompilerTest(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.pgn_path = os.path.join(self.directory.name, 'games.pgn')
+        self.book_path = os.path.join(self.directory.name, 'book.bin')
+        with open(self.pgn_path, 'w') as pgn_file:
+            pgn_file.write(GAMES)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _book_moves(self, board: chess.Board):
+        with MemoryMappedReader(self.book_path) as reader:
+            return {entry.move.uci(): entry.weight for entry in reader.find_all(board)}
+
+    def test_split_games(self):
+        game_texts = list(split_games(GAMES.splitlines(keepends=True)))
+
+        self.assertEqual(len(game_texts), 3)
+        self.assertTrue(game_texts[2].startswith('[Event "Third"]'))
+
+    def test_compiled_book_is_readable_by_memory_mapped_reader(self):
+        report = compile_book([self.pgn_path], self.book_path, workers=1, games_per_chunk=1, max_counts_in_memory=2)
+
+        self.assertEqual(report.games, 3)
+        self.assertEqual(report.positions, 11)
+        self.assertEqual(self._book_moves(chess.Board()), {'e2e4': 2, 'd2d4': 1})
+        self.assertEqual(self._book_moves(chess.Board('rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq - 0 1')),
+                         {'e7e5': 1, 'c7c5': 1})
+
+    def test_filters(self):
+        report = compile_book([self.pgn_path], self.book_path, max_ply=2, min_frequency=2, min_rating=2000,
+                              color=chess.WHITE, workers=1)
+
+        self.assertEqual(report.used_games, 2)
+        self.assertEqual(report.entries, 1)
+        self.assertEqual(self._book_moves(chess.Board()), {'e2e4': 2})
+
+    def test_castling_is_written_as_king_takes_rook(self):
+        board = chess.Board('r3k2r/8/8/8/8/8/8/R3K2R w KQkq - 0 1')
+        for uci in ['e1g1', 'e1c1']:
+            raw_move = encode_book_move(board, chess.Move.from_uci(uci))
+            self.assertEqual(decode_book_move(board, raw_move), chess.Move.from_uci(uci))
+        self.assertEqual(encode_book_move(board, chess.Move.from_uci('e1g1')) & 0x3f, chess.H1)
+
+    def test_weights_are_scaled_when_counts_are_too_large(self):
+        entries = list(book_entries([(1, 10, 4 * MAX_WEIGHT), (1, 20, MAX_WEIGHT)], min_frequency=1))
+
+        self.assertEqual(entries, [(1, 10, MAX_WEIGHT), (1, 20, MAX_WEIGHT // 4)])
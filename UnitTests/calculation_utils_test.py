@@ -1,11 +1,11 @@
+import random
+
 import chess
 
-from calculation_utils import SortedLinkedList
+from calculation_utils import SortedLinkedList, TopMovesSelector, MoveAndEval
 
 from unittest import TestCase
 
-from engine import MoveAndEval
-
 
 class SortedLinkedListTest(TestCase):
     def _test_assert_linked_list_attributes(self, linked_list,
@@ -227,3 +227,43 @@ class SortedLinkedListTest(TestCase):
         linked_list.empty_the_list()
 
         self._test_assert_linked_list_is_empty(linked_list)
+
+
+class TopMovesSelectorTest(TestCase):
+    def setUp(self):
+        self.moves = list(chess.Board().legal_moves)
+
+    def _test_select(self, evaluations, max_length, maximizing_side):
+        selector = TopMovesSelector(max_length=max_length, maximizing_side=maximizing_side)
+        for move, evaluation in zip(self.moves, evaluations):
+            selector.add(move, evaluation)
+        return [self.moves.index(move) for move in selector.get_moves()]
+
+    def test_maximizing_side_keeps_the_biggest_evaluations_from_the_smallest_up(self):
+        self.assertEqual(self._test_select([3, 1, 5, 4, 2], max_length=3, maximizing_side=True), [0, 3, 2])
+
+    def test_minimizing_side_keeps_the_smallest_evaluations_from_the_smallest_up(self):
+        self.assertEqual(self._test_select([3, 1, 5, 4, 2], max_length=3, maximizing_side=False), [1, 4, 0])
+
+    def test_maximizing_side_keeps_the_first_added_of_equal_evaluations(self):
+        self.assertEqual(self._test_select([5, 4, 4, 4], max_length=2, maximizing_side=True), [1, 0])
+
+    def test_minimizing_side_keeps_the_last_added_of_equal_evaluations(self):
+        self.assertEqual(self._test_select([3, 4, 4, 4], max_length=2, maximizing_side=False), [0, 3])
+
+    def test_no_moves(self):
+        self.assertEqual(TopMovesSelector(max_length=3, maximizing_side=True).get_moves(), [])
+
+    def test_selects_the_same_moves_in_the_same_order_as_the_sorted_linked_list(self):
+        randomizer = random.Random(11)
+        for _ in range(500):
+            max_length = randomizer.randint(1, 12)
+            maximizing_side = randomizer.random() < 0.5
+            evaluations = [randomizer.choice([-1, 0, 1.5, 2]) for _ in range(randomizer.randint(1, len(self.moves)))]
+            linked_list = SortedLinkedList(max_length=max_length, maximizing_side=maximizing_side)
+            selector = TopMovesSelector(max_length=max_length, maximizing_side=maximizing_side)
+            for move, evaluation in zip(self.moves, evaluations):
+                linked_list.add_move_and_eval(MoveAndEval(move, evaluation))
+                selector.add_move_and_eval(MoveAndEval(move, evaluation))
+
+            self.assertEqual(selector.get_moves(), list(linked_list.get_moves()))
@@ -2,9 +2,17 @@ from unittest.mock import patch
 import chess
 
 import os
+import time
 from PositionEvaluation.position_evaluator import PositionEvaluator
-from engine import Engine, MinMaxEvaluator, MoveAndEval
+from engine import Engine, MinMaxEvaluator
+from calculation_utils import MoveAndEval
+from Search.transposition_table import TranspositionTable, position_key, EXACT
+from Search.search_deadline import SearchDeadline, SearchTimeout
+from Search.search_statistics import SearchStatistics
+from Search.repetition_history import RepetitionHistory
 from chess.polyglot import MemoryMappedReader
+from definitions_and_factor_weights import positional_values_dict
+from PositionEvaluation.piece_square_tables import recompile_if_weights_changed
 from unittest import TestCase
 
 
@@ -55,6 +63,120 @@ class EngineTest(TestCase):
         suggested_move = self.engine.suggest_move(board)
         self.assertEquals(suggested_move, chess.Move.from_uci('g5f5'))
 
+    def test_suggest_move_in_time_returns_the_move_of_the_last_completed_depth(self):
+        board = chess.Board(fen='r2q1rk1/pp2bppp/2n1pn2/3p4/3P4/2NBPN2/PP3PPP/R2Q1RK1 w - - 0 10')
+        self.engine.MOVE_TIME = 0.5
+        fen_before_search = board.fen()
+
+        started_at = time.perf_counter()
+        suggested_move = self.engine.suggest_move(board)
+
+        self.assertLess(time.perf_counter() - started_at, 1)
+        self.assertIn(suggested_move, board.legal_moves)
+        self.assertGreaterEqual(self.engine.LAST_DEPTH, 1)
+        self.assertEqual(board.fen(), fen_before_search)
+
+    def test_suggest_move_in_time_completes_the_first_ply_even_when_there_is_no_time(self):
+        self.engine.MOVE_TIME = 0.000001
+
+        suggested_move = self.engine.suggest_move(chess.Board(fen='3k4/8/3K4/5R2/8/8/8/8 w - - 0 1'))
+
+        self.assertEqual(suggested_move, chess.Move.from_uci('f5f8'))
+        self.assertEqual(self.engine.LAST_DEPTH, 1)
+
+    def test_suggest_move_in_parallel_finds_mate_in_two(self):
+        self.engine.SEARCH_WORKERS = 2
+        self.engine.MAX_DEPTH = 3
+        try:
+            suggested_move = self.engine.suggest_move(chess.Board(fen='4k3/8/3K4/6R1/8/8/8/8 w - - 0 1'))
+        finally:
+            self.engine.close()
+
+        self.assertEqual(suggested_move, chess.Move.from_uci('g5f5'))
+        self.assertGreaterEqual(self.engine.LAST_DEPTH, 3)
+        self.assertEqual(self.engine.LAST_PRINCIPAL_VARIATION[:1], [suggested_move])
+        self.assertGreater(self.engine.LAST_QUIESCENCE_NODES, 0)
+        self.assertEqual(self.engine.LAST_STATISTICS.quiescence_nodes, self.engine.LAST_QUIESCENCE_NODES)
+
+    def test_search_settings_are_applied_by_a_worker_engine(self):
+        original_settings = Engine().search_settings()
+        self.engine.USE_ASPIRATION_WINDOWS = False
+        with patch.object(MinMaxEvaluator, 'INTUITION_SPREAD', 8), \
+                patch.dict(positional_values_dict, {'piece_positioned_in_the_close_center': 1.6}):
+            settings = self.engine.search_settings()
+        worker_engine = Engine()
+        try:
+            worker_engine.apply_search_settings(settings)
+
+            self.assertEqual(worker_engine.USE_ASPIRATION_WINDOWS, False)
+            self.assertEqual(worker_engine.MAX_DEPTH, 1)
+            self.assertEqual(MinMaxEvaluator.INTUITION_SPREAD, 8)
+            self.assertEqual(positional_values_dict['piece_positioned_in_the_close_center'], 1.6)
+        finally:
+            worker_engine.apply_search_settings(original_settings)
+            recompile_if_weights_changed()
+        self.assertEqual(positional_values_dict['piece_positioned_in_the_close_center'], 0.6)
+
+    def test_search_finds_the_fivefold_repetition_from_the_game_history(self):
+        board = chess.Board()
+        for uci in ['g1f3', 'g8f6', 'f3g1', 'f6g8'] * 3 + ['g1f3', 'g8f6', 'f3g1']:
+            board.push_uci(uci)
+        evaluator = self.engine.create_evaluator(board, depth=1)
+        evaluator.plies[0].key = position_key(board)
+
+        move_eval = evaluator.create_a_branch_and_calculate_its_evaluation(chess.Move.from_uci('f6g8'), 0,
+                                                                           float('-inf'), float('inf'), 0)
+
+        self.assertEqual(move_eval, 0)
+        self.assertEqual(evaluator.repetition_history.keys, RepetitionHistory(board).keys)
+
+    def test_transposition_table_is_kept_between_suggested_moves(self):
+        board = chess.Board()
+        transposition_table = self.engine.transposition_table
+
+        board.push(self.engine.suggest_move(board))
+        self.engine.suggest_move(board)
+
+        self.assertIs(self.engine.transposition_table, transposition_table)
+        self.assertGreater(transposition_table.stored_entries, 0)
+
+    def test_suggest_move_returns_the_principal_variation(self):
+        board = chess.Board(fen='4k3/8/3K4/6R1/8/8/8/8 w - - 0 1')
+        self.engine.MAX_DEPTH = 3
+
+        self.engine.suggest_move(board)
+
+        principal_variation = self.engine.LAST_PRINCIPAL_VARIATION
+        self.assertEqual(principal_variation[0], chess.Move.from_uci('g5f5'))
+        for move in principal_variation:
+            self.assertIn(move, board.legal_moves)
+            board.push(move)
+        self.assertTrue(board.is_checkmate())
+
+    def test_iterative_deepening_searches_every_depth_with_one_evaluator(self):
+        board = chess.Board(fen='4k3/8/3K4/6R1/8/8/8/8 w - - 0 1')
+
+        with patch.object(Engine, 'create_evaluator', wraps=self.engine.create_evaluator) as create_evaluator:
+            depths = [depth for depth, _, _ in self.engine.iterate_depths(board, SearchDeadline(None),
+                                                                          TranspositionTable(1), max_depth=3)]
+
+        self.assertEqual(depths, [1, 2, 3])
+        self.assertEqual(create_evaluator.call_count, 1)
+        self.assertEqual(self.engine.LAST_PRINCIPAL_VARIATION[0], chess.Move.from_uci('g5f5'))
+
+    def test_aspiration_window_is_widened_until_the_evaluation_is_inside(self):
+        board = chess.Board(fen='r2q1rk1/pp2bppp/2n1pn2/3p4/3P4/2NBPN2/PP3PPP/R2Q1RK1 w - - 0 10')
+        statistics = SearchStatistics()
+        self.engine.transposition_table = None
+
+        full_window_evaluator, full_window_eval = self.engine.search_root(board, 2)
+        # 0.5 and 1.5 pawns around 3 pawns too many are too narrow, 4 pawns are enough
+        evaluator, position_eval = self.engine.search_root(board, 2, full_window_eval + 3, statistics=statistics)
+
+        self.assertEqual(position_eval, full_window_eval)
+        self.assertEqual(evaluator.best_move, full_window_evaluator.best_move)
+        self.assertEqual(statistics.aspiration_researches, 2)
+
 
 class MinMaxEvaluatorTest(TestCase):
     def setUp(self):
@@ -65,13 +187,12 @@ class MinMaxEvaluatorTest(TestCase):
                                          board=chess.Board())
 
     def test_brute_force_at_low_depth_left(self):
-        self.evaluator.depth = 3
-        use_intuition = self.evaluator.use_intuition
+        use_intuition = self.evaluator.use_intuition(3)
 
         self.assertEquals(use_intuition, False)
 
     def test_use_intuition_when_high_depth_left(self):
-        use_intuition = self.evaluator.use_intuition
+        use_intuition = self.evaluator.use_intuition(4)
 
         self.assertEquals(use_intuition, True)
 
@@ -82,8 +203,8 @@ class MinMaxEvaluatorTest(TestCase):
                 MoveAndEval(chess.Move.from_uci('f2f4'), 0)], 0
 
     def test_get_moves_to_be_considered_returns_all_possible_moves_when_intuition_not_used(self):
-        with patch.object(MinMaxEvaluator, 'use_intuition', False) as use_intuition:
-            moves_to_be_considered = self.evaluator.get_moves_to_be_considered()
+        with patch.object(MinMaxEvaluator, 'use_intuition', return_value=False) as use_intuition:
+            moves_to_be_considered = self.evaluator.get_moves_to_be_considered(self.evaluator.depth)
 
         self.assertEquals(list(moves_to_be_considered), list(self.evaluator.board.legal_moves))
 
@@ -122,7 +243,7 @@ class MinMaxEvaluatorTest(TestCase):
         with patch.object(chess.Board, 'legal_moves', self._test_get_list_of_moves()[:len_legal_moves_found]) as legal_move_generator:
             with patch.object(PositionEvaluator, 'evaluate_position_from_move') as move_evaluations:
                 move_evaluations.side_effect = mocked_evaluations
-                return self.evaluator.get_moves_to_be_considered()
+                return self.evaluator.get_moves_to_be_considered(self.evaluator.depth)
 
     @staticmethod
     def _test_get_list_of_moves():
@@ -203,6 +324,7 @@ class MinMaxEvaluatorTest(TestCase):
         self._test_execute_min_max_then_assert(expected_min_max_eval=2,
                                                expected_best_move=chess.Move.from_uci('g8f6'))
 
+    @patch.object(MinMaxEvaluator, 'USE_PRINCIPAL_VARIATION_SEARCH', False)  # one search per move
     def _test_execute_min_max_then_assert(self, expected_min_max_eval, expected_best_move, move_evals_returns=None ):
         with patch.object(self.evaluator, 'get_moves_to_be_considered') as move_generator:
             move_generator.return_value = [chess.Move.from_uci('e2e4'),
@@ -213,3 +335,113 @@ class MinMaxEvaluatorTest(TestCase):
 
         self.assertEquals(new_eval, expected_min_max_eval)
         self.assertEquals(self.evaluator.best_move, expected_best_move)
+
+    def test_min_max_stores_the_searched_position_in_the_transposition_table(self):
+        self.evaluator.transposition_table = TranspositionTable(memory_limit_mb=1)
+        self.evaluator.depth = 2
+
+        position_eval = self.evaluator.min_max()
+
+        entry = self.evaluator.transposition_table.probe(position_key(self.evaluator.board))
+        self.assertEqual(entry.depth, 2)
+        self.assertEqual(entry.score, position_eval)
+        self.assertEqual(entry.best_move, self.evaluator.best_move)
+
+    def test_min_max_returns_the_stored_evaluation_when_it_is_deep_enough(self):
+        self.evaluator.transposition_table = TranspositionTable(memory_limit_mb=1)
+        self.evaluator.transposition_table.store(position_key(self.evaluator.board), 5, 1.25, EXACT,
+                                                 chess.Move.from_uci('g1f3'))
+
+        with patch.object(self.evaluator, 'search_moves') as search_moves:
+            position_eval = self.evaluator.min_max()
+
+        self.assertEqual(search_moves.call_count, 0)
+        self.assertEqual(position_eval, 1.25)
+        self.assertEqual(self.evaluator.best_move, chess.Move.from_uci('g1f3'))
+
+    def test_min_max_restores_the_board_when_the_deadline_is_over(self):
+        self.evaluator.deadline = SearchDeadline(0)
+        self.evaluator.deadline.ends_at += 0.01
+
+        with self.assertRaises(SearchTimeout):
+            self.evaluator.min_max()
+        self.assertEqual(self.evaluator.board, chess.Board())
+
+    def test_hash_move_is_considered_first(self):
+        moves_to_be_considered = list(self.evaluator.get_moves_to_be_considered(2, chess.Move.from_uci('g1f3')))
+
+        self.assertEqual(moves_to_be_considered[0], chess.Move.from_uci('g1f3'))
+        self.assertEqual(sorted(moves_to_be_considered, key=str), sorted(self.evaluator.board.legal_moves, key=str))
+
+    def test_quiescence_search_resolves_a_capture_at_depth_zero(self):
+        self.evaluator.board = chess.Board(fen='k7/p7/8/3q4/8/2N5/P7/K7 w - - 0 1')
+        self.evaluator.depth = 0
+        static_eval = self.evaluator.get_static_eval()
+
+        position_eval = self.evaluator.min_max()
+
+        self.assertGreater(position_eval, static_eval + 8)
+        self.assertEqual(self.evaluator.board, chess.Board(fen='k7/p7/8/3q4/8/2N5/P7/K7 w - - 0 1'))
+
+    def test_quiescence_search_stands_pat_instead_of_a_losing_capture(self):
+        self.evaluator.board = chess.Board(fen='k7/8/2p5/3p4/8/8/3Q4/K7 w - - 0 1')
+        self.evaluator.depth = 0
+
+        self.assertEqual(self.evaluator.min_max(), self.evaluator.get_static_eval())
+
+    def test_quiescence_nodes_are_counted_apart(self):
+        self.evaluator.board = chess.Board(fen='k7/p7/8/3q4/8/2N5/P7/K7 w - - 0 1')
+        self.evaluator.depth = 0
+        self.evaluator.statistics = SearchStatistics()
+
+        self.evaluator.min_max()
+
+        self.assertEqual(self.evaluator.statistics.nodes, 1)
+        self.assertEqual(self.evaluator.statistics.quiescence_nodes, 2)
+
+    def test_static_eval_at_depth_zero_without_quiescence(self):
+        self.evaluator.board = chess.Board(fen='k7/p7/8/3q4/8/2N5/P7/K7 w - - 0 1')
+        self.evaluator.depth = 0
+
+        with patch.object(MinMaxEvaluator, 'QUIESCENCE_MAX_DEPTH', 0):
+            position_eval = self.evaluator.min_max()
+
+        self.assertEqual(position_eval, self.evaluator.get_static_eval())
+
+    def test_null_move_cutoff_far_above_beta(self):
+        self.evaluator = MinMaxEvaluator(None, float('-inf'), 0, 4, chess.Board(fen='k7/p7/8/8/8/8/P7/KQ6 w - - 0 1'),
+                                         statistics=SearchStatistics(), is_root=False)
+
+        self.assertEqual(self.evaluator.min_max(), 0)
+        self.assertEqual(self.evaluator.statistics.null_move_cutoffs, 1)
+
+    def test_no_null_move_with_only_pawns_for_the_side_to_move(self):
+        self.evaluator = MinMaxEvaluator(None, float('-inf'), 0, 4, chess.Board(fen='k7/p7/8/8/8/8/PP6/K7 w - - 0 1'),
+                                         statistics=SearchStatistics(), is_root=False)
+
+        self.assertIsNone(self.evaluator.forward_pruning_eval(4, float('-inf'), 0, 0))
+        self.assertEqual(self.evaluator.statistics.nodes, 0)
+
+    def test_futile_quiet_moves_are_pruned_near_the_leaves(self):
+        board = chess.Board(fen='k7/p7/8/3q4/8/8/P7/K7 w - - 0 1')
+        self.evaluator = MinMaxEvaluator(None, 0, float('inf'), 1, board, statistics=SearchStatistics(),
+                                         is_root=False)
+
+        self.assertEqual(self.evaluator.min_max(), 0)
+        self.assertEqual(self.evaluator.statistics.futile_moves, board.legal_moves.count())
+
+    def test_root_is_never_pruned(self):
+        self.evaluator = MinMaxEvaluator(None, 0, float('inf'), 1, chess.Board(fen='k7/p7/8/3q4/8/8/P7/K7 w - - 0 1'),
+                                         statistics=SearchStatistics())
+
+        self.evaluator.min_max()
+
+        self.assertEqual(self.evaluator.statistics.futile_moves, 0)
+
+    def test_late_quiet_moves_are_reduced(self):
+        self.evaluator.statistics = SearchStatistics()
+
+        self.evaluator.min_max()
+
+        self.assertGreater(self.evaluator.statistics.late_move_reductions, 0)
+        self.assertIn(self.evaluator.best_move, chess.Board().legal_moves)
@@ -0,0 +1,78 @@
+import chess
+
+import definitions_and_factor_weights
+from engine import Engine
+from PositionEvaluation.evaluation_cache import EvaluationCache
+from PositionEvaluation.piece_square_tables import compile_piece_square_tables, piece_square_tables
+from PositionEvaluation.position_evaluator import PositionEvaluator
+from Search.search_board import SearchBoard
+
+from unittest import TestCase
+
+
+class EvaluationCacheTest(TestCase):
+    def setUp(self):
+        self.cache = EvaluationCache(memory_limit_mb=1)
+        self.position_evaluator = PositionEvaluator(self.cache)
+
+    def test_memory_limit_bounds_the_number_of_slots(self):
+        self.assertEqual(self.cache.size, 1024 * 1024 // EvaluationCache.ENTRY_SIZE_IN_BYTES)
+        self.assertEqual(len(self.cache.keys), 0)
+        self.assertIsNone(self.cache.get(1))
+
+        self.cache.store(1, 0.5)
+
+        self.assertEqual(len(self.cache.keys), self.cache.size)
+
+    def test_allocated_by_a_search_that_stores_evaluations(self):
+        engine = Engine()
+        self.assertIsNone(engine.evaluation_cache)
+        engine.MAX_DEPTH = 1
+
+        engine.suggest_move(chess.Board())
+        self.assertEqual(len(engine.evaluation_cache.keys), 0)  # the incremental evaluation doesn't look it up
+
+        engine = Engine()
+        engine.MAX_DEPTH = 1
+        engine.USE_INCREMENTAL_EVALUATION = False
+        engine.EVALUATION_CACHE_SIZE_MB = 2  # applied after __init__
+        engine.suggest_move(chess.Board())
+        self.assertEqual(len(engine.evaluation_cache.keys), 2 * 1024 * 1024 // EvaluationCache.ENTRY_SIZE_IN_BYTES)
+
+    def test_a_position_replaces_the_one_in_its_slot(self):
+        self.cache.store(1, 0.5)
+        self.cache.store(1 + self.cache.size, 1.5)
+
+        self.assertIsNone(self.cache.get(1))
+        self.assertEqual(self.cache.get(1 + self.cache.size), 1.5)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_evaluations_of_a_search_board_are_looked_up(self):
+        board = SearchBoard('r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1')
+
+        evaluations = [self.position_evaluator.evaluate_position(board, game_state_evaluation=False)
+                       for _ in range(2)]
+
+        self.assertEqual(evaluations, [PositionEvaluator().evaluate_position(board, game_state_evaluation=False)] * 2)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_cleared_when_the_weights_change(self):
+        board = SearchBoard()
+        board.push_uci('e2e4')
+        self.position_evaluator.evaluate_position(board, game_state_evaluation=False)
+        positional_values = definitions_and_factor_weights.positional_values_dict
+        close_center_weight = positional_values['piece_positioned_in_the_close_center']
+        pawn_on_e4 = piece_square_tables[chess.WHITE][chess.PAWN][chess.E4]
+        try:
+            positional_values['piece_positioned_in_the_close_center'] = 2
+            self.cache.check_weights()
+
+            self.assertAlmostEqual(piece_square_tables[chess.WHITE][chess.PAWN][chess.E4] - pawn_on_e4,
+                                   2 - close_center_weight)  # compiled again by check_weights
+            self.assertIsNone(self.cache.get(board.zobrist_key))
+            self.assertEqual(self.position_evaluator.evaluate_position(board, game_state_evaluation=False),
+                             PositionEvaluator().evaluate_position(chess.Board(board.fen()),
+                                                                  game_state_evaluation=False))
+        finally:
+            positional_values['piece_positioned_in_the_close_center'] = close_center_weight
+            compile_piece_square_tables()
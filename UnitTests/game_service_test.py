@@ -0,0 +1,129 @@
+import asyncio
+import json
+from unittest import IsolatedAsyncioTestCase, TestCase
+
+import chess
+
+import game_service
+from game_service import GameService, ServiceBusy, search_game_position, start_server
+
+MATE_IN_ONE_FEN = '3k4/8/3K4/5R2/8/8/8/8 w - - 0 1'
+
+
+class SearchGamePositionTest(TestCase):
+    def tearDown(self):
+        game_service._worker_engines.clear()
+
+    def test_every_game_keeps_its_own_engine(self):
+        first = search_game_position(1, MATE_IN_ONE_FEN, [], None, 0, {'MAX_DEPTH': 2})
+        search_game_position(2, chess.STARTING_FEN, ['e2e4'], None, 0, {'MAX_DEPTH': 1})
+
+        self.assertEqual(first.move, 'f5f8')
+        self.assertEqual(game_service._worker_engines[1].LAST_EVAL, None)
+        self.assertIsNot(game_service._worker_engines[1].transposition_table,
+                         game_service._worker_engines[2].transposition_table)
+        self.assertEqual(game_service._worker_engines[2].MAX_DEPTH, 1)
+
+    def test_games_keep_a_small_evaluation_cache(self):
+        search_game_position(1, chess.STARTING_FEN, [], None, 0, {'MAX_DEPTH': 1, 'USE_INCREMENTAL_EVALUATION': False})
+        search_game_position(2, chess.STARTING_FEN, [], None, 0, {'MAX_DEPTH': 1, 'USE_EVALUATION_CACHE': False})
+
+        evaluation_cache = game_service._worker_engines[1].evaluation_cache
+        self.assertEqual(evaluation_cache.size * evaluation_cache.ENTRY_SIZE_IN_BYTES,
+                         game_service.GAME_EVALUATION_CACHE_SIZE_MB * 1024 * 1024)
+        self.assertEqual(len(evaluation_cache.keys), evaluation_cache.size)
+        self.assertIsNone(game_service._worker_engines[2].evaluation_cache)
+
+
+class GameServiceTest(IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.service = GameService(workers=1)
+
+    def tearDown(self):
+        self.service.close()
+
+    async def test_suggest_move_plays_it_in_the_game(self):
+        game = self.service.new_game(MATE_IN_ONE_FEN, settings={'MAX_DEPTH': 2})
+
+        result = await self.service.suggest_move(game.game_id, deadline=5)
+
+        self.assertEqual(result.move, 'f5f8')
+        self.assertEqual(game.board.peek(), chess.Move.from_uci('f5f8'))
+        self.assertEqual(game.last_eval, result.eval)
+
+    async def test_games_are_searched_concurrently_and_keep_their_evaluations(self):
+        games = [self.service.new_game(settings={'MAX_DEPTH': 1}) for _ in range(3)]
+        mating_game = self.service.new_game(MATE_IN_ONE_FEN, settings={'MAX_DEPTH': 2})
+
+        results = await asyncio.gather(*[self.service.suggest_move(game.game_id, deadline=5)
+                                         for game in games + [mating_game]])
+
+        self.assertGreater(mating_game.last_eval, 1000)
+        self.assertTrue(all(abs(game.last_eval) < 1000 for game in games))
+        self.assertEqual(results[-1].move, 'f5f8')
+
+    async def test_searches_beyond_the_queue_limit_are_refused(self):
+        self.service.max_queued_searches = 1
+        games = [self.service.new_game(settings={'MAX_DEPTH': 1}) for _ in range(2)]
+
+        results = await asyncio.gather(*[self.service.suggest_move(game.game_id, deadline=5) for game in games],
+                                       return_exceptions=True)
+
+        self.assertIsInstance(results[1], ServiceBusy)
+        self.assertEqual(self.service.queued_searches, 0)
+
+    async def test_opening_book_is_not_probed_after_leaving_it(self):
+        class OneMoveBook:
+            probes = 0
+
+            def get(self, board):
+                self.probes += 1
+                return None
+
+        book = OneMoveBook()
+        self.service.opening_books[chess.WHITE] = book
+        game = self.service.new_game(settings={'MAX_DEPTH': 1})
+
+        await self.service.suggest_move(game.game_id, deadline=5)
+        await self.service.push_move(game.game_id, 'e7e5')
+        await self.service.suggest_move(game.game_id, deadline=5)
+
+        self.assertEqual(book.probes, 1)
+        self.assertFalse(game.in_book)
+
+    async def test_a_move_pushed_during_a_search_is_played_after_the_searched_move(self):
+        game = self.service.new_game(settings={'MAX_DEPTH': 1})
+
+        result, _ = await asyncio.gather(self.service.suggest_move(game.game_id, deadline=5),
+                                         self.service.push_move(game.game_id, 'e7e5'))
+
+        self.assertEqual([move.uci() for move in game.board.move_stack], [result.move, 'e7e5'])
+
+    async def test_requests_over_a_connection(self):
+        server = await start_server(self.service, port=0)
+        try:
+            reader, writer = await asyncio.open_connection(*server.sockets[0].getsockname()[:2])
+            requests = [{'id': 1, 'command': 'new_game', 'fen': MATE_IN_ONE_FEN, 'settings': {'MAX_DEPTH': 2}},
+                        {'id': 2, 'command': 'push_move', 'game_id': 1, 'move': 'f5f6'},
+                        {'id': 3, 'command': 'new_game', 'settings': {'NOT_A_SETTING': 1}},
+                        [1, 2],
+                        {'id': 4, 'command': 'push_move', 'game_id': 1, 'move': 7},
+                        {'id': 5, 'command': 'status'}]
+            responses = []
+            for request in requests:
+                writer.write(json.dumps(request).encode() + b'\n')
+                await writer.drain()
+                responses.append(json.loads(await reader.readline()))
+            writer.close()
+        finally:
+            server.close()
+            await server.wait_closed()
+
+        self.assertEqual(responses[0], {'id': 1, 'game_id': 1, 'fen': MATE_IN_ONE_FEN})
+        self.assertEqual(responses[1]['fen'], '3k4/8/3K1R2/8/8/8/8/8 b - - 1 1')
+        self.assertEqual(responses[2], {'id': 3, 'error': 'Unknown engine setting NOT_A_SETTING'})
+        self.assertEqual(responses[3], {'id': None, 'error': "Invalid request: AttributeError: 'list' object has no "
+                                                             "attribute 'get'"})
+        self.assertEqual(responses[4]['id'], 4)
+        self.assertIn('error', responses[4])
+        self.assertEqual(responses[5]['games'], 1)
@@ -0,0 +1,64 @@
+import random
+from unittest import TestCase
+
+import chess
+
+from PositionEvaluation.incremental_evaluator import IncrementalEvaluator
+from PositionEvaluation.position_evaluator import PositionEvaluator
+
+
+class IncrementalEvaluatorTest(TestCase):
+    def setUp(self):
+        self.position_evaluator = PositionEvaluator()
+
+    def _test_push_then_assert_same_as_full_evaluation(self, fen, uci):
+        board = chess.Board(fen)
+        incremental_evaluator = IncrementalEvaluator(board)
+        initial_eval = incremental_evaluator.static_eval
+
+        incremental_evaluator.push(board, chess.Move.from_uci(uci))
+        self.assertAlmostEqual(incremental_evaluator.static_eval,
+                               self.position_evaluator.evaluate_position(board, game_state_evaluation=False))
+
+        incremental_evaluator.pop(board)
+        self.assertEqual(incremental_evaluator.static_eval, initial_eval)
+        self.assertEqual(board.fen(), fen)
+
+    def test_quiet_move(self):
+        self._test_push_then_assert_same_as_full_evaluation(chess.STARTING_FEN, 'e2e4')
+
+    def test_capture(self):
+        self._test_push_then_assert_same_as_full_evaluation(
+            'rnbqkbnr/ppp1pppp/8/3p4/4P3/8/PPPP1PPP/RNBQKBNR w KQkq - 0 2', 'e4d5')
+
+    def test_kingside_and_queenside_castling(self):
+        fen = 'r3k2r/pppq1ppp/2npbn2/2b1p3/2B1P3/2NPBN2/PPPQ1PPP/R3K2R w KQkq - 4 8'
+        self._test_push_then_assert_same_as_full_evaluation(fen, 'e1g1')
+        self._test_push_then_assert_same_as_full_evaluation(fen, 'e1c1')
+
+    def test_en_passant(self):
+        self._test_push_then_assert_same_as_full_evaluation(
+            'rnbqkbnr/ppp1p1pp/8/3pPp2/8/8/PPPP1PPP/RNBQKBNR w KQkq f6 0 3', 'e5f6')
+
+    def test_promotion_with_capture(self):
+        self._test_push_then_assert_same_as_full_evaluation('1r2k3/2P5/8/8/8/8/8/4K3 w - - 0 1', 'c7b8q')
+        self._test_push_then_assert_same_as_full_evaluation('1r2k3/2P5/8/8/8/8/8/4K3 w - - 0 1', 'c7c8n')
+
+    def test_follows_a_random_game(self):
+        board = chess.Board()
+        incremental_evaluator = IncrementalEvaluator(board)
+        randomizer = random.Random(7)
+        while not board.is_game_over() and board.ply() < 200:
+            incremental_evaluator.push(board, randomizer.choice(list(board.legal_moves)))
+            self.assertAlmostEqual(incremental_evaluator.static_eval,
+                                   self.position_evaluator.evaluate_position(board, game_state_evaluation=False))
+
+        while board.move_stack:
+            incremental_evaluator.pop(board)
+        self.assertAlmostEqual(incremental_evaluator.static_eval,
+                               self.position_evaluator.evaluate_position(board, game_state_evaluation=False))
+
+    def test_evaluate_returns_the_finished_game_evaluation_when_the_game_is_over(self):
+        board = chess.Board(fen='k1R5/8/1K6/8/8/8/8/8 b - - 0 1')
+
+        self.assertEqual(IncrementalEvaluator(board).evaluate(board), PositionEvaluator.finished_game_evaluation(board))
@@ -0,0 +1,47 @@
+import chess
+
+from Search.move_buffers import MoveBuffers
+from Search.move_encoding import decoded_move, encode_move
+
+from unittest import TestCase
+
+
+def legal_captures_and_promotions(board: chess.Board):
+    return sorted(move.uci() for move in board.legal_moves if board.is_capture(move) or move.promotion)
+
+
+class MoveBuffersTest(TestCase):
+    def setUp(self):
+        self.move_buffers = MoveBuffers(plies=2)
+
+    def generated_captures(self, board: chess.Board, ply=0):
+        count = self.move_buffers.generate_captures(board, ply)
+        return [decoded_move(self.move_buffers.moves[ply][index]) for index in range(count)]
+
+    def test_generates_the_legal_captures_and_promotions(self):
+        for fen in [chess.STARTING_FEN,
+                    'r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1',
+                    '4k3/8/8/3p4/1q3N2/2P5/3Q4/4K3 w - - 0 1',
+                    # Promotions, with and without a capture, and an en passant capture
+                    'r3k3/1P6/8/3pP3/8/8/6p1/4K2R w - d6 0 1',
+                    'r3k3/1P6/8/8/8/8/6p1/4K2R b - - 0 1']:
+            board = chess.Board(fen)
+            generated_moves = self.generated_captures(board)
+
+            self.assertEqual(sorted(move.uci() for move in generated_moves if board.is_legal(move)),
+                             legal_captures_and_promotions(board))
+
+    def test_pick_best_by_most_valuable_victim_then_least_valuable_attacker(self):
+        board = chess.Board('4k3/8/8/3p4/1q3N2/2P5/3Q4/4K3 w - - 0 1')
+        count = self.move_buffers.generate_captures(board, 1)
+
+        picked_moves = [decoded_move(self.move_buffers.pick_best(1, index, count)) for index in range(count)]
+
+        self.assertEqual([move.uci() for move in picked_moves], ['c3b4', 'f4d5', 'd2d5'])
+        self.assertEqual(list(self.move_buffers.gains[1][:count]), [9, 1, 1])
+
+    def test_decoded_move_is_looked_up_once(self):
+        move = chess.Move.from_uci('b7a8q')
+
+        self.assertEqual(decoded_move(encode_move(move)), move)
+        self.assertIs(decoded_move(encode_move(move)), decoded_move(encode_move(move)))
@@ -0,0 +1,64 @@
+import chess
+
+from Search.move_buffers import MoveBuffers
+from Search.move_encoding import decoded_move
+from Search.move_ordering import MoveOrderer
+
+from unittest import TestCase
+
+
+class MoveOrdererTest(TestCase):
+    def setUp(self):
+        self.move_orderer = MoveOrderer()
+        # White can take the queen with the pawn, or the pawn on d5 with the knight or the queen
+        self.board = chess.Board(fen='4k3/8/8/3p4/1q3N2/2P5/3Q4/4K3 w - - 0 1')
+
+    def test_orders_all_the_legal_moves(self):
+        ordered_moves = self.move_orderer.order_moves(self.board)
+
+        self.assertEqual(sorted(ordered_moves, key=str), sorted(self.board.legal_moves, key=str))
+
+    def test_hash_move_first(self):
+        ordered_moves = self.move_orderer.order_moves(self.board, hash_move=chess.Move.from_uci('e1f2'))
+
+        self.assertEqual(ordered_moves[0], chess.Move.from_uci('e1f2'))
+
+    def test_captures_by_most_valuable_victim_then_least_valuable_attacker(self):
+        ordered_moves = self.move_orderer.order_moves(self.board)
+
+        self.assertEqual(ordered_moves[:3], [chess.Move.from_uci('c3b4'), chess.Move.from_uci('f4d5'),
+                                             chess.Move.from_uci('d2d5')])
+
+    def test_killer_moves_after_captures(self):
+        self.move_orderer.record_cutoff(self.board, chess.Move.from_uci('e1f1'), depth=2)
+        self.move_orderer.record_cutoff(self.board, chess.Move.from_uci('e1e2'), depth=2)
+
+        ordered_moves = self.move_orderer.order_moves(self.board)
+
+        self.assertEqual(ordered_moves[3:5], [chess.Move.from_uci('e1e2'), chess.Move.from_uci('e1f1')])
+
+    def test_captures_are_not_killer_moves(self):
+        self.move_orderer.record_cutoff(self.board, chess.Move.from_uci('c3b4'), depth=2)
+
+        self.assertEqual(self.move_orderer.killer_moves, {})
+
+    def test_quiet_moves_by_history(self):
+        board = chess.Board()
+        self.move_orderer.history[MoveOrderer._history_index(chess.WHITE, chess.Move.from_uci('g2g3'))] = 4
+        self.move_orderer.history[MoveOrderer._history_index(chess.WHITE, chess.Move.from_uci('b1c3'))] = 9
+
+        ordered_moves = self.move_orderer.order_moves(board)
+
+        self.assertEqual(ordered_moves[:2], [chess.Move.from_uci('b1c3'), chess.Move.from_uci('g2g3')])
+
+    def test_scored_moves_are_picked_in_the_order_of_order_moves(self):
+        board = chess.Board('r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1')
+        self.move_orderer.record_cutoff(board, chess.Move.from_uci('a1b1'), depth=2)
+        self.move_orderer.record_cutoff(board, chess.Move.from_uci('e1d1'), depth=3)
+        hash_move = chess.Move.from_uci('g2g3')
+        move_buffers = MoveBuffers(plies=1)
+
+        count = self.move_orderer.score_moves(board, move_buffers, 1, hash_move)
+
+        self.assertEqual([decoded_move(move_buffers.pick_best(1, index, count)) for index in range(count)],
+                         self.move_orderer.order_moves(board, hash_move))
@@ -0,0 +1,91 @@
+import os
+import random
+from unittest import TestCase
+
+import chess
+from chess.polyglot import MemoryMappedReader
+
+from engine import Engine
+from OpeningBooks.opening_book_index import OpeningBookIndex, decode_book_move, load_opening_book
+from OpeningBooks.opening_books import load_opening_books
+
+
+class OpeningBookIndexTest(TestCase):
+    def setUp(self):
+        base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        self.book_path = os.path.join(base_dir, 'data/openings/white_repertoire.bin')
+        self.opening_book = OpeningBookIndex.from_files(self.book_path)
+
+    def test_same_entries_as_memory_mapped_reader(self):
+        randomizer = random.Random(0)
+        with MemoryMappedReader(self.book_path) as reader:
+            for _ in range(20):
+                board = chess.Board()
+                for _ in range(12):
+                    expected_entries = list(reader.find_all(board))
+                    self.assertEqual(self.opening_book.find_all(board), expected_entries)
+                    if not expected_entries:
+                        break
+                    board.push(randomizer.choice(expected_entries).move)
+
+    def test_repertoires_are_loaded_from_any_working_directory(self):
+        working_directory = os.getcwd()
+        try:
+            os.chdir(os.path.dirname(self.book_path))
+            white_book, black_book = load_opening_books()
+        finally:
+            os.chdir(working_directory)
+
+        self.assertIs(white_book, load_opening_book(self.book_path))
+        self.assertEqual(white_book.get(chess.Board()), self.opening_book.get(chess.Board()))
+        self.assertIsNot(black_book, white_book)
+
+    def test_get_returns_the_entry_with_the_highest_weight(self):
+        with MemoryMappedReader(self.book_path) as reader:
+            self.assertEqual(self.opening_book.get(chess.Board()), reader.get(chess.Board()))
+
+    def test_position_out_of_the_book(self):
+        board = chess.Board('4k3/8/8/8/8/8/8/4K2R w K - 0 1')
+
+        self.assertIsNone(self.opening_book.get(board))
+        with self.assertRaises(IndexError):
+            self.opening_book.choice(board)
+
+    def test_choice_is_weighted(self):
+        randomizer = random.Random(0)
+        board = chess.Board()
+        weights = {entry.move: entry.weight for entry in self.opening_book.find_all(board)}
+
+        chosen_moves = [self.opening_book.choice(board, randomizer).move for _ in range(200)]
+
+        self.assertTrue(set(chosen_moves) <= set(weights))
+        most_chosen_move = max(set(chosen_moves), key=chosen_moves.count)
+        self.assertEqual(most_chosen_move, max(weights, key=weights.get))
+
+    def test_castling_is_decoded_from_king_takes_rook(self):
+        board = chess.Board('4k3/8/8/8/8/8/8/4K2R w K - 0 1')
+        raw_move = chess.E1 << 6 | chess.H1
+
+        self.assertEqual(decode_book_move(board, raw_move), chess.Move.from_uci('e1g1'))
+
+    def test_shared_book_has_the_same_entries(self):
+        shared_book = self.opening_book.share()
+        attached_book = OpeningBookIndex.attach(shared_book.name, len(shared_book))
+        try:
+            self.assertEqual(attached_book.find_all(chess.Board()), self.opening_book.find_all(chess.Board()))
+            with self.assertRaises(ValueError):
+                attached_book.keys[0] = 0
+        finally:
+            attached_book.close()
+            shared_book.unlink()
+            shared_book.close()
+
+    def test_engine_plays_a_random_book_move(self):
+        engine = Engine(self.opening_book)
+        engine.USE_OPENING_BOOKS = True
+        engine.RANDOM_BOOK_MOVES = True
+
+        move = engine.suggest_move(chess.Board())
+
+        self.assertIn(move, [entry.move for entry in self.opening_book.find_all(chess.Board())])
+        self.assertEqual(engine.LAST_NODES, 0)
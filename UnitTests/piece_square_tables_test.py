@@ -0,0 +1,62 @@
+import random
+from unittest import TestCase
+from unittest.mock import patch
+
+import chess
+
+from definitions_and_factor_weights import positional_values_dict
+from PositionEvaluation.evaluation_functions import piece_is_forward, piece_in_the_center, pawn_is_advanced, \
+    get_material_evaluation
+from PositionEvaluation.piece_square_tables import piece_square_tables, positional_piece_square_tables, \
+    compile_piece_square_tables, evaluate_from_bitboards, recompile_if_weights_changed
+from PositionEvaluation.position_evaluator import PositionEvaluator
+from engine import Engine
+
+
+class PieceSquareTablesTest(TestCase):
+    def test_tables_hold_the_evaluation_functions_values(self):
+        for color in chess.COLORS:
+            for piece_type in chess.PIECE_TYPES:
+                piece = chess.Piece(piece_type, color)
+                for square in chess.SQUARES:
+                    positional_value = piece_is_forward(piece, square) + piece_in_the_center(piece, square) + \
+                                       pawn_is_advanced(piece, square)
+                    self.assertAlmostEqual(positional_piece_square_tables[color][piece_type][square], positional_value)
+                    self.assertAlmostEqual(piece_square_tables[color][piece_type][square],
+                                           positional_value + get_material_evaluation(piece))
+
+    def test_bitboard_evaluation_is_the_same_as_evaluating_piece_by_piece(self):
+        piece_by_piece_evaluator = PositionEvaluator()
+        piece_by_piece_evaluator.USE_BITBOARD_EVALUATION = False
+        randomizer = random.Random(3)
+        board = chess.Board()
+        for _ in range(300):
+            if board.is_game_over():
+                board = chess.Board()
+            board.push(randomizer.choice(list(board.legal_moves)))
+
+            self.assertAlmostEqual(evaluate_from_bitboards(board),
+                                   piece_by_piece_evaluator.evaluate_position(board, game_state_evaluation=False))
+
+    def test_compile_piece_square_tables_picks_up_new_weights(self):
+        board = chess.Board(fen='rnbqkbnr/pppppppp/8/8/3P4/8/PPP1PPPP/RNBQKBNR b KQkq - 0 1')
+        try:
+            with patch.dict(positional_values_dict, {'piece_positioned_in_the_close_center': 1.6}):
+                compile_piece_square_tables()
+                self.assertAlmostEqual(piece_square_tables[chess.WHITE][chess.PAWN][chess.D4], 1 + 0.03 + 1.6)
+                self.assertAlmostEqual(evaluate_from_bitboards(board), 1.6 + 0.02)
+        finally:
+            compile_piece_square_tables()
+        self.assertAlmostEqual(evaluate_from_bitboards(board), 0.6 + 0.02)
+
+    def test_a_search_compiles_the_weights_changed_at_runtime(self):
+        board = chess.Board(fen='rnbqkbnr/pppppppp/8/8/3P4/8/PPP1PPPP/RNBQKBNR b KQkq - 0 1')
+        try:
+            with patch.dict(positional_values_dict, {'piece_positioned_in_the_close_center': 1.6}):
+                evaluator = Engine().create_evaluator(board, depth=1)
+
+                self.assertAlmostEqual(evaluator.get_static_eval(game_state_evaluation=False), 1.6 + 0.02)
+                self.assertFalse(recompile_if_weights_changed())
+        finally:
+            self.assertTrue(recompile_if_weights_changed())
+        self.assertAlmostEqual(evaluate_from_bitboards(board), 0.6 + 0.02)
@@ -0,0 +1,54 @@
+import random
+from unittest import TestCase
+
+import chess
+
+from Search.repetition_history import RepetitionHistory
+from Search.transposition_table import position_key
+
+
+class RepetitionHistoryTest(TestCase):
+    def _test_is_draw_same_as_python_chess(self, board: chess.Board, repetition_history: RepetitionHistory):
+        self.assertEqual(repetition_history.is_draw(board, position_key(board)),
+                         board.is_fivefold_repetition() or board.is_seventyfive_moves())
+
+    def test_knight_moves_back_and_forth(self):
+        board = chess.Board()
+        repetition_history = RepetitionHistory(board)
+        for _ in range(5):
+            for uci in ['g1f3', 'g8f6', 'f3g1', 'f6g8']:
+                repetition_history.push(position_key(board))
+                board.push_uci(uci)
+                self._test_is_draw_same_as_python_chess(board, repetition_history)
+        self.assertTrue(board.is_fivefold_repetition())
+
+    def test_history_is_read_from_the_move_stack(self):
+        board = chess.Board()
+        for uci in ['e2e4', 'e7e5'] + ['g1f3', 'g8f6', 'f3g1', 'f6g8'] * 4:
+            board.push_uci(uci)
+            self._test_is_draw_same_as_python_chess(board, RepetitionHistory(board))
+
+    def test_capture_resets_the_repetitions(self):
+        board = chess.Board('4k3/8/8/3p4/8/8/8/R3K3 w - - 0 1')
+        moves = ['a1a2', 'e8d8', 'a2a1', 'd8e8'] * 3 + ['a1a5', 'e8d8', 'a5d5', 'd8c8'] + \
+            ['d5d6', 'c8b8', 'd6d5', 'b8c8'] * 4
+        for uci in moves:
+            board.push_uci(uci)
+            self._test_is_draw_same_as_python_chess(board, RepetitionHistory(board))
+
+    def test_seventy_five_moves(self):
+        board = chess.Board('4k3/8/8/8/8/8/8/R3K3 w - - 149 120')
+        board.push_uci('a1a2')
+        self.assertTrue(RepetitionHistory(board).is_draw(board, position_key(board)))
+
+    def test_random_games(self):
+        randomizer = random.Random(0)
+        for _ in range(5):
+            board = chess.Board('4k3/8/8/8/8/8/8/R3K2R w - - 0 1')
+            repetition_history = RepetitionHistory(board)
+            for _ in range(200):
+                repetition_history.push(position_key(board))
+                board.push(randomizer.choice(list(board.legal_moves)))
+                self._test_is_draw_same_as_python_chess(board, repetition_history)
+                if board.is_game_over():
+                    break
@@ -0,0 +1,61 @@
+import copy
+from unittest import TestCase
+
+import chess
+
+from Benchmarks.search_benchmark import read_positions, run_benchmark, compare_with_baseline, best_move_changes, \
+    compare_pruning, PRUNING_SWITCHES
+from engine import MinMaxEvaluator
+
+
+class SearchBenchmarkTest(TestCase):
+    def setUp(self):
+        positions = {position_id: (position_id, board, expected_moves)
+                     for position_id, board, expected_moves in read_positions()}
+        self.results = run_benchmark([positions['tactic.mate_in_one'], positions['endgame.pawns']], depth=2)
+
+    def test_results_of_every_position(self):
+        result = self.results['positions']['tactic.mate_in_one']
+
+        self.assertEqual(result['best_move'], 'f5f8')
+        self.assertEqual(result['expected_moves'], ['f5f8'])
+        self.assertGreater(result['nodes'], 0)
+        self.assertEqual(len(self.results['positions']['endgame.pawns']['time_to_depth']), 2)
+        self.assertEqual(self.results['total']['nodes'],
+                         sum(result['nodes'] + result['quiescence_nodes']
+                             for result in self.results['positions'].values()))
+
+    def test_same_results_are_no_regression(self):
+        self.assertEqual(compare_with_baseline(self.results, self.results, threshold=0.1), [])
+
+    def test_more_nodes_than_the_threshold_allow_is_a_regression(self):
+        baseline = copy.deepcopy(self.results)
+        baseline['positions']['endgame.pawns']['nodes'] //= 2
+        baseline['positions']['endgame.pawns']['quiescence_nodes'] //= 2
+
+        regressions = compare_with_baseline(self.results, baseline, threshold=0.1)
+
+        self.assertEqual(len(regressions), 1)
+        self.assertTrue(regressions[0].startswith('endgame.pawns'))
+
+    def test_fewer_nodes_per_second_than_the_threshold_allow_is_a_regression(self):
+        baseline = copy.deepcopy(self.results)
+        baseline['total']['nodes_per_second'] *= 2
+
+        self.assertEqual(len(compare_with_baseline(self.results, baseline, threshold=0.1)), 1)
+
+    def test_best_move_changes(self):
+        baseline = copy.deepcopy(self.results)
+        baseline['positions']['tactic.mate_in_one']['best_move'] = chess.Move.from_uci('f5f7').uci()
+
+        self.assertEqual(best_move_changes(self.results, baseline), ['tactic.mate_in_one: f5f8, f5f7 in the baseline'])
+
+    def test_compare_pruning_switches_every_technique(self):
+        positions = [position for position in read_positions() if position[0] == 'tactic.mate_in_one']
+
+        comparison = compare_pruning(positions, depth=2)
+
+        self.assertEqual(list(comparison), ['default'] +
+                         [f'{"without" if getattr(MinMaxEvaluator, name) else "with"} {name}'
+                          for name in PRUNING_SWITCHES] + ['no pruning'])
+        self.assertTrue(all(total['solved'] == 1 for total in comparison.values()))
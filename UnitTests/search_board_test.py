@@ -0,0 +1,74 @@
+import chess
+import chess.polyglot
+
+from Benchmarks.perft import read_perft_positions, run_perft
+from Search.search_board import SearchBoard
+from Search.transposition_table import position_key
+
+from unittest import TestCase
+
+
+class SearchBoardTest(TestCase):
+    def assert_same_positions(self, search_board: SearchBoard, board: chess.Board, depth: int):
+        # Every move played and taken back on both boards, down to the depth
+        self.assertEqual(search_board.fen(), board.fen())
+        self.assertEqual(search_board.zobrist_key, chess.polyglot.zobrist_hash(board))
+        if depth == 0:
+            return
+        for move in board.legal_moves:
+            search_board.push(move)
+            board.push(move)
+            self.assert_same_positions(search_board, board, depth - 1)
+            search_board.pop()
+            board.pop()
+
+    def test_perft_of_the_standard_positions(self):
+        self.assertEqual(run_perft(read_perft_positions(), max_depth=2, print_positions=False), [])
+
+    def test_position_and_key_after_every_move(self):
+        for fen in ['r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1',
+                    # Promotions, with and without a capture, and an en passant capture
+                    'r3k3/1P6/8/3pP3/8/8/6p1/4K2R w K d6 0 1']:
+            board = chess.Board(fen)
+
+            self.assert_same_positions(SearchBoard.from_board(board), board, depth=2)
+
+    def test_null_move(self):
+        board = chess.Board(fen='4k3/8/8/3pP3/8/8/8/4K3 w - d6 0 1')
+        search_board = SearchBoard.from_board(board)
+
+        search_board.push(chess.Move.null())
+        board.push(chess.Move.null())
+
+        self.assertEqual(search_board.fen(), board.fen())
+        self.assertEqual(position_key(search_board), position_key(board))
+        search_board.pop()
+        board.pop()
+        self.assertEqual(search_board.fen(), board.fen())
+        self.assertEqual(position_key(search_board), position_key(board))
+
+    def test_repetitions_of_the_game_and_of_the_search(self):
+        board = chess.Board()
+        for uci in ['g1f3', 'g8f6', 'f3g1', 'f6g8'] * 2 + ['g1f3']:
+            board.push_uci(uci)
+        search_board = SearchBoard.from_board(board)
+
+        for uci in ['g8f6', 'f3g1', 'f6g8']:
+            search_board.push_uci(uci)
+            board.push_uci(uci)
+
+        self.assertTrue(search_board.is_repetition(4))
+        self.assertFalse(search_board.is_repetition(5))
+        self.assertTrue(board.is_repetition(4))
+
+    def test_converted_back_with_the_moves_of_the_game_and_of_the_search(self):
+        board = chess.Board()
+        board.push_uci('e2e4')
+        search_board = SearchBoard.from_board(board)
+        search_board.push_uci('e7e5')
+
+        converted_board = search_board.copy()
+
+        self.assertIs(type(converted_board), chess.Board)
+        self.assertEqual([move.uci() for move in converted_board.move_stack], ['e2e4', 'e7e5'])
+        self.assertEqual(board.move_stack, [chess.Move.from_uci('e2e4')])
@@ -0,0 +1,91 @@
+import os
+from unittest import TestCase
+
+import chess
+
+from engine import Engine
+from OpeningBooks.opening_book_index import load_opening_book
+from PositionEvaluation.evaluation_functions_mappings import evaluation_functions_mapping
+from PositionEvaluation.evaluation_profiling import timed_evaluation_terms
+from PositionEvaluation.position_evaluator import PositionEvaluator
+from Search.search_statistics import SearchStatistics
+
+
+class SearchStatisticsTest(TestCase):
+    def setUp(self):
+        self.engine = Engine()
+        self.engine.MAX_DEPTH = 4
+        self.board = chess.Board('r2q1rk1/pp2bppp/2n1pn2/3p4/3P4/2NBPN2/PP3PPP/R2Q1RK1 w - - 0 10')
+
+    def test_statistics_of_a_search(self):
+        self.engine.suggest_move(self.board)
+        statistics = self.engine.LAST_STATISTICS
+
+        self.assertEqual(sum(statistics.nodes_per_depth.values()), statistics.nodes)
+        self.assertEqual(statistics.nodes_per_depth[4], 1)
+        self.assertGreater(statistics.beta_cutoffs, 0)
+        self.assertTrue(0 < statistics.first_move_cutoff_rate <= 1)
+        self.assertGreater(statistics.static_evaluations, 0)
+        self.assertGreater(statistics.delta_evaluations, 0)
+        self.assertEqual(statistics.evaluations, statistics.static_evaluations + statistics.delta_evaluations +
+                         statistics.terminal_evaluations)
+        self.assertEqual(sum(statistics.intuition_list_sizes.values()), statistics.nodes_per_depth[4])
+        self.assertEqual(list(statistics.phase_seconds), ['depth 4'])
+        self.assertEqual(statistics.book_hits, 0)
+
+    def test_terminal_evaluations_are_counted(self):
+        self.engine.MAX_DEPTH = 1
+        self.engine.suggest_move(chess.Board('3k4/8/3K4/5R2/8/8/8/8 w - - 0 1'))
+
+        self.assertGreater(self.engine.LAST_STATISTICS.terminal_evaluations, 0)
+
+    def test_book_hits_are_counted(self):
+        base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        engine = Engine(load_opening_book(os.path.join(base_dir, 'data/openings/white_repertoire.bin')))
+        engine.USE_OPENING_BOOKS = True
+
+        engine.suggest_move(chess.Board())
+
+        self.assertEqual(engine.LAST_STATISTICS.book_hits, 1)
+        self.assertEqual(engine.LAST_STATISTICS.nodes, 0)
+        self.assertIn('book', engine.LAST_STATISTICS.phase_seconds)
+
+    def test_iterative_deepening_times_every_depth(self):
+        self.engine.MOVE_TIME = 10
+        self.engine.ITERATIVE_DEEPENING_MAX_DEPTH = 3
+
+        self.engine.suggest_move(self.board)
+
+        self.assertEqual(list(self.engine.LAST_STATISTICS.phase_seconds), ['depth 1', 'depth 2', 'depth 3'])
+
+    def test_first_move_cutoff_rate_without_cutoffs(self):
+        self.assertEqual(SearchStatistics().first_move_cutoff_rate, 0.0)
+
+
+class EvaluationProfilingTest(TestCase):
+    def test_evaluation_terms_are_timed_only_inside_the_context(self):
+        board = chess.Board('r2q1rk1/pp2bppp/2n1pn2/3p4/3P4/2NBPN2/PP3PPP/R2Q1RK1 w - - 0 10')
+        original_eval_funcs = dict(evaluation_functions_mapping)
+        expected_eval = PositionEvaluator().evaluate_position(board)
+
+        with timed_evaluation_terms() as timings:
+            self.assertAlmostEqual(PositionEvaluator().evaluate_position(board), expected_eval)
+
+        self.assertEqual(set(timings.calls), set(evaluation_functions_mapping))
+        self.assertEqual(timings.calls['space_advantage'], len(board.piece_map()))
+        self.assertEqual(evaluation_functions_mapping, original_eval_funcs)
+        self.assertTrue(PositionEvaluator.USE_BITBOARD_EVALUATION)
+
+    def test_every_evaluation_of_a_search_calls_the_terms(self):
+        engine = Engine()
+        engine.MAX_DEPTH = 4
+
+        with timed_evaluation_terms(engine) as timings:
+            engine.suggest_move(chess.Board('r2q1rk1/pp2bppp/2n1pn2/3p4/3P4/2NBPN2/PP3PPP/R2Q1RK1 w - - 0 10'))
+
+        statistics = engine.LAST_STATISTICS
+        self.assertEqual(timings.evaluations, statistics.static_evaluations + statistics.delta_evaluations)
+        self.assertEqual(len(set(timings.calls.values())), 1)  # every term once per piece
+        self.assertGreaterEqual(timings.calls['space_advantage'], 2 * timings.evaluations)
+        self.assertTrue(engine.USE_INCREMENTAL_EVALUATION)
+        self.assertNotIn('USE_EVALUATION_CACHE', vars(engine))
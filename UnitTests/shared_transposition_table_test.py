@@ -0,0 +1,62 @@
+import chess
+
+from Search.shared_transposition_table import SharedTranspositionTable
+from Search.transposition_table import position_key, EXACT, LOWER_BOUND
+from Search.move_encoding import encode_move, decode_move
+
+from unittest import TestCase
+
+
+class SharedTranspositionTableTest(TestCase):
+    def setUp(self):
+        self.table = SharedTranspositionTable(memory_limit_mb=1)
+        self.key = position_key(chess.Board())
+
+    def tearDown(self):
+        self.table.close()
+        self.table.unlink()
+
+    def test_entry_stored_through_one_attachment_is_read_through_another(self):
+        attached_table = SharedTranspositionTable(memory_limit_mb=1, name=self.table.name)
+        attached_table.store(self.key, 3, -1.5, LOWER_BOUND, chess.Move.from_uci('e7e8q'))
+
+        entry = self.table.probe(self.key)
+        attached_table.close()
+
+        self.assertEqual((entry.depth, entry.score, entry.bound, entry.best_move),
+                         (3, -1.5, LOWER_BOUND, chess.Move.from_uci('e7e8q')))
+
+    def test_depth_zero_entry_is_not_an_empty_slot(self):
+        self.table.store(self.key, 0, 0.0, EXACT, None)
+
+        self.assertEqual(self.table.probe(self.key).depth, 0)
+
+    def test_torn_entry_reads_as_a_miss(self):
+        self.table.store(self.key, 3, 1.5, EXACT, chess.Move.from_uci('e2e4'))
+        self.table.scores[(self.key % self.table.size) * SharedTranspositionTable.WORDS_PER_ENTRY + 2] = 2.5
+
+        self.assertIsNone(self.table.probe(self.key))
+
+    def test_shallower_result_does_not_replace_deeper_one_from_the_same_search(self):
+        self.table.store(self.key, 4, 1.5, EXACT, chess.Move.from_uci('e2e4'))
+        self.table.store(self.key, 2, 0.5, EXACT, chess.Move.from_uci('d2d4'))
+
+        self.assertEqual(self.table.probe(self.key).best_move, chess.Move.from_uci('e2e4'))
+
+    def test_clear(self):
+        self.table.store(self.key, 4, 1.5, EXACT, chess.Move.from_uci('e2e4'))
+
+        self.table.clear()
+
+        self.assertIsNone(self.table.probe(self.key))
+
+
+class MoveEncodingTest(TestCase):
+    def test_encoded_move_is_decoded_back(self):
+        for uci in ['e2e4', 'a7a8q', 'h2g1n', 'e1g1']:
+            move = chess.Move.from_uci(uci)
+            self.assertLess(encode_move(move), 1 << 16)
+            self.assertEqual(decode_move(encode_move(move)), move)
+
+    def test_no_move(self):
+        self.assertIsNone(decode_move(encode_move(None)))
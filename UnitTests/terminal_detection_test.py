@@ -0,0 +1,72 @@
+import random
+from unittest import TestCase
+
+import chess
+
+from PositionEvaluation.position_evaluator import PositionEvaluator
+from PositionEvaluation.terminal_detection import is_insufficient_material, terminal_evaluation, has_safe_king_move
+
+
+class TerminalDetectionTest(TestCase):
+    def _test_terminal_evaluation_same_as_finished_game_evaluation(self, board: chess.Board):
+        game_over_eval = terminal_evaluation(board, any(board.generate_legal_moves()))
+        if board.is_game_over():
+            self.assertEqual(game_over_eval, PositionEvaluator.finished_game_evaluation(board))
+        else:
+            self.assertIsNone(game_over_eval)
+
+    def test_insufficient_material_same_as_python_chess(self):
+        for fen in ['8/8/4k3/8/8/3K4/8/8 w - - 0 1', '8/8/4k3/8/8/3KN3/8/8 w - - 0 1',
+                    '8/8/4k3/8/8/3KNN2/8/8 w - - 0 1', '8/8/4kn2/8/8/3KN3/8/8 w - - 0 1',
+                    '8/8/4kb2/8/8/3KB3/8/8 w - - 0 1', '8/8/4k1b1/8/8/3KB3/8/8 w - - 0 1',
+                    '8/8/4kb2/8/8/3KN3/8/8 w - - 0 1', '8/8/4k3/8/8/3KBB2/8/8 w - - 0 1',
+                    '8/8/4k3/8/8/3KP3/8/8 w - - 0 1', chess.STARTING_FEN]:
+            board = chess.Board(fen)
+            self.assertEqual(is_insufficient_material(board), board.is_insufficient_material(), fen)
+
+    def test_checkmate(self):
+        self._test_terminal_evaluation_same_as_finished_game_evaluation(chess.Board('k1R5/8/1K6/8/8/8/8/8 b - - 0 1'))
+        self._test_terminal_evaluation_same_as_finished_game_evaluation(chess.Board('K1r5/8/1k6/8/8/8/8/8 w - - 0 1'))
+
+    def test_stalemate(self):
+        self._test_terminal_evaluation_same_as_finished_game_evaluation(chess.Board('k7/1R6/2K5/8/8/8/8/8 b - - 0 1'))
+
+    def test_seventy_five_moves(self):
+        self._test_terminal_evaluation_same_as_finished_game_evaluation(
+            chess.Board('4k3/8/8/8/8/8/8/R3K3 w - - 150 120'))
+        self._test_terminal_evaluation_same_as_finished_game_evaluation(
+            chess.Board('R3k3/8/4K3/8/8/8/8/8 b - - 150 120'))
+
+    def test_fivefold_repetition(self):
+        board = chess.Board()
+        for _ in range(4):
+            for uci in ['g1f3', 'g8f6', 'f3g1', 'f6g8']:
+                board.push_uci(uci)
+                self._test_terminal_evaluation_same_as_finished_game_evaluation(board)
+
+    def test_random_games(self):
+        randomizer = random.Random(0)
+        for _ in range(20):
+            board = chess.Board()
+            while not board.is_game_over():
+                board.push(randomizer.choice(list(board.legal_moves)))
+                self._test_terminal_evaluation_same_as_finished_game_evaluation(board)
+
+    def test_safe_king_move_is_a_legal_king_move(self):
+        randomizer = random.Random(1)
+        for _ in range(5):
+            board = chess.Board()
+            while not board.is_game_over():
+                board.push(randomizer.choice(list(board.legal_moves)))
+                king = board.king(board.turn)
+                self.assertEqual(has_safe_king_move(board),
+                                 any(move.from_square == king and not board.is_castling(move)
+                                     for move in board.legal_moves), board.fen())
+
+    def test_static_eval_from_a_mating_move_is_the_checkmate_evaluation(self):
+        board = chess.Board('3k4/8/3K4/5R2/8/8/8/8 w - - 0 1')
+
+        move_eval = PositionEvaluator().evaluate_position_statically_from_move(board, chess.Move.from_uci('f5f8'), 1.5)
+
+        board.push_uci('f5f8')
+        self.assertEqual(move_eval, PositionEvaluator.finished_game_evaluation(board))
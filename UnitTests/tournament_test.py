@@ -0,0 +1,96 @@
+import os
+import tempfile
+from unittest import TestCase
+
+import chess
+
+import definitions_and_factor_weights
+from engine import Engine, MinMaxEvaluator
+from tournament import GameJob, GameResult, TournamentReport, applied_search_configuration, play_game, \
+    schedule_games, percentile, run_tournament
+
+
+class TournamentTest(TestCase):
+    def setUp(self):
+        self.first = {'name': 'first', 'engine': {'MAX_DEPTH': 1}}
+        self.second = {'name': 'second', 'engine': {'MAX_DEPTH': 1}, 'search': {'INTUITION_SPREAD': 3},
+                       'weights': {'piece_values_dict': {'5': 10}}}
+
+    def test_applied_search_configuration_is_restored_after_the_move(self):
+        with applied_search_configuration(self.second):
+            self.assertEqual(MinMaxEvaluator.INTUITION_SPREAD, 3)
+            self.assertEqual(definitions_and_factor_weights.piece_values_dict[chess.QUEEN], 10)
+
+        self.assertEqual(MinMaxEvaluator.INTUITION_SPREAD, 10)
+        self.assertEqual(definitions_and_factor_weights.piece_values_dict[chess.QUEEN], 9)
+
+    def test_configured_intuition_spread_reaches_the_evaluator(self):
+        engine = Engine()
+        engine.LAST_EVAL = 12
+
+        with applied_search_configuration(self.second):
+            self.assertEqual(engine.create_evaluator(chess.Board(), depth=1).INTUITION_SPREAD, 3)
+        self.assertEqual(engine.create_evaluator(chess.Board(), depth=1).INTUITION_SPREAD, 11)
+
+    def test_play_game_until_it_is_over(self):
+        job = GameJob(0, self.first, self.second, '3k4/8/3K4/5R2/8/8/8/8 w - - 0 1', [], 300)
+
+        game_result = play_game(job)
+
+        self.assertEqual(game_result.result, '1-0')
+        self.assertIn('[White "first"]', game_result.pgn)
+        self.assertIn('Rf8#', game_result.pgn)
+        self.assertEqual(len(game_result.move_times['first']), 1)
+        self.assertEqual(game_result.move_times['second'], [])
+        engine = Engine()
+        engine.MAX_DEPTH = 1
+        engine.suggest_move(chess.Board('3k4/8/3K4/5R2/8/8/8/8 w - - 0 1'))
+        self.assertGreater(engine.LAST_QUIESCENCE_NODES, 0)
+        self.assertEqual(game_result.move_nodes['first'], [engine.LAST_NODES + engine.LAST_QUIESCENCE_NODES])
+
+    def test_play_game_is_adjudicated_as_draw_after_max_plies(self):
+        game_result = play_game(GameJob(0, self.first, self.second, chess.STARTING_FEN, ['e2e4'], 3))
+
+        self.assertEqual(game_result.result, '1/2-1/2')
+        self.assertIn('1. e4', game_result.pgn)
+
+    def test_schedule_games_switches_colors_with_the_same_opening(self):
+        openings = [(chess.STARTING_FEN, ['e2e4']), (chess.STARTING_FEN, ['d2d4'])]
+
+        jobs = schedule_games([self.first, self.second], 4, openings, 100)
+
+        self.assertEqual([(job.white['name'], job.opening_moves) for job in jobs],
+                         [('first', ['e2e4']), ('second', ['e2e4']), ('first', ['d2d4']), ('second', ['d2d4'])])
+
+    def test_report_scores_and_latency_percentiles(self):
+        report = TournamentReport(['first', 'second'])
+        report.add_game(GameResult(0, 'first', 'second', '1-0', '', {'first': [1, 2], 'second': [3]},
+                                   {'first': [10, 20], 'second': [30]}))
+        report.add_game(GameResult(1, 'second', 'first', '1/2-1/2', '', {'first': [4], 'second': [5]},
+                                   {'first': [40], 'second': [50]}))
+
+        self.assertEqual(report.scores['first'], [1, 1, 0])
+        self.assertEqual(report.score('first'), 0.75)
+        self.assertEqual(report.score('second'), 0.25)
+        self.assertEqual(report.nodes['first'], 70)
+        self.assertIn('first: +1 =1 -0 score 0.750', report.summary())
+
+    def test_percentile(self):
+        self.assertEqual(percentile([5, 1, 4, 2, 3], 50), 3)
+        self.assertEqual(percentile([5, 1, 4, 2, 3], 99), 5)
+        self.assertEqual(percentile([], 50), 0.0)
+
+    def test_run_tournament_appends_the_finished_games_to_the_pgn_file(self):
+        openings = [('3k4/8/3K4/5R2/8/8/8/8 w - - 0 1', [])]
+        with tempfile.TemporaryDirectory() as directory:
+            pgn_path = os.path.join(directory, 'games.pgn')
+            with open(pgn_path, 'w') as file:
+                file.write('[Event "Earlier game"]\n\n*\n\n')
+
+            report = run_tournament([self.first, self.second], 2, pgn_path, 1, openings)
+
+            with open(pgn_path) as file:
+                pgn = file.read()
+        self.assertEqual(report.games, 2)
+        self.assertIn('Earlier game', pgn)
+        self.assertEqual(pgn.count('[Event "Engine tournament"]'), 2)
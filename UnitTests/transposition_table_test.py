@@ -0,0 +1,66 @@
+import chess
+
+from Search.transposition_table import TranspositionTable, position_key, bound_for_score, \
+    EXACT, LOWER_BOUND, UPPER_BOUND
+
+from unittest import TestCase
+
+
+class TranspositionTableTest(TestCase):
+    def setUp(self):
+        self.table = TranspositionTable(memory_limit_mb=1)
+        self.key = position_key(chess.Board())
+
+    def test_memory_limit_bounds_the_number_of_slots(self):
+        self.assertEqual(self.table.size, 1024 * 1024 // TranspositionTable.ENTRY_SIZE_IN_BYTES)
+        self.assertEqual(len(self.table.slots), self.table.size)
+
+    def test_position_key_is_the_polyglot_zobrist_hash(self):
+        self.assertEqual(self.key, 0x463b96181691fc9c)
+
+    def test_probe_returns_the_stored_entry(self):
+        self.table.store(self.key, 3, 1.5, EXACT, chess.Move.from_uci('e2e4'))
+
+        entry = self.table.probe(self.key)
+
+        self.assertEqual((entry.depth, entry.score, entry.bound, entry.best_move),
+                         (3, 1.5, EXACT, chess.Move.from_uci('e2e4')))
+        self.assertEqual(self.table.hits, 1)
+
+    def test_probe_misses_when_the_slot_holds_another_position(self):
+        self.table.store(self.key, 3, 1.5, EXACT, None)
+
+        self.assertIsNone(self.table.probe(self.key + self.table.size))
+        self.assertEqual(self.table.misses, 1)
+
+    def test_shallower_result_does_not_replace_deeper_one_from_the_same_search(self):
+        self.table.store(self.key, 4, 1.5, EXACT, chess.Move.from_uci('e2e4'))
+        self.table.store(self.key, 2, 0.5, EXACT, chess.Move.from_uci('d2d4'))
+
+        self.assertEqual(self.table.probe(self.key).depth, 4)
+
+    def test_shallower_result_replaces_deeper_one_from_an_older_search(self):
+        self.table.store(self.key, 4, 1.5, EXACT, chess.Move.from_uci('e2e4'))
+        self.table.new_search()
+        self.table.store(self.key, 2, 0.5, EXACT, chess.Move.from_uci('d2d4'))
+
+        self.assertEqual(self.table.probe(self.key).depth, 2)
+
+    def test_best_move_is_kept_when_the_new_result_has_none(self):
+        self.table.store(self.key, 2, 1.5, EXACT, chess.Move.from_uci('e2e4'))
+        self.table.store(self.key, 3, 0.5, UPPER_BOUND, None)
+
+        self.assertEqual(self.table.get_best_move(self.key), chess.Move.from_uci('e2e4'))
+
+    def test_bound_for_score(self):
+        self.assertEqual(bound_for_score(1, alpha=1, beta=3), UPPER_BOUND)
+        self.assertEqual(bound_for_score(3, alpha=1, beta=3), LOWER_BOUND)
+        self.assertEqual(bound_for_score(2, alpha=1, beta=3), EXACT)
+
+    def test_cutoff_score(self):
+        self.table.store(self.key, 3, 2, LOWER_BOUND, None)
+        entry = self.table.probe(self.key)
+
+        self.assertEqual(TranspositionTable.cutoff_score(entry, depth=3, alpha=0, beta=1), 2)
+        self.assertIsNone(TranspositionTable.cutoff_score(entry, depth=3, alpha=0, beta=5))
+        self.assertIsNone(TranspositionTable.cutoff_score(entry, depth=4, alpha=0, beta=1))
@@ -0,0 +1,115 @@
+import time
+from unittest import TestCase
+
+import chess
+
+from uci import UCIProtocol, allocate_move_time, uci_score
+
+
+class UCIProtocolTest(TestCase):
+    def setUp(self):
+        self.lines = []
+        self.protocol = UCIProtocol(output=self.lines.append)
+
+    def _best_move_lines(self):
+        return [line for line in self.lines if line.startswith('bestmove')]
+
+    def test_uci_handshake(self):
+        self.protocol.handle('uci')
+        self.protocol.handle('isready')
+
+        self.assertEqual(self.lines[-2:], ['uciok', 'readyok'])
+
+    def test_position_with_moves(self):
+        self.protocol.handle('position fen 4k3/8/3K4/6R1/8/8/8/8 w - - 0 1 moves g5g6 e8f8')
+
+        self.assertEqual(self.protocol.board.fen(), '5k2/8/3K2R1/8/8/8/8/8 w - - 2 2')
+
+    def test_go_depth_finds_mate_in_one(self):
+        self.protocol.handle('position fen 3k4/8/3K4/5R2/8/8/8/8 w - - 0 1')
+        self.protocol.handle('go depth 2')
+        self.protocol.wait_for_search()
+
+        self.assertEqual(self._best_move_lines(), ['bestmove f5f8'])
+        self.assertIn('score mate 1', self.lines[0])
+
+    def test_go_depth_finds_mate_in_two(self):
+        self.protocol.handle('position fen 4k3/8/3K4/6R1/8/8/8/8 w - - 0 1')
+        self.protocol.handle('go depth 3')
+        self.protocol.wait_for_search()
+
+        self.assertIn('score mate 2', self.lines[-2])
+        self.assertIn('pv g5f5 e8d8 f5f8', self.lines[-2])
+
+    def test_bestmove_0000_without_legal_moves(self):
+        for fen in ('7k/5Q2/6K1/8/8/8/8/8 b - - 0 1', '7k/6Q1/6K1/8/8/8/8/8 b - - 0 1'):  # stalemate, checkmate
+            self.lines.clear()
+            self.protocol.handle(f'position fen {fen}')
+            self.protocol.handle('go depth 3')
+            self.protocol.wait_for_search()
+
+            self.assertEqual(self.lines, ['bestmove 0000'])
+
+    def test_own_book_loads_the_repertoires(self):
+        self.assertIsNone(self.protocol.engine.opening_book_white)
+
+        self.protocol.handle('setoption name OwnBook value true')
+        self.protocol.handle('position startpos')
+        self.protocol.handle('go depth 3')
+        self.protocol.wait_for_search()
+
+        book_move = self.protocol.engine.opening_book_white.get(chess.Board()).move
+        self.assertEqual(self.lines, [f'bestmove {book_move.uci()}'])
+
+    def test_stop_ends_an_infinite_search_at_once(self):
+        self.protocol.handle('position startpos')
+        self.protocol.handle('go infinite')
+        time.sleep(0.2)
+
+        stopped_at = time.perf_counter()
+        self.protocol.handle('stop')
+
+        self.assertLess(time.perf_counter() - stopped_at, 0.5)
+        self.assertEqual(len(self._best_move_lines()), 1)
+        self.assertIn(chess.Move.from_uci(self._best_move_lines()[0].split()[1]), chess.Board().legal_moves)
+
+    def test_best_move_is_sent_after_ponderhit_only(self):
+        self.protocol.handle('position startpos moves e2e4')
+        self.protocol.handle('go ponder depth 1')
+        time.sleep(0.2)
+        self.assertEqual(self._best_move_lines(), [])
+
+        self.protocol.handle('ponderhit')
+        self.protocol.wait_for_search()
+
+        self.assertEqual(len(self._best_move_lines()), 1)
+
+    def test_go_movetime(self):
+        self.protocol.handle('position startpos')
+        started_at = time.perf_counter()
+        self.protocol.handle('go movetime 300')
+        self.protocol.wait_for_search()
+
+        self.assertLess(time.perf_counter() - started_at, 1.5)
+        self.assertEqual(len(self._best_move_lines()), 1)
+
+    def test_allocate_move_time(self):
+        self.assertAlmostEqual(allocate_move_time(60, 0, 20), 2.95)
+        self.assertAlmostEqual(allocate_move_time(1, 0, 1), 0.45)
+
+    def test_uci_score_is_for_the_side_to_move(self):
+        board = chess.Board()
+        board.push_uci('e2e4')
+
+        self.assertEqual(uci_score(board, 0.5), 'cp -50')
+
+    def test_uci_score_mate_distance(self):
+        board = chess.Board()
+        self.assertEqual(uci_score(board, 2029), 'mate 2')  # mated after the 3rd ply
+        self.assertEqual(uci_score(board, 2028), 'mate 3')  # after the 5th
+        self.assertEqual(uci_score(board, -2029), 'mate -1')  # after the 2nd
+        self.assertEqual(uci_score(board, -2028), 'mate -2')  # after the 4th
+
+        board.push_uci('e2e4')
+        self.assertEqual(uci_score(board, 2028), 'mate -2')  # after the 5th ply of the game
+        self.assertEqual(uci_score(board, -2028), 'mate 2')  # after the 4th
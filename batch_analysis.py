@@ -0,0 +1,167 @@
+import argparse
+import collections
+import io
+import itertools
+import json
+import multiprocessing
+import os
+import time
+
+import chess
+import chess.pgn
+
+from engine import Engine
+from OpeningBooks.book_compiler import read_game_texts
+
+# Annotates PGN games or EPD positions with the evaluation and the best move of the engine, e.g.
+# python batch_analysis.py games.pgn --output analysis.jsonl --depth 4 --workers 8
+# The input is read as a stream, in chunks of games or positions which a process pool analyses. The results are
+# written as JSON lines in the input order, as soon as a chunk is done. A checkpoint file records the games and
+# positions written, so an interrupted run started again with the same input goes on where it stopped.
+# The positions of one game are searched one after the other by the same engine, so every search finds the
+# transposition table and the last evaluation of the previous position.
+AnalysisSettings = collections.namedtuple('AnalysisSettings', ['depth', 'move_time'])
+
+
+def read_epd_lines(epd_paths):
+    for epd_path in epd_paths:
+        with open(epd_path) as epd_file:
+            yield from (line for line in epd_file if line.strip())
+
+
+def read_work_units(paths):
+    # A work unit is a game text or an EPD line, depending on the file
+    for path in paths:
+        if path.lower().endswith('.epd'):
+            yield from (('epd', line) for line in read_epd_lines([path]))
+        else:
+            yield from (('pgn', game_text) for game_text in read_game_texts([path]))
+
+
+def create_engine(settings: AnalysisSettings):
+    engine = Engine()
+    engine.MAX_DEPTH = settings.depth
+    engine.MOVE_TIME = settings.move_time
+    return engine
+
+
+def analyse_position(engine: Engine, board: chess.Board):
+    started_at = time.perf_counter()
+    best_move = engine.suggest_move(board)
+    return {'fen': board.fen(),
+            'eval': engine.LAST_EVAL,
+            'best_move': best_move.uci() if best_move else None,
+            'depth': engine.LAST_DEPTH,
+            'nodes': engine.LAST_NODES + engine.LAST_QUIESCENCE_NODES,
+            'seconds': round(time.perf_counter() - started_at, 4)}
+
+
+def analyse_game(game_text: str, settings: AnalysisSettings):
+    game = chess.pgn.read_game(io.StringIO(game_text))
+    if game is None or game.errors:
+        return []
+    engine = create_engine(settings)
+    board = game.board()
+    results = []
+    for ply, move in enumerate(game.mainline_moves()):
+        result = analyse_position(engine, board)
+        result['ply'] = ply
+        result['played_move'] = move.uci()
+        results.append(result)
+        board.push(move)
+    return results
+
+
+def analyse_epd_line(epd_line: str, settings: AnalysisSettings):
+    board, operations = chess.Board.from_epd(epd_line.strip())
+    result = analyse_position(create_engine(settings), board)
+    if 'id' in operations:
+        result['id'] = operations['id']
+    return [result]
+
+
+def analyse_chunk(work_units, first_unit_index: int, settings: AnalysisSettings):
+    # Worker: the results of every game or EPD position of the chunk, numbered by its index in the input
+    results = []
+    for unit_index, (kind, text) in enumerate(work_units, first_unit_index):
+        unit_results = analyse_game(text, settings) if kind == 'pgn' else analyse_epd_line(text, settings)
+        for result in unit_results:
+            results.append({'unit': unit_index, **result})
+    return results
+
+
+def read_checkpoint(checkpoint_path):
+    if not os.path.exists(checkpoint_path):
+        return {'units': 0, 'output_size': None}
+    with open(checkpoint_path) as checkpoint_file:
+        return json.load(checkpoint_file)
+
+
+def write_checkpoint(checkpoint_path, checkpoint):
+    # Replaced at once, so an interruption never leaves a half written checkpoint
+    temporary_path = checkpoint_path + '.tmp'
+    with open(temporary_path, 'w') as checkpoint_file:
+        json.dump(checkpoint, checkpoint_file)
+    os.replace(temporary_path, checkpoint_path)
+
+
+def analyse_files(paths, output_path, settings: AnalysisSettings, workers=multiprocessing.cpu_count(),
+                  units_per_chunk=10, checkpoint_path=None):
+    # Returns the number of positions analysed by this run
+    checkpoint_path = checkpoint_path or output_path + '.checkpoint'
+    checkpoint = read_checkpoint(checkpoint_path)
+    positions = 0
+    with open(output_path, 'a+b') as output_file, multiprocessing.Pool(workers) as pool:
+        # Results written after the last checkpoint are written again
+        if checkpoint['output_size'] is None:
+            checkpoint['output_size'] = output_file.seek(0, os.SEEK_END)
+        output_file.truncate(checkpoint['output_size'])
+
+        def write_chunk_results(chunk_units, chunk_results):
+            nonlocal positions
+            for result in chunk_results:
+                output_file.write(json.dumps(result).encode() + b'\n')
+            output_file.flush()
+            os.fsync(output_file.fileno())
+            positions += len(chunk_results)
+            checkpoint['units'] += chunk_units
+            checkpoint['output_size'] = output_file.tell()
+            write_checkpoint(checkpoint_path, checkpoint)
+
+        # The games and positions done before are skipped, and only a few chunks per worker are read ahead
+        work_units = read_work_units(paths)
+        next_unit_index = checkpoint['units']
+        for _ in itertools.islice(work_units, next_unit_index):
+            pass
+        pending_chunks = collections.deque()
+        while chunk := list(itertools.islice(work_units, units_per_chunk)):
+            pending_chunks.append((len(chunk), pool.apply_async(analyse_chunk, (chunk, next_unit_index, settings))))
+            next_unit_index += len(chunk)
+            if len(pending_chunks) > 2 * workers:
+                chunk_units, chunk_results = pending_chunks.popleft()
+                write_chunk_results(chunk_units, chunk_results.get())
+        while pending_chunks:
+            chunk_units, chunk_results = pending_chunks.popleft()
+            write_chunk_results(chunk_units, chunk_results.get())
+    return positions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Annotates PGN games or EPD positions with engine evaluations.')
+    parser.add_argument('input', nargs='+', help='PGN files, or EPD files ending with .epd')
+    parser.add_argument('--output', required=True, help='JSON lines file the results are appended to')
+    parser.add_argument('--depth', type=int, default=Engine.MAX_DEPTH)
+    parser.add_argument('--move-time', type=float, help='seconds per position, instead of a fixed depth')
+    parser.add_argument('--workers', type=int, default=multiprocessing.cpu_count())
+    parser.add_argument('--units-per-chunk', type=int, default=10, help='games or EPD positions per work unit')
+    parser.add_argument('--checkpoint', help='checkpoint file, by default the output path with .checkpoint added')
+    arguments = parser.parse_args()
+
+    started_at = time.perf_counter()
+    positions = analyse_files(arguments.input, arguments.output, AnalysisSettings(arguments.depth, arguments.move_time),
+                              arguments.workers, arguments.units_per_chunk, arguments.checkpoint)
+    print(f'{positions} positions analysed in {time.perf_counter() - started_at:.1f}s, written to {arguments.output}')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,4 +1,5 @@
 # from engine import MoveAndEval
+import heapq
 from collections import namedtuple
 
 MoveAndEval = namedtuple('MoveAndEval', ['move', 'evaluation'])
@@ -118,3 +119,41 @@ class SortedLinkedListNode:
 
     # def set_parent_node(self, parent_node):
     #     self.parent_node = parent_node
+
+
+class TopMovesSelector:
+    # Keeps the max_length best moves like SortedLinkedList, with O(log max_length) inserts into a heap.
+    # Ties behave the same: the maximizing side keeps the move added first, the minimizing side the move added last,
+    # and get_moves yields from the smallest evaluation up, equal evaluations from the last added.
+    __slots__ = ('max_length', 'maximizing_side', 'heap', 'added')
+
+    def __init__(self, max_length: int, maximizing_side: bool):
+        self.max_length = max_length
+        self.maximizing_side = maximizing_side
+        self.heap = []  # the root is the move to be dropped first
+        self.added = 0
+
+    def add(self, move, evaluation):
+        self.added += 1
+        # The insertion number is part of the key, so the moves themselves are never compared
+        if self.maximizing_side:
+            entry = (evaluation, -self.added, move)
+        else:
+            entry = (-evaluation, self.added, move)
+
+        if len(self.heap) < self.max_length:
+            heapq.heappush(self.heap, entry)
+        elif self.heap[0] < entry:
+            heapq.heapreplace(self.heap, entry)
+
+    def add_move_and_eval(self, move_and_eval: MoveAndEval):
+        self.add(move_and_eval.move, move_and_eval.evaluation)
+
+    @property
+    def length(self):
+        return len(self.heap)
+
+    def get_moves(self):
+        if self.maximizing_side:
+            return [move for _, _, move in sorted(self.heap)]
+        return [move for _, _, move in sorted(self.heap, reverse=True)]
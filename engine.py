@@ -1,75 +1,466 @@
 import chess
 from PositionEvaluation.position_evaluator import PositionEvaluator
+from PositionEvaluation.incremental_evaluator import IncrementalEvaluator
+from PositionEvaluation.evaluation_cache import EvaluationCache
+from PositionEvaluation.piece_square_tables import recompile_if_weights_changed, current_weights, set_weights
+from PositionEvaluation.terminal_detection import is_draw_without_move_generation, evaluation_without_legal_moves, \
+    is_insufficient_material
+from definitions_and_factor_weights import piece_values_dict
 
-from calculation_utils import SortedLinkedList, MoveAndEval
-from chess.polyglot import MemoryMappedReader
+from calculation_utils import TopMovesSelector
+from Search.transposition_table import TranspositionTable, position_key, bound_for_score, EXACT
+from Search.search_deadline import SearchDeadline, SearchTimeout
+from Search.lazy_smp import LazySMPSearch
+from Search.search_statistics import SearchStatistics, timed_phase
+from Search.move_ordering import MoveOrderer
+from Search.repetition_history import RepetitionHistory
+from Search.move_buffers import MoveBuffers
+from Search.move_encoding import decoded_move
+from Search.search_board import SearchBoard
+
+
+class SearchPly:
+    # Scratch state of the node at one ply of the search. One per ply is allocated by the evaluator and reused by
+    # every node searched at that ply, so a node allocates no object of its own.
+    __slots__ = ('key', 'hash_move', 'in_check', 'best_move', 'principal_variation')
+
+    def __init__(self):
+        self.key = None
+        self.hash_move = None
+        self.in_check = None  # None when not looked at, at the root or without pruning
+        self.best_move = None  # The move which improved the evaluation of the node, or None
+        self.principal_variation = []  # The best line from the node, its best move first
 
 
 class MinMaxEvaluator:
+    # One evaluator searches the whole tree of a suggest_move: depth, alpha, beta and the ply of a node are passed
+    # down the recursion, and the rest of the node state is kept in its SearchPly. best_move, alpha, beta and depth
+    # are those of the root, searched by min_max.
     position_evaluator = PositionEvaluator()
     DEPTH_TO_USE_BRUTE_FORCE = 3
-    INTUITION_SPREAD = 10
+    PICKED_MOVES = 4  # Moves of a brute force ply picked best first one at a time, before the rest is sorted
+    DEFAULT_INTUITION_SPREAD = 10
+    INTUITION_SPREAD = DEFAULT_INTUITION_SPREAD  # Configured to another value, the engine doesn't adapt it
+    QUIESCENCE_MAX_DEPTH = 6  # Plies of captures and promotions searched after depth 0. 0 turns the quiescence off
+    DELTA_PRUNING_MARGIN = 2  # A capture which can't raise the evaluation to alpha even with this margin is skipped
+    # Forward pruning, every technique with its own switch, so its effect can be benchmarked on its own
+    NULL_WINDOW = 0.01  # Pawns. Searches only telling whether a move is better than a bound use this window
+    # Principal variation search: after the first move, the moves are searched with a null window, only to show
+    # they are worse than the best one so far, and searched again with the full window when they are not
+    USE_PRINCIPAL_VARIATION_SEARCH = True
+    USE_NULL_MOVE_PRUNING = True
+    NULL_MOVE_REDUCTION = 2
+    NULL_MOVE_VERIFICATION_MATERIAL = 5  # With at most this besides pawns, a null move cutoff is verified (zugzwang)
+    USE_LATE_MOVE_REDUCTIONS = True
+    LATE_MOVE_REDUCTION = 1
+    LATE_MOVE_REDUCTION_MIN_DEPTH = 3
+    FULL_DEPTH_MOVES = 3  # Moves searched to the full depth before the quiet ones are reduced
+    USE_FUTILITY_PRUNING = True
+    FUTILITY_MARGINS = {1: 2, 2: 4}  # Depth left -> pawns a quiet move would have to gain to reach alpha
+    USE_RAZORING = False  # Loses sacrifices like the one of tactic.WAC.001 for a few percent fewer nodes
+    RAZORING_MARGINS = {1: 3}  # Depth left -> pawns below alpha to resolve the node by the quiescence search
 
-    def __init__(self, best_move, alpha, beta, depth, board: chess.Board, board_static_eval=None):
+    def __init__(self, best_move, alpha, beta, depth, board: chess.Board, board_static_eval=None,
+                 transposition_table: TranspositionTable | None = None, deadline: SearchDeadline | None = None,
+                 incremental_evaluator: IncrementalEvaluator | None = None,
+                 statistics: SearchStatistics | None = None, move_orderer: MoveOrderer | None = None,
+                 repetition_history: RepetitionHistory | None = None, move_buffers: MoveBuffers | None = None,
+                 evaluation_cache: EvaluationCache | None = None, is_root=True, null_move_allowed=True):
         self.best_move = best_move
         self.alpha = alpha
         self.beta = beta
         self.depth = depth
         self.board = board
-        self.board_static_eval = board_static_eval
+        self.board_static_eval = board_static_eval  # of the root board
+        self.transposition_table = transposition_table
+        self.deadline = deadline
+        self.incremental_evaluator = incremental_evaluator
+        self.statistics = statistics
+        self.move_orderer = move_orderer
+        self.repetition_history = repetition_history
+        if evaluation_cache is not None:
+            self.position_evaluator = PositionEvaluator(evaluation_cache)
+        # Quiescence moves, one buffer per depth left
+        self.move_buffers = move_buffers or MoveBuffers(self.QUIESCENCE_MAX_DEPTH)
+        self.ply_move_buffers = MoveBuffers(0)  # Moves of the brute force plies, one buffer per ply
+        self.is_root = is_root  # The root always searches its moves, it has to return one
+        self.null_move_allowed = null_move_allowed  # Never two null moves in a row
+        self.plies = []
+        self.allocate_plies(depth)
+        self.principal_variation = []  # The best line from the root, its best move first
 
-    @property
-    def use_intuition(self):
-        # return False
-        if self.depth <= self.DEPTH_TO_USE_BRUTE_FORCE:
-            return False
-        else:
-            return True
+    def allocate_plies(self, depth: int):
+        # Every ply loses at least one depth. A null move verification searches one more ply.
+        while len(self.plies) < depth + 2:
+            self.plies.append(SearchPly())
+        self.ply_move_buffers.allocate(len(self.plies))
+
+    def use_intuition(self, depth: int):
+        return depth > self.DEPTH_TO_USE_BRUTE_FORCE
 
-    def get_moves_to_be_considered(self):
-        if not self.use_intuition:
+    def get_moves_to_be_considered(self, depth: int, hash_move: chess.Move | None = None, ply=0):
+        if not self.use_intuition(depth):
+            if self.move_orderer:
+                return self.picked_moves(ply, self.move_orderer.score_moves(self.board, self.ply_move_buffers, ply,
+                                                                            hash_move))
+            if hash_move and self.board.is_legal(hash_move):
+                return self._hash_move_first(self.board.legal_moves, hash_move)
             return self.board.legal_moves
         else:
-            intuitive_moves = SortedLinkedList(max_length=self.INTUITION_SPREAD, maximizing_side=self.board.turn)
+            intuitive_moves = TopMovesSelector(max_length=self.INTUITION_SPREAD, maximizing_side=self.board.turn)
 
-            current_board_quick_eval = self.board_static_eval if self.board_static_eval else self.position_evaluator.evaluate_position(self.board)
+            current_board_quick_eval = self.board_static_eval if self.board_static_eval and not ply else \
+                self.get_static_eval(game_state_evaluation=False)
 
             for move in self.board.legal_moves:
                 move_quick_eval = self.position_evaluator.evaluate_position_statically_from_move(self.board, move, current_board_quick_eval)
-                intuitive_moves.add_move_and_eval(MoveAndEval(move, move_quick_eval))
+                intuitive_moves.add(move, move_quick_eval)
+            if self.statistics:
+                self.statistics.delta_evaluations += intuitive_moves.added
+                self.statistics.intuition_list_sizes[intuitive_moves.length] += 1
 
+            if hash_move:
+                return self._hash_move_first(intuitive_moves.get_moves(), hash_move, only_if_considered=True)
             return intuitive_moves.get_moves()
 
-    def create_a_branch_and_calculate_its_evaluation(self, move: chess.Move):
-        self.board.push(move)
-        move_eval = MinMaxEvaluator(self.best_move, self.alpha, self.beta, self.depth - 1, self.board).min_max()
-        self.board.pop()
+    def picked_moves(self, ply: int, count: int):
+        # The scored moves of the ply, best first. The first are picked one at a time, as a cutoff usually comes
+        # early. When it doesn't, the rest is sorted once.
+        ply_move_buffers = self.ply_move_buffers
+        picked_count = min(count, self.PICKED_MOVES)
+        for index in range(picked_count):
+            yield decoded_move(ply_move_buffers.pick_best(ply, index, count))
+        moves, scores = ply_move_buffers.moves[ply], ply_move_buffers.scores[ply]
+        for index in sorted(range(picked_count, count), key=scores.__getitem__, reverse=True):
+            yield decoded_move(moves[index])
+
+    @staticmethod
+    def _hash_move_first(moves, hash_move: chess.Move, only_if_considered=False):
+        # The best move found for this position by an earlier search is tried first, as it is the most likely cutoff
+        if only_if_considered and hash_move not in moves:
+            yield from moves
+            return
+        yield hash_move
+        for move in moves:
+            if move != hash_move:
+                yield move
+
+    def get_static_eval(self, game_state_evaluation=True):
+        if self.statistics:
+            self.statistics.static_evaluations += 1
+        if self.incremental_evaluator:
+            if not game_state_evaluation:
+                return self.incremental_evaluator.static_eval
+            return self.incremental_evaluator.evaluate(self.board)
+        return self.position_evaluator.evaluate_position(self.board, game_state_evaluation=game_state_evaluation)
+
+    def push_move(self, move: chess.Move):
+        if self.incremental_evaluator:
+            self.incremental_evaluator.push(self.board, move)
+        else:
+            self.board.push(move)
+
+    def pop_move(self):
+        if self.incremental_evaluator:
+            self.incremental_evaluator.pop(self.board)
+        else:
+            self.board.pop()
+
+    def create_a_branch_and_calculate_its_evaluation(self, move: chess.Move, depth: int, alpha, beta, ply: int,
+                                                     null_move_allowed=True):
+        # The evaluation of the child reached by the move from the node at ply
+        if self.repetition_history:
+            self.repetition_history.push(self.plies[ply].key)
+        self.push_move(move)
+        try:
+            move_eval = self.search(depth, alpha, beta, ply + 1, null_move_allowed)
+        finally:
+            # The board is restored even when the search is abandoned on a deadline
+            self.pop_move()
+            if self.repetition_history:
+                self.repetition_history.pop()
         return move_eval
 
-    def min_max(self):
-        if self.depth == 0 or self.board.is_game_over():
-            move_eval = self.position_evaluator.evaluate_position(self.board)
-            return move_eval
+    def evaluate_leaf(self, alpha, beta):
+        if self.QUIESCENCE_MAX_DEPTH:
+            return self.quiescence_search(alpha, beta, self.QUIESCENCE_MAX_DEPTH)
+        return self.get_static_eval()
 
+    def quiescence_moves(self, in_check: bool, depth_left: int):
+        # Captures and promotions, the most valuable victim first, or in check all the moves getting out of it,
+        # written to the buffer of depth_left. Returns how many.
+        if in_check:
+            return self.move_buffers.add_moves(self.board, depth_left, self.board.generate_legal_moves(),
+                                               MoveOrderer.capture_score)
+        return self.move_buffers.generate_captures(self.board, depth_left)
+
+    def play_quiescence_move(self, encoded_move: int, in_check: bool):
+        # Captures are generated pseudo-legal, one leaving the king in check is taken back. Returns whether it stays.
+        self.push_move(decoded_move(encoded_move))
+        if not in_check and self.board.was_into_check():
+            self.pop_move()
+            return False
+        return True
+
+    def quiescence_search(self, alpha, beta, depth_left):
+        # Searches captures and promotions until the position is quiet, so a leaf is not evaluated in the
+        # middle of an exchange. The side to move may also stand pat, i.e. keep the static evaluation.
+        if self.statistics:
+            self.statistics.quiescence_nodes += 1
+        if self.deadline:
+            self.deadline.check()
+
+        if is_draw_without_move_generation(self.board):
+            return self.terminal_evaluation(float(0))
+        in_check = self.board.is_check()
+        # The captures are pseudo-legal, so a stalemate with only illegal captures left is taken for a quiet position
+        moves_count = self.quiescence_moves(in_check, depth_left)
+        if not moves_count and (in_check or not any(self.board.generate_legal_moves())):
+            return self.terminal_evaluation(evaluation_without_legal_moves(self.board))
+        stand_pat = self.get_static_eval(game_state_evaluation=False)
+        if depth_left == 0:
+            return stand_pat
+
+        move_buffers, gains = self.move_buffers, self.move_buffers.gains[depth_left]
+        # In check there is no standing pat, every evasion is searched
         if self.board.turn:
-            for move in self.get_moves_to_be_considered():
-                move_eval = self.create_a_branch_and_calculate_its_evaluation(move)
-                if move_eval > self.alpha:
-                    self.alpha = move_eval
-                    self.best_move = move
-                    if self.beta <= self.alpha:
-                        return move_eval
-            return self.alpha
-
-        if not self.board.turn:
-            for move in self.get_moves_to_be_considered():
-                move_eval = self.create_a_branch_and_calculate_its_evaluation(move)
-                if move_eval < self.beta:
-                    self.beta = move_eval
-                    self.best_move = move
-                    if self.beta <= self.alpha:
+            if not in_check:
+                if stand_pat >= beta:
+                    return stand_pat
+                alpha = max(alpha, stand_pat)
+            for index in range(moves_count):
+                move = move_buffers.pick_best(depth_left, index, moves_count)
+                if not in_check and stand_pat + gains[index] + self.DELTA_PRUNING_MARGIN <= alpha:
+                    continue
+                if not self.play_quiescence_move(move, in_check):
+                    continue
+                try:
+                    move_eval = self.quiescence_search(alpha, beta, depth_left - 1)
+                finally:
+                    self.pop_move()
+                if move_eval > alpha:
+                    alpha = move_eval
+                    if beta <= alpha:
                         return move_eval
-            return self.beta
+            return alpha
+
+        if not in_check:
+            if stand_pat <= alpha:
+                return stand_pat
+            beta = min(beta, stand_pat)
+        for index in range(moves_count):
+            move = move_buffers.pick_best(depth_left, index, moves_count)
+            if not in_check and stand_pat - gains[index] - self.DELTA_PRUNING_MARGIN >= beta:
+                continue
+            if not self.play_quiescence_move(move, in_check):
+                continue
+            try:
+                move_eval = self.quiescence_search(alpha, beta, depth_left - 1)
+            finally:
+                self.pop_move()
+            if move_eval < beta:
+                beta = move_eval
+                if beta <= alpha:
+                    return move_eval
+        return beta
+
+    def min_max(self):
+        # Searches the root. Its best move, when one improves the window, and its principal variation are kept.
+        self.allocate_plies(self.depth)
+        position_eval = self.search(self.depth, self.alpha, self.beta, 0, self.null_move_allowed)
+        root = self.plies[0]
+        if root.best_move:
+            self.best_move = root.best_move
+        self.principal_variation = list(root.principal_variation)
+        return position_eval
+
+    def search(self, depth: int, alpha, beta, ply: int, null_move_allowed=True):
+        if self.statistics:
+            self.statistics.nodes += 1
+            self.statistics.nodes_per_depth[depth] += 1
+        if self.deadline:
+            self.deadline.check()
+
+        node = self.plies[ply]
+        node.hash_move = node.in_check = node.best_move = None
+        node.principal_variation.clear()
+        node.key = position_key(self.board) if self.transposition_table is not None or self.repetition_history \
+            else None
+        if self.is_draw(node.key):
+            return self.terminal_evaluation(float(0))
+        if depth == 0 and self.transposition_table is None:
+            return self.evaluate_leaf(alpha, beta)
+
+        if self.transposition_table is None:
+            return self.search_moves(depth, alpha, beta, ply, null_move_allowed)
+
+        key = node.key
+        entry = self.transposition_table.probe(key)
+        if entry:
+            stored_eval = self.transposition_table.cutoff_score(entry, depth, alpha, beta)
+            if stored_eval is not None:
+                if entry.best_move:
+                    node.best_move = entry.best_move
+                    node.principal_variation.append(entry.best_move)
+                return stored_eval
+            node.hash_move = entry.best_move
+
+        if depth == 0:
+            # Leaves reached through different move orders are evaluated only once
+            position_eval = self.evaluate_leaf(alpha, beta)
+            # The quiescence search gives only a bound outside the alpha-beta window
+            bound = bound_for_score(position_eval, alpha, beta) if self.QUIESCENCE_MAX_DEPTH else EXACT
+            self.transposition_table.store(key, 0, position_eval, bound, None)
+            return position_eval
+
+        position_eval = self.search_moves(depth, alpha, beta, ply, null_move_allowed)
+        self.transposition_table.store(key, depth, position_eval, bound_for_score(position_eval, alpha, beta),
+                                       node.best_move)
+        return position_eval
+
+    def is_draw(self, key):
+        # Checkmate and stalemate are found from the moves of the node, only the other draws are checked here
+        if self.repetition_history is None:
+            return is_draw_without_move_generation(self.board)
+        return is_insufficient_material(self.board) or self.repetition_history.is_draw(self.board, key)
+
+    def terminal_evaluation(self, game_over_eval: float):
+        if self.statistics:
+            self.statistics.terminal_evaluations += 1
+        return game_over_eval
+
+    def record_cutoff(self, move: chess.Move, move_number: int, depth: int):
+        if self.statistics:
+            self.statistics.beta_cutoffs += 1
+            if move_number == 0:
+                self.statistics.first_move_cutoffs += 1
+        if self.move_orderer:
+            self.move_orderer.record_cutoff(self.board, move, depth)
+
+    def count(self, statistic: str):
+        if self.statistics:
+            setattr(self.statistics, statistic, getattr(self.statistics, statistic) + 1)
+
+    def non_pawn_material(self):
+        board, color = self.board, self.board.turn
+        return sum(piece_values_dict[piece_type] * chess.popcount(board.pieces_mask(piece_type, color))
+                   for piece_type in (chess.KNIGHT, chess.BISHOP, chess.ROOK, chess.QUEEN))
+
+    def is_quiet_move(self, move: chess.Move):
+        return not move.promotion and not self.board.is_capture(move) and not self.board.gives_check(move)
+
+    def forward_pruning_eval(self, depth: int, alpha, beta, ply: int, null_move_allowed=True):
+        # The evaluation of a node resolved without searching its moves, or None. Never at the root or in check.
+        if not ply and self.is_root or not (self.USE_RAZORING or self.USE_NULL_MOVE_PRUNING or
+                                            self.USE_FUTILITY_PRUNING or self.USE_LATE_MOVE_REDUCTIONS):
+            return None
+        node = self.plies[ply]
+        node.in_check = self.board.is_check()
+        if node.in_check:
+            return None
+        maximizing = self.board.turn
+        # The bound the side to move has to reach, and the bound it can't fall below, from its point of view
+        sign, own_alpha, own_beta = (1, alpha, beta) if maximizing else (-1, -beta, -alpha)
+        static_eval = sign * self.get_static_eval(game_state_evaluation=False)
+
+        # Razoring: far below alpha near the leaves, only a capture can save the node
+        if self.USE_RAZORING and self.QUIESCENCE_MAX_DEPTH and depth in self.RAZORING_MARGINS and \
+                abs(own_alpha) < 1000 and static_eval + self.RAZORING_MARGINS[depth] <= own_alpha:
+            window = (alpha, alpha + self.NULL_WINDOW) if maximizing else (beta - self.NULL_WINDOW, beta)
+            quiescence_eval = self.quiescence_search(*window, self.QUIESCENCE_MAX_DEPTH)
+            if sign * quiescence_eval <= own_alpha:
+                self.count('razored_nodes')
+                return quiescence_eval
+
+        # Null move: if passing still keeps the evaluation at beta, a real move would too. Without pieces passing
+        # may be the best move (zugzwang), so it isn't tried, and with few pieces the cutoff is verified by a
+        # shallower search of the node itself, one ply further so the state of this node is kept.
+        if self.USE_NULL_MOVE_PRUNING and null_move_allowed and depth > self.NULL_MOVE_REDUCTION and \
+                abs(own_beta) < 1000 and static_eval >= own_beta:
+            non_pawn_material = self.non_pawn_material()
+            if non_pawn_material:
+                window = (beta - self.NULL_WINDOW, beta) if maximizing else (alpha, alpha + self.NULL_WINDOW)
+                reduced_depth = depth - 1 - self.NULL_MOVE_REDUCTION
+                null_move_eval = self.create_a_branch_and_calculate_its_evaluation(
+                    chess.Move.null(), reduced_depth, *window, ply, null_move_allowed=False)
+                if sign * null_move_eval >= own_beta and (
+                        non_pawn_material > self.NULL_MOVE_VERIFICATION_MATERIAL or
+                        sign * self.search(reduced_depth + 1, *window, ply + 1, null_move_allowed=False) >= own_beta):
+                    self.count('null_move_cutoffs')
+                    return beta if maximizing else alpha
+        return None
+
+    def is_futile(self, depth: int, alpha, beta, ply: int):
+        # Near the leaves, a quiet move can't raise an evaluation this far below alpha
+        if not ply and self.is_root or self.plies[ply].in_check is not False or not self.USE_FUTILITY_PRUNING or \
+                depth not in self.FUTILITY_MARGINS:
+            return False
+        margin = self.FUTILITY_MARGINS[depth]
+        static_eval = self.get_static_eval(game_state_evaluation=False)
+        if self.board.turn:
+            return abs(alpha) < 1000 and static_eval + margin <= alpha
+        return abs(beta) < 1000 and static_eval - margin >= beta
+
+    def evaluate_move(self, move: chess.Move, move_number: int, depth: int, alpha, beta, ply: int, futile: bool,
+                      reduce_late_moves: bool):
+        # The evaluation of the move, or None when it is pruned. A late quiet move is first searched shallower with a
+        # null window, and searched again to the full depth only when it beats the best move so far.
+        if futile or reduce_late_moves and move_number >= self.FULL_DEPTH_MOVES:
+            if self.is_quiet_move(move):
+                if futile:
+                    self.count('futile_moves')
+                    return None
+                maximizing = self.board.turn
+                window = (alpha, alpha + self.NULL_WINDOW) if maximizing else (beta - self.NULL_WINDOW, beta)
+                reduced_eval = self.create_a_branch_and_calculate_its_evaluation(
+                    move, depth - 1 - self.LATE_MOVE_REDUCTION, *window, ply)
+                if reduced_eval <= alpha if maximizing else reduced_eval >= beta:
+                    self.count('late_move_reductions')
+                    return reduced_eval
+                self.count('late_move_researches')
+        if self.USE_PRINCIPAL_VARIATION_SEARCH and move_number and beta - alpha > self.NULL_WINDOW:
+            maximizing = self.board.turn
+            bound = alpha if maximizing else beta  # the evaluation of the best move so far
+            if abs(bound) != float('inf'):
+                window = (bound, bound + self.NULL_WINDOW) if maximizing else (bound - self.NULL_WINDOW, bound)
+                null_window_eval = self.create_a_branch_and_calculate_its_evaluation(move, depth - 1, *window, ply)
+                if null_window_eval <= bound if maximizing else null_window_eval >= bound:
+                    return null_window_eval
+                self.count('principal_variation_researches')
+        return self.create_a_branch_and_calculate_its_evaluation(move, depth - 1, alpha, beta, ply)
+
+    def search_moves(self, depth: int, alpha, beta, ply: int, null_move_allowed=True):
+        # Returns the evaluation of the node. The move which improved it, if any, is kept as the best move of its ply.
+        pruned_eval = self.forward_pruning_eval(depth, alpha, beta, ply, null_move_allowed)
+        if pruned_eval is not None:
+            return pruned_eval
+        node, child = self.plies[ply], self.plies[ply + 1]
+        futile = self.is_futile(depth, alpha, beta, ply)
+        reduce_late_moves = self.USE_LATE_MOVE_REDUCTIONS and node.in_check is False and \
+            depth >= self.LATE_MOVE_REDUCTION_MIN_DEPTH
+        maximizing = self.board.turn
+        has_moves = False
+        for move_number, move in enumerate(self.get_moves_to_be_considered(depth, node.hash_move, ply)):
+            has_moves = True
+            move_eval = self.evaluate_move(move, move_number, depth, alpha, beta, ply, futile, reduce_late_moves)
+            if move_eval is None:
+                continue
+            if move_eval > alpha if maximizing else move_eval < beta:
+                if maximizing:
+                    alpha = move_eval
+                else:
+                    beta = move_eval
+                node.best_move = move
+                # The child searched last is the one of this move
+                node.principal_variation.clear()
+                node.principal_variation.append(move)
+                node.principal_variation += child.principal_variation
+                if beta <= alpha:
+                    self.record_cutoff(move, move_number, depth)
+                    return move_eval
+        if not has_moves:
+            return self.terminal_evaluation(evaluation_without_legal_moves(self.board))
+        return alpha if maximizing else beta
 
 
 class Engine:
@@ -77,38 +468,216 @@ class Engine:
     MAX_DEPTH = 5
     LAST_EVAL = None
     USE_OPENING_BOOKS = False
+    RANDOM_BOOK_MOVES = False  # A book move chosen at random by weight, instead of the one with the highest weight
+    USE_TRANSPOSITION_TABLE = True
+    TRANSPOSITION_TABLE_SIZE_MB = 64
+    USE_EVALUATION_CACHE = True
+    EVALUATION_CACHE_SIZE_MB = 4
+    USE_INCREMENTAL_EVALUATION = True
+    USE_MOVE_ORDERING = True
+    USE_SEARCH_BOARD = True  # The search makes its moves on a SearchBoard, converted from the board at the root
+    MOVE_TIME = None  # In seconds. When set, the search deepens one ply at a time until the time is over
+    ITERATIVE_DEEPENING_MAX_DEPTH = 30
+    LAST_DEPTH = None
+    LAST_NODES = None
+    LAST_QUIESCENCE_NODES = None
+    LAST_STATISTICS = None  # SearchStatistics of the last suggest_move
+    LAST_PRINCIPAL_VARIATION = None  # The line the last search expects, its best move first
+    # The root is searched with a window around the expected evaluation: LAST_EVAL, or the evaluation of the previous
+    # depth. Falling outside it, the window is widened on that side by the next step of the schedule, in pawns
+    # either side, and after the last step it is unbounded.
+    USE_ASPIRATION_WINDOWS = True
+    ASPIRATION_WINDOWS = (0.5, 1.5, 4)
+    SEARCH_WORKERS = 1  # More than one searches in that many processes sharing a transposition table
 
     def __init__(self, opening_book_white=None, opening_book_black=None):
         self.opening_book_white = opening_book_white
         self.opening_book_black = opening_book_black
+        # Kept between suggest_move calls, so the positions from the previous search are not searched again
+        self.transposition_table = TranspositionTable(self.TRANSPOSITION_TABLE_SIZE_MB) \
+            if self.USE_TRANSPOSITION_TABLE else None
+        # Static evaluations of the searched positions, kept between suggest_move calls as well. Created by the first
+        # search that uses it, so the settings applied after __init__, e.g. by the game service, decide its size
+        self.evaluation_cache = None
+        self.parallel_search = None
 
     def read_opening_book(self, board: chess.Board):
         if board.turn and self.opening_book_white:
-            return self.opening_book_white.get(board)
+            opening_book = self.opening_book_white
         elif self.opening_book_black:
-            return self.opening_book_black.get(board)
+            opening_book = self.opening_book_black
         else:
             return None
+        if not self.RANDOM_BOOK_MOVES:
+            return opening_book.get(board)
+        try:
+            return opening_book.choice(board)
+        except IndexError:
+            return None
 
     def suggest_move(self, board: chess.Board):
+        statistics = self.LAST_STATISTICS = SearchStatistics()
         if self.USE_OPENING_BOOKS:
-            book_move = self.read_opening_book(board)
+            with statistics.timed_phase('book'):
+                book_move = self.read_opening_book(board)
             if book_move:
+                statistics.book_hits += 1
+                self.LAST_DEPTH, self.LAST_NODES, self.LAST_QUIESCENCE_NODES = 0, 0, 0
                 return book_move.move
 
-        evaluator = self.create_evaluator(board)
-        evaluator.min_max()
+        if self.SEARCH_WORKERS > 1:
+            return self.suggest_move_in_parallel(board, statistics)
+        if self.transposition_table is not None:
+            self.transposition_table.new_search()
+        if self.MOVE_TIME:
+            return self.suggest_move_in_time(board, self.MOVE_TIME, statistics)
+
+        with statistics.timed_phase(f'depth {self.MAX_DEPTH}'):
+            evaluator, best_move_eval = self.search_root(board, self.MAX_DEPTH, self.LAST_EVAL, statistics=statistics,
+                                                         move_orderer=self.create_move_orderer())
+        self.LAST_PRINCIPAL_VARIATION = evaluator.principal_variation
+        self.LAST_DEPTH = self.MAX_DEPTH
+        self.LAST_NODES = statistics.nodes
+        self.LAST_QUIESCENCE_NODES = statistics.quiescence_nodes
         if self.USE_LAST_EVAL:
-            self.LAST_EVAL = evaluator.alpha if board.turn else evaluator.beta
+            self.LAST_EVAL = best_move_eval
         return evaluator.best_move
 
-    def create_evaluator(self, board: chess.Board):
-        evaluator = MinMaxEvaluator(best_move=None,
-                                    alpha=float('-inf'),
-                                    beta=float('inf'),
-                                    depth=self.MAX_DEPTH,
-                                    board=board)
+    def suggest_move_in_time(self, board: chess.Board, move_time: float, statistics: SearchStatistics | None = None):
+        deadline = SearchDeadline(move_time)
+        transposition_table = self.transposition_table or TranspositionTable(self.TRANSPOSITION_TABLE_SIZE_MB)
+        statistics = statistics or SearchStatistics()
+        best_move, best_move_eval = None, None
+        for depth, best_move, best_move_eval in self.iterate_depths(board, deadline, transposition_table, statistics,
+                                                                    self.create_move_orderer()):
+            self.LAST_DEPTH = depth
+        self.LAST_NODES = statistics.nodes
+        self.LAST_QUIESCENCE_NODES = statistics.quiescence_nodes
+
+        if self.USE_LAST_EVAL:
+            self.LAST_EVAL = best_move_eval
+        return best_move
+
+    def iterate_depths(self, board: chess.Board, deadline: SearchDeadline, transposition_table: TranspositionTable,
+                       statistics: SearchStatistics | None = None, move_orderer: MoveOrderer | None = None,
+                       first_depth=1, max_depth=None):
+        # Iterative deepening. Each iteration starts from the best line of the previous one, which the
+        # transposition table returns as hash moves. Yields depth, best move and evaluation of every completed depth.
+        max_depth = max_depth or self.ITERATIVE_DEEPENING_MAX_DEPTH
+        expected_eval = self.LAST_EVAL
+        evaluator = self.create_evaluator(board, first_depth, None, transposition_table, statistics, move_orderer)
+        for depth in range(first_depth, max_depth + 1):
+            try:
+                with timed_phase(statistics, f'depth {depth}'):
+                    # The first depth is always completed, so there is a move to play however short the time is
+                    evaluator, best_move_eval = self.search_root(board, depth, expected_eval,
+                                                                 deadline if depth > first_depth else None,
+                                                                 evaluator=evaluator)
+            except SearchTimeout:
+                return
+            self.LAST_PRINCIPAL_VARIATION = evaluator.principal_variation
+            expected_eval = best_move_eval
+            yield depth, evaluator.best_move, best_move_eval
+            if deadline.expired or abs(best_move_eval) >= 1000:  # out of time or a forced result is found
+                return
+
+    def suggest_move_in_parallel(self, board: chess.Board, statistics: SearchStatistics | None = None):
+        if self.parallel_search is None:
+            self.parallel_search = LazySMPSearch(self.SEARCH_WORKERS, self.TRANSPOSITION_TABLE_SIZE_MB)
+        settings = self.search_settings()
+        max_depth = self.ITERATIVE_DEEPENING_MAX_DEPTH if self.MOVE_TIME else self.MAX_DEPTH
+        with timed_phase(statistics, 'parallel search'):
+            best_move, best_move_eval, self.LAST_DEPTH, self.LAST_NODES, self.LAST_QUIESCENCE_NODES, \
+                self.LAST_PRINCIPAL_VARIATION = self.parallel_search.search(board, max_depth, self.MOVE_TIME, settings)
+        if statistics:
+            statistics.nodes = self.LAST_NODES
+            statistics.quiescence_nodes = self.LAST_QUIESCENCE_NODES
         if self.USE_LAST_EVAL:
+            self.LAST_EVAL = best_move_eval
+        return best_move
+
+    def search_root(self, board: chess.Board, depth: int, expected_eval: float | None = None,
+                    deadline: SearchDeadline | None = None, transposition_table: TranspositionTable | None = None,
+                    statistics: SearchStatistics | None = None, move_orderer: MoveOrderer | None = None,
+                    evaluator: MinMaxEvaluator | None = None):
+        # Returns the root evaluator, with the best move and the principal variation, and the evaluation. A given
+        # evaluator of the board searches again, with its transposition table, statistics and move orderer.
+        evaluator = evaluator or self.create_evaluator(board, depth, deadline, transposition_table, statistics,
+                                                       move_orderer)
+        evaluator.depth, evaluator.deadline, evaluator.best_move = depth, deadline, None
+        windows = self.ASPIRATION_WINDOWS if self.USE_ASPIRATION_WINDOWS and expected_eval is not None and \
+            abs(expected_eval) < 1000 else ()
+        lower_step = upper_step = 0
+        while True:
+            alpha = expected_eval - windows[lower_step] if lower_step < len(windows) else float('-inf')
+            beta = expected_eval + windows[upper_step] if upper_step < len(windows) else float('inf')
+            evaluator.alpha, evaluator.beta = alpha, beta
+            best_move_eval = evaluator.min_max()
+            # The search fails hard, outside the window only the bound is known
+            if alpha != float('-inf') and best_move_eval <= alpha:
+                lower_step += 1
+            elif beta != float('inf') and best_move_eval >= beta:
+                upper_step += 1
+            else:
+                return evaluator, best_move_eval
+            if statistics:
+                statistics.aspiration_researches += 1
+
+    def search_settings(self):
+        # The switches of the engine and of the search and the evaluation weights, which the lazy SMP workers apply
+        # so they search the same tree as this engine. The statistics of the last search and the number of workers
+        # are this engine's own.
+        return {'engine': {name: getattr(self, name) for name in dir(Engine) if name.isupper() and name not in
+                           ('SEARCH_WORKERS', 'LAST_DEPTH', 'LAST_NODES', 'LAST_QUIESCENCE_NODES', 'LAST_STATISTICS',
+                            'LAST_PRINCIPAL_VARIATION')},
+                'evaluator': {name: getattr(MinMaxEvaluator, name) for name in dir(MinMaxEvaluator) if name.isupper()},
+                'position_evaluator': {'USE_BITBOARD_EVALUATION': PositionEvaluator.USE_BITBOARD_EVALUATION},
+                'weights': current_weights()}
+
+    def apply_search_settings(self, settings):
+        # The evaluator settings and the weights are shared by all the engines of the process
+        for name, value in settings.get('engine', {}).items():
+            setattr(self, name, value)
+        for name, value in settings.get('evaluator', {}).items():
+            setattr(MinMaxEvaluator, name, value)
+        for name, value in settings.get('position_evaluator', {}).items():
+            setattr(PositionEvaluator, name, value)
+        set_weights(settings.get('weights', {}))
+
+    def create_move_orderer(self):
+        # Killer moves and history are kept for the search of one move only
+        return MoveOrderer() if self.USE_MOVE_ORDERING else None
+
+    def close(self):
+        if self.parallel_search is not None:
+            self.parallel_search.close()
+            self.parallel_search = None
+
+    def create_evaluator(self, board: chess.Board, depth=None, deadline: SearchDeadline | None = None,
+                         transposition_table: TranspositionTable | None = None,
+                         statistics: SearchStatistics | None = None, move_orderer: MoveOrderer | None = None,
+                         alpha=float('-inf'), beta=float('inf')):
+        search_board = SearchBoard.from_board(board) if self.USE_SEARCH_BOARD and not board.chess960 else board
+        if self.USE_EVALUATION_CACHE:
+            if self.evaluation_cache is None:
+                self.evaluation_cache = EvaluationCache(self.EVALUATION_CACHE_SIZE_MB)
+            self.evaluation_cache.check_weights()  # compiles the tables again if the weights changed
+        else:
+            recompile_if_weights_changed()
+        evaluator = MinMaxEvaluator(best_move=None,
+                                    alpha=alpha,
+                                    beta=beta,
+                                    depth=depth if depth is not None else self.MAX_DEPTH,
+                                    board=search_board,
+                                    transposition_table=transposition_table or self.transposition_table,
+                                    deadline=deadline,
+                                    incremental_evaluator=IncrementalEvaluator(search_board)
+                                    if self.USE_INCREMENTAL_EVALUATION else None,
+                                    statistics=statistics,
+                                    move_orderer=move_orderer,
+                                    repetition_history=RepetitionHistory(board),
+                                    evaluation_cache=self.evaluation_cache if self.USE_EVALUATION_CACHE else None)
+        if self.USE_LAST_EVAL and MinMaxEvaluator.INTUITION_SPREAD == MinMaxEvaluator.DEFAULT_INTUITION_SPREAD:
             if self.LAST_EVAL and self.LAST_EVAL not in range(-5, 5):
                 evaluator.INTUITION_SPREAD = 5 + abs(self.LAST_EVAL) // 2
             else:
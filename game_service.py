@@ -0,0 +1,270 @@
+import argparse
+import asyncio
+import collections
+import itertools
+import json
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import chess
+
+from engine import Engine
+from OpeningBooks.opening_books import load_opening_books
+from Search.search_deadline import SearchDeadline
+from Search.search_statistics import SearchStatistics
+from Search.transposition_table import TranspositionTable
+
+# A service hosting many concurrent games, e.g. humans playing the engine: python game_service.py --port 8765
+# Clients send one JSON request per line over TCP or a unix socket and get one JSON response per line, with the "id"
+# of the request, so several requests can be in flight on one connection:
+#   {"id": 1, "command": "new_game", "fen": "...", "moves": ["e2e4"], "settings": {"MAX_DEPTH": 4}}
+#   {"id": 2, "command": "push_move", "game_id": 1, "move": "e7e5"}
+#   {"id": 3, "command": "suggest_move", "game_id": 1, "deadline": 1.5, "play": true}
+#   {"id": 4, "command": "end_game", "game_id": 1}
+#   {"id": 5, "command": "status"}
+# Every game has its own state: the board, the last evaluation, whether it is still in the opening book, and in its
+# worker process an engine with its own transposition table. The searches run in a bounded set of worker processes.
+# A game always searches in the same worker, so its transposition table is found again on its next move.
+# A search has to be answered before its deadline, which includes the time it waits in the queue.
+DEFAULT_DEADLINE_SECONDS = 2.0
+DEADLINE_GRACE_SECONDS = 0.5  # the first depth is always completed, so a search can end a bit after its deadline
+MAX_QUEUED_SEARCHES = 1000
+GAME_TRANSPOSITION_TABLE_SIZE_MB = 2
+GAME_EVALUATION_CACHE_SIZE_MB = 0.25  # allocated by the first search of the game that stores an evaluation
+MAX_GAMES_PER_WORKER = 256  # engines of the least recently searched games are dropped beyond it
+
+SearchResult = collections.namedtuple('SearchResult', ['move', 'eval', 'depth', 'nodes'])
+
+_worker_engines = collections.OrderedDict()  # game id -> Engine, in a worker process
+
+
+class ServiceBusy(Exception):
+    pass
+
+
+def validate_settings(settings):
+    for name in settings:
+        if not name.isupper() or not hasattr(Engine, name):
+            raise ValueError(f'Unknown engine setting {name}')
+    return settings
+
+
+def _game_engine(game_id: int, settings):
+    engine = _worker_engines.pop(game_id, None)
+    if engine is None:
+        engine = Engine()
+        for name, value in settings.items():
+            setattr(engine, name, value)
+        engine.transposition_table = TranspositionTable(GAME_TRANSPOSITION_TABLE_SIZE_MB)
+        engine.EVALUATION_CACHE_SIZE_MB = GAME_EVALUATION_CACHE_SIZE_MB
+    _worker_engines[game_id] = engine
+    while len(_worker_engines) > MAX_GAMES_PER_WORKER:
+        _worker_engines.popitem(last=False)
+    return engine
+
+
+def search_game_position(game_id: int, root_fen: str, moves, last_eval, ends_at: float, settings):
+    # Runs in a worker process. ends_at is wall clock time, the same in every process.
+    board = chess.Board(root_fen)
+    for move in moves:
+        board.push_uci(move)
+    engine = _game_engine(game_id, settings)
+    engine.LAST_EVAL = last_eval  # the service keeps it, the engine may have been dropped since the last move
+    engine.transposition_table.new_search()
+    statistics = SearchStatistics()
+    deadline = SearchDeadline(max(0.0, ends_at - time.time()))
+    max_depth = engine.ITERATIVE_DEEPENING_MAX_DEPTH if engine.MOVE_TIME else engine.MAX_DEPTH
+    depth, best_move, best_move_eval = 0, None, None
+    for depth, best_move, best_move_eval in engine.iterate_depths(board, deadline, engine.transposition_table,
+                                                                  statistics, engine.create_move_orderer(),
+                                                                  max_depth=max_depth):
+        pass
+    return SearchResult(best_move.uci() if best_move else None, best_move_eval, depth,
+                        statistics.nodes + statistics.quiescence_nodes)
+
+
+def forget_game(game_id: int):
+    _worker_engines.pop(game_id, None)
+
+
+class GameState:
+    def __init__(self, game_id: int, board: chess.Board, settings, worker_index: int):
+        self.game_id = game_id
+        self.board = board
+        self.settings = settings
+        self.worker_index = worker_index
+        self.last_eval = None
+        self.in_book = True  # the book is not probed again once a position is not in it
+        self.search_lock = asyncio.Lock()  # one search at a time per game
+
+
+class GameService:
+    def __init__(self, workers: int = multiprocessing.cpu_count(), max_queued_searches: int = MAX_QUEUED_SEARCHES,
+                 opening_book_white=None, opening_book_black=None):
+        # One single process executor per worker, so a game can be sent to the same worker every time
+        self.executors = [ProcessPoolExecutor(max_workers=1) for _ in range(workers)]
+        self.games_per_worker = [0] * workers
+        self.max_queued_searches = max_queued_searches
+        self.queued_searches = 0  # waiting or running
+        self.opening_books = {chess.WHITE: opening_book_white, chess.BLACK: opening_book_black}
+        self.games = {}
+        self.game_ids = itertools.count(1)
+
+    def new_game(self, fen: str = chess.STARTING_FEN, moves=(), settings=None):
+        board = chess.Board(fen)
+        for move in moves:
+            board.push_uci(move)
+        worker_index = self.games_per_worker.index(min(self.games_per_worker))
+        game = GameState(next(self.game_ids), board, validate_settings(settings or {}), worker_index)
+        self.games[game.game_id] = game
+        self.games_per_worker[worker_index] += 1
+        return game
+
+    def get_game(self, game_id: int):
+        try:
+            return self.games[game_id]
+        except KeyError:
+            raise KeyError(f'Unknown game {game_id}') from None
+
+    async def push_move(self, game_id: int, move: str):
+        # After the search of the game, if one is running, which may play its move
+        game = self.get_game(game_id)
+        move = chess.Move.from_uci(move)
+        async with game.search_lock:
+            if not game.board.is_legal(move):
+                raise ValueError(f'Illegal move {move.uci()}')
+            game.board.push(move)
+        return game
+
+    def end_game(self, game_id: int):
+        game = self.games.pop(game_id, None)
+        if game is not None:
+            self.games_per_worker[game.worker_index] -= 1
+            self.executors[game.worker_index].submit(forget_game, game_id)
+
+    def read_opening_book(self, game: GameState):
+        opening_book = self.opening_books[game.board.turn]
+        if not game.in_book or opening_book is None:
+            return None
+        book_entry = opening_book.get(game.board)
+        game.in_book = book_entry is not None
+        return book_entry
+
+    async def suggest_move(self, game_id: int, deadline: float = DEFAULT_DEADLINE_SECONDS, play: bool = True):
+        game = self.get_game(game_id)
+        ends_at = time.time() + deadline
+        if self.queued_searches >= self.max_queued_searches:
+            raise ServiceBusy(f'{self.queued_searches} searches are queued')
+        self.queued_searches += 1
+        try:
+            async with game.search_lock:
+                book_entry = self.read_opening_book(game)
+                if book_entry is not None:
+                    result = SearchResult(book_entry.move.uci(), game.last_eval, 0, 0)
+                else:
+                    board = game.board
+                    search = asyncio.get_running_loop().run_in_executor(
+                        self.executors[game.worker_index], search_game_position, game.game_id, board.root().fen(),
+                        [move.uci() for move in board.move_stack], game.last_eval, ends_at, game.settings)
+                    # A search still waiting in the queue at its deadline is cancelled
+                    result = await asyncio.wait_for(search, max(0.0, ends_at - time.time()) + DEADLINE_GRACE_SECONDS)
+                    game.last_eval = result.eval
+                if play and result.move is not None:
+                    game.board.push_uci(result.move)
+                return result
+        finally:
+            self.queued_searches -= 1
+
+    async def handle_request(self, request):
+        command = request.get('command')
+        if command == 'new_game':
+            game = self.new_game(request.get('fen', chess.STARTING_FEN), request.get('moves', []),
+                                 request.get('settings'))
+            return {'game_id': game.game_id, 'fen': game.board.fen()}
+        if command == 'push_move':
+            game = await self.push_move(request['game_id'], request['move'])
+            return {'fen': game.board.fen()}
+        if command == 'suggest_move':
+            result = await self.suggest_move(request['game_id'], request.get('deadline', DEFAULT_DEADLINE_SECONDS),
+                                             request.get('play', True))
+            return {'move': result.move, 'eval': result.eval, 'depth': result.depth, 'nodes': result.nodes,
+                    'fen': self.get_game(request['game_id']).board.fen()}
+        if command == 'end_game':
+            self.end_game(request['game_id'])
+            return {}
+        if command == 'status':
+            return {'games': len(self.games), 'queued_searches': self.queued_searches,
+                    'games_per_worker': self.games_per_worker}
+        raise ValueError(f'Unknown command {command}')
+
+    async def respond(self, line: bytes, writer: asyncio.StreamWriter):
+        request_id = None
+        try:
+            request = json.loads(line)
+            request_id = request.get('id')
+            response = await self.handle_request(request)
+        except asyncio.TimeoutError:
+            response = {'error': 'The search missed its deadline'}
+        except (ServiceBusy, KeyError, ValueError) as error:
+            response = {'error': str(error).strip("'")}
+        except Exception as error:
+            # e.g. a request which is not a JSON object, or fields of the wrong type. The connection goes on.
+            response = {'error': f'Invalid request: {type(error).__name__}: {error}'}
+        response['id'] = request_id
+        writer.write(json.dumps(response).encode() + b'\n')
+        await writer.drain()
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        requests = set()
+        try:
+            while line := await reader.readline():
+                if line.strip():
+                    request = asyncio.create_task(self.respond(line, writer))
+                    requests.add(request)
+                    request.add_done_callback(requests.discard)
+            if requests:
+                await asyncio.wait(requests)
+        finally:
+            writer.close()
+
+    def close(self):
+        for executor in self.executors:
+            executor.shutdown(cancel_futures=True)
+
+
+async def start_server(service: GameService, host='127.0.0.1', port=8765, unix_socket=None):
+    if unix_socket:
+        return await asyncio.start_unix_server(service.handle_connection, unix_socket)
+    return await asyncio.start_server(service.handle_connection, host, port)
+
+
+async def serve(service: GameService, host='127.0.0.1', port=8765, unix_socket=None):
+    server = await start_server(service, host, port, unix_socket)
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serves many concurrent games over TCP or a unix socket.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--unix-socket', help='listens on this unix socket instead of TCP')
+    parser.add_argument('--workers', type=int, default=multiprocessing.cpu_count(), help='search processes')
+    parser.add_argument('--max-queued-searches', type=int, default=MAX_QUEUED_SEARCHES,
+                        help='searches waiting or running, beyond which new ones are refused')
+    parser.add_argument('--opening-books', nargs=2, metavar=('WHITE_BOOK', 'BLACK_BOOK'))
+    arguments = parser.parse_args()
+
+    opening_books = [None, None]
+    if arguments.opening_books:
+        opening_books = load_opening_books(*arguments.opening_books)
+    service = GameService(arguments.workers, arguments.max_queued_searches, *opening_books)
+    try:
+        asyncio.run(serve(service, arguments.host, arguments.port, arguments.unix_socket))
+    finally:
+        service.close()
+
+
+if __name__ == '__main__':
+    main()
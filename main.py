@@ -1,22 +1,22 @@
 import time
 
 from engine import Engine
+from OpeningBooks.opening_books import load_opening_books
 import chess
 import chess.pgn
-from chess.polyglot import MemoryMappedReader
 
 def play_a_game():
     board = chess.Board()
     time_lst = []
     prev_move_played_at = time.time()
-    opening_book_white = MemoryMappedReader('data/openings/white_repertoire.bin')
-    opening_book_black = MemoryMappedReader('data/openings/black_repertoire.bin')
-    engine_human = Engine(opening_book_white, opening_book_black)
+    engine_human = Engine()
+    if engine_human.USE_OPENING_BOOKS:
+        engine_human = Engine(*load_opening_books())
     while not board.is_game_over():
         move = engine_human.suggest_move(board)
+        # Only the new move is printed, rebuilding the whole game after every move gets slower as the game goes on
+        print(f'{board.fullmove_number}{"." if board.turn else "..."} {board.san(move)}')
         board.push(move)
-        game = chess.pgn.Game.from_board(board)
-        print(game)
         move_duration = time.time() - prev_move_played_at
         time_lst.append(move_duration)
         print(move_duration)
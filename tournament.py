@@ -0,0 +1,231 @@
+import argparse
+import copy
+import json
+import math
+import multiprocessing
+import random
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+
+import chess
+import chess.pgn
+
+import definitions_and_factor_weights
+from engine import Engine, MinMaxEvaluator
+from OpeningBooks.opening_books import load_opening_books
+from PositionEvaluation.piece_square_tables import recompile_if_weights_changed
+from Search.transposition_table import TranspositionTable
+
+# A configuration is a dict with a unique 'name' and optionally:
+#   'engine': Engine attributes, e.g. {"MAX_DEPTH": 4, "MOVE_TIME": 0.5}
+#   'search': MinMaxEvaluator attributes, e.g. {"INTUITION_SPREAD": 8}
+#   'weights': dicts from definitions_and_factor_weights.py to update, e.g. {"positional_values_dict": {...}}
+#   'opening_books': [white book path, black book path], which also turns the opening books on
+GameJob = namedtuple('GameJob', ['game_index', 'white', 'black', 'opening_fen', 'opening_moves', 'max_plies'])
+GameResult = namedtuple('GameResult', ['game_index', 'white', 'black', 'result', 'pgn', 'move_times', 'move_nodes'])
+
+
+def load_configurations(path):
+    with open(path) as file:
+        configurations = json.load(file)
+    names = [configuration['name'] for configuration in configurations]
+    if len(set(names)) != len(names):
+        raise ValueError('Engine configuration names must be unique')
+    return configurations
+
+
+def _update_weights(weights, new_values):
+    if isinstance(weights, list):
+        weights[:] = new_values
+        return
+    for key, value in new_values.items():
+        # JSON keys are strings, while piece types and ranks are int keys
+        weights[int(key) if isinstance(key, str) and key.isdigit() else key] = value
+
+
+@contextmanager
+def applied_search_configuration(configuration):
+    # MinMaxEvaluator settings and the evaluation weights are shared by all the engines in a process,
+    # so they are switched in before the configured engine moves and restored afterwards
+    search_settings = configuration.get('search', {})
+    weights = configuration.get('weights', {})
+    saved_search_settings = {name: getattr(MinMaxEvaluator, name) for name in search_settings}
+    saved_weights = {name: copy.deepcopy(getattr(definitions_and_factor_weights, name)) for name in weights}
+    for name, value in search_settings.items():
+        setattr(MinMaxEvaluator, name, value)
+    for name, new_values in weights.items():
+        _update_weights(getattr(definitions_and_factor_weights, name), new_values)
+    recompile_if_weights_changed()
+    try:
+        yield
+    finally:
+        for name, value in saved_search_settings.items():
+            setattr(MinMaxEvaluator, name, value)
+        for name, old_values in saved_weights.items():
+            _update_weights(getattr(definitions_and_factor_weights, name), old_values)
+        recompile_if_weights_changed()
+
+
+def create_engine(configuration):
+    opening_books = configuration.get('opening_books')
+    if opening_books:
+        engine = Engine(*load_opening_books(*opening_books))
+    else:
+        engine = Engine()
+    engine.USE_OPENING_BOOKS = bool(opening_books)
+    for name, value in configuration.get('engine', {}).items():
+        setattr(engine, name, value)
+    engine.transposition_table = TranspositionTable(engine.TRANSPOSITION_TABLE_SIZE_MB) \
+        if engine.USE_TRANSPOSITION_TABLE else None
+    return engine
+
+
+def play_game(job: GameJob):
+    board = chess.Board(job.opening_fen)
+    for move in job.opening_moves:
+        board.push_uci(move)
+    configurations = {chess.WHITE: job.white, chess.BLACK: job.black}
+    engines = {color: create_engine(configuration) for color, configuration in configurations.items()}
+    move_times = {configuration['name']: [] for configuration in configurations.values()}
+    move_nodes = {configuration['name']: [] for configuration in configurations.values()}
+    try:
+        while not board.is_game_over() and board.ply() < job.max_plies:
+            configuration = configurations[board.turn]
+            with applied_search_configuration(configuration):
+                started_at = time.perf_counter()
+                move = engines[board.turn].suggest_move(board)
+                move_times[configuration['name']].append(time.perf_counter() - started_at)
+            engine = engines[board.turn]
+            move_nodes[configuration['name']].append((engine.LAST_NODES or 0) + (engine.LAST_QUIESCENCE_NODES or 0))
+            board.push(move)
+    finally:
+        for engine in engines.values():
+            engine.close()
+
+    result = board.result() if board.is_game_over() else '1/2-1/2'  # adjudicated as a draw after max_plies
+    game = chess.pgn.Game.from_board(board)
+    game.headers['Event'] = 'Engine tournament'
+    game.headers['Round'] = str(job.game_index + 1)
+    game.headers['White'] = job.white['name']
+    game.headers['Black'] = job.black['name']
+    game.headers['Result'] = result
+    return GameResult(job.game_index, job.white['name'], job.black['name'], result, str(game), move_times, move_nodes)
+
+
+def random_opening(randomizer: random.Random, plies: int):
+    board = chess.Board()
+    for _ in range(plies):
+        moves = list(board.legal_moves)
+        if not moves:
+            break
+        board.push(randomizer.choice(moves))
+    return chess.STARTING_FEN, [move.uci() for move in board.move_stack]
+
+
+def read_openings(path):
+    # One EPD or FEN per line
+    openings = []
+    with open(path) as file:
+        for line in file:
+            if line.strip():
+                board, _ = chess.Board.from_epd(line.strip())
+                openings.append((board.fen(), []))
+    return openings
+
+
+def schedule_games(configurations, games_per_pair: int, openings, max_plies: int):
+    # Round robin. Every opening is played twice by each pair, once with each color.
+    jobs = []
+    for first_index, first in enumerate(configurations):
+        for second in configurations[first_index + 1:]:
+            for game_number in range(games_per_pair):
+                opening_fen, opening_moves = openings[(game_number // 2) % len(openings)]
+                white, black = (first, second) if game_number % 2 == 0 else (second, first)
+                jobs.append(GameJob(len(jobs), white, black, opening_fen, opening_moves, max_plies))
+    return jobs
+
+
+def percentile(values, percent):
+    if not values:
+        return 0.0
+    ordered_values = sorted(values)
+    return ordered_values[max(0, math.ceil(percent / 100 * len(ordered_values)) - 1)]
+
+
+class TournamentReport:
+    def __init__(self, names):
+        self.names = names
+        self.scores = {name: [0, 0, 0] for name in names}  # wins, draws, losses
+        self.move_times = {name: [] for name in names}
+        self.nodes = {name: 0 for name in names}
+        self.games = 0
+
+    def add_game(self, game_result: GameResult):
+        self.games += 1
+        white_score = {'1-0': 0, '1/2-1/2': 1, '0-1': 2}[game_result.result]
+        self.scores[game_result.white][white_score] += 1
+        self.scores[game_result.black][2 - white_score] += 1
+        for name, times in game_result.move_times.items():
+            self.move_times[name] += times
+        for name, nodes in game_result.move_nodes.items():
+            self.nodes[name] += sum(nodes)
+
+    def score(self, name):
+        wins, draws, losses = self.scores[name]
+        played = wins + draws + losses
+        return (wins + draws / 2) / played if played else 0.0
+
+    def summary(self):
+        lines = [f'{self.games} games']
+        for name in self.names:
+            wins, draws, losses = self.scores[name]
+            times = self.move_times[name]
+            search_time = sum(times)
+            nodes_per_second = self.nodes[name] / search_time if search_time else 0.0
+            lines.append(f'{name}: +{wins} ={draws} -{losses} score {self.score(name):.3f} | '
+                         f'move time p50 {percentile(times, 50):.3f}s p90 {percentile(times, 90):.3f}s '
+                         f'p99 {percentile(times, 99):.3f}s max {max(times, default=0.0):.3f}s | '
+                         f'{nodes_per_second:.0f} nodes/s')
+        return '\n'.join(lines)
+
+
+def run_tournament(configurations, games_per_pair: int, pgn_path: str, workers: int, openings, max_plies=300):
+    jobs = schedule_games(configurations, games_per_pair, openings, max_plies)
+    report = TournamentReport([configuration['name'] for configuration in configurations])
+    # Finished games are appended as they come, so an interrupted tournament keeps the games already played
+    with open(pgn_path, 'a') as pgn_file, multiprocessing.Pool(workers) as pool:
+        for game_result in pool.imap_unordered(play_game, jobs):
+            pgn_file.write(game_result.pgn + '\n\n')
+            pgn_file.flush()
+            report.add_game(game_result)
+            print(f'{report.games}/{len(jobs)} {game_result.white} - {game_result.black} {game_result.result}')
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Plays engine configurations against each other.')
+    parser.add_argument('configurations', help='JSON file with a list of engine configurations')
+    parser.add_argument('--games', type=int, default=2, help='games for every pair of configurations')
+    parser.add_argument('--workers', type=int, default=multiprocessing.cpu_count())
+    parser.add_argument('--pgn', default='tournament_pgn.txt', help='finished games are appended to this file')
+    parser.add_argument('--openings', help='EPD file with the starting positions')
+    parser.add_argument('--random-opening-plies', type=int, default=4,
+                        help='random opening moves, used when no openings file is given')
+    parser.add_argument('--max-plies', type=int, default=300, help='longer games are adjudicated as draws')
+    parser.add_argument('--seed', type=int, default=0)
+    arguments = parser.parse_args()
+
+    if arguments.openings:
+        openings = read_openings(arguments.openings)
+    else:
+        randomizer = random.Random(arguments.seed)
+        openings = [random_opening(randomizer, arguments.random_opening_plies)
+                    for _ in range(max(1, arguments.games // 2))]
+    report = run_tournament(load_configurations(arguments.configurations), arguments.games, arguments.pgn,
+                            arguments.workers, openings, arguments.max_plies)
+    print(report.summary())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,245 @@
+import sys
+import threading
+import time
+
+import chess
+
+from engine import Engine
+from OpeningBooks.opening_books import load_opening_books
+from Search.search_deadline import SearchDeadline
+from Search.search_statistics import SearchStatistics
+from Search.transposition_table import TranspositionTable, position_key
+
+# UCI front-end, so the engine can be run under chess GUIs and match managers: python uci.py
+# The search runs in a worker thread. stop and ponderhit reach it through its deadline, which the search checks on
+# every node, so the engine answers them within milliseconds.
+ENGINE_NAME = 'HumanLikeChessEngine'
+ENGINE_AUTHOR = 'HumanLikeChessEngine authors'
+DEFAULT_MOVES_TO_GO = 30
+MOVE_OVERHEAD_SECONDS = 0.05  # kept for the GUI to receive the move
+INTEGER_GO_OPTIONS = {'wtime', 'btime', 'winc', 'binc', 'movestogo', 'depth', 'movetime'}
+
+
+def allocate_move_time(time_left: float, increment: float = 0.0, moves_to_go: int | None = None):
+    # An equal share of the time left for the rest of the moves, plus most of the increment
+    move_time = time_left / (moves_to_go or DEFAULT_MOVES_TO_GO) + increment * 0.8
+    return max(0.01, min(move_time, time_left / 2) - MOVE_OVERHEAD_SECONDS)
+
+
+def uci_score(board: chess.Board, evaluation: float):
+    # The engine evaluates for white in pawns, UCI scores are for the side to move in centipawns or moves to mate
+    score = evaluation if board.turn else -evaluation
+    if abs(evaluation) >= 1000:
+        # The mate evaluation counts full moves of the game, so the mated position is one of two plies. The side to
+        # move mates after an odd number of plies and is mated after an even one, which tells them apart.
+        mated_at_ply = 2 * (2030 - int(abs(evaluation)))
+        mate_plies = mated_at_ply - len(board.move_stack)
+        if mate_plies % 2 != (score > 0):
+            mate_plies += 1
+        mate_moves = max(1, (mate_plies + 1) // 2)
+        return f'mate {mate_moves if score > 0 else -mate_moves}'
+    return f'cp {round(score * 100)}'
+
+
+class UCISearch:
+    # One go command, searched by iterative deepening until its limits, stop or the end of pondering
+    def __init__(self, board: chess.Board, max_depth: int | None, move_time: float | None, infinite: bool,
+                 ponder: bool):
+        self.board = board
+        self.max_depth = max_depth
+        self.move_time = move_time  # after the ponder hit, when pondering
+        self.infinite = infinite
+        self.pondering = ponder
+        self.stop_event = threading.Event()
+        self.ponder_hit_or_stop = threading.Event()
+        self.deadline = SearchDeadline(None if ponder or infinite else move_time, self.stop_event)
+        self.thread = None
+
+    def ponder_hit(self):
+        # The expected move was played. The search goes on, now against the clock.
+        self.pondering = False
+        if self.move_time is not None and not self.infinite:
+            self.deadline.ends_at = time.perf_counter() + self.move_time
+        self.ponder_hit_or_stop.set()
+
+    def stop(self):
+        self.stop_event.set()
+        self.ponder_hit_or_stop.set()
+
+
+class UCIProtocol:
+    def __init__(self, engine: Engine | None = None, output=None):
+        self.engine = engine or Engine()
+        if self.engine.transposition_table is None:
+            self.engine.transposition_table = TranspositionTable(self.engine.TRANSPOSITION_TABLE_SIZE_MB)
+        self.output = output or self._print
+        self.board = chess.Board()
+        self.search = None
+        self.output_lock = threading.Lock()
+
+    @staticmethod
+    def _print(line):
+        print(line, flush=True)
+
+    def send(self, line):
+        with self.output_lock:
+            self.output(line)
+
+    def handle(self, line: str):
+        # Returns False on quit
+        tokens = line.split()
+        if not tokens:
+            return True
+        command, arguments = tokens[0], tokens[1:]
+        if command == 'uci':
+            self.send(f'id name {ENGINE_NAME}')
+            self.send(f'id author {ENGINE_AUTHOR}')
+            self.send(f'option name Hash type spin default {self.engine.TRANSPOSITION_TABLE_SIZE_MB} min 1 max 4096')
+            self.send('option name Ponder type check default true')
+            self.send('option name OwnBook type check default false')
+            self.send('uciok')
+        elif command == 'isready':
+            self.send('readyok')
+        elif command == 'ucinewgame':
+            self.stop()
+            self.engine.transposition_table.clear()
+            self.engine.LAST_EVAL = None
+        elif command == 'setoption':
+            self.set_option(arguments)
+        elif command == 'position':
+            self.stop()
+            self.set_position(arguments)
+        elif command == 'go':
+            self.stop()
+            self.go(arguments)
+        elif command == 'stop':
+            self.stop()
+        elif command == 'ponderhit':
+            if self.search:
+                self.search.ponder_hit()
+        elif command == 'quit':
+            self.stop()
+            return False
+        return True
+
+    def set_option(self, arguments):
+        # setoption name <name> value <value>
+        if 'name' not in arguments:
+            return
+        value_index = arguments.index('value') if 'value' in arguments else len(arguments)
+        name = ' '.join(arguments[arguments.index('name') + 1:value_index]).lower()
+        value = ' '.join(arguments[value_index + 1:])
+        if name == 'hash':
+            self.engine.TRANSPOSITION_TABLE_SIZE_MB = int(value)
+            self.engine.transposition_table = TranspositionTable(self.engine.TRANSPOSITION_TABLE_SIZE_MB)
+        elif name == 'ownbook':
+            self.engine.USE_OPENING_BOOKS = value.lower() == 'true'
+            if self.engine.USE_OPENING_BOOKS and self.engine.opening_book_white is None:
+                self.engine.opening_book_white, self.engine.opening_book_black = load_opening_books()
+
+    def set_position(self, arguments):
+        # position startpos | fen <fen> [moves <move> ...]
+        moves_index = arguments.index('moves') if 'moves' in arguments else len(arguments)
+        if arguments and arguments[0] == 'fen':
+            board = chess.Board(' '.join(arguments[1:moves_index]))
+        else:
+            board = chess.Board()
+        for uci in arguments[moves_index + 1:]:
+            board.push_uci(uci)
+        self.board = board
+
+    def go(self, arguments):
+        options = {}
+        for index, token in enumerate(arguments):
+            if token in ('ponder', 'infinite'):
+                options[token] = True
+            elif token in INTEGER_GO_OPTIONS and index + 1 < len(arguments):
+                options[token] = int(arguments[index + 1])
+
+        move_time = None
+        if 'movetime' in options:
+            move_time = options['movetime'] / 1000
+        elif 'wtime' in options or 'btime' in options:
+            time_left, increment = ('wtime', 'winc') if self.board.turn else ('btime', 'binc')
+            move_time = allocate_move_time(options.get(time_left, 0) / 1000, options.get(increment, 0) / 1000,
+                                           options.get('movestogo'))
+        max_depth = options.get('depth')
+        if max_depth is None and move_time is None and 'infinite' not in options and 'ponder' not in options:
+            max_depth = self.engine.MAX_DEPTH
+
+        self.search = UCISearch(self.board.copy(), max_depth, move_time, 'infinite' in options, 'ponder' in options)
+        self.search.thread = threading.Thread(target=self.run_search, args=(self.search,), daemon=True)
+        self.search.thread.start()
+
+    def stop(self):
+        # Waits for the search to send its best move
+        if self.search:
+            self.search.stop()
+            self.search.thread.join()
+            self.search = None
+
+    def wait_for_search(self):
+        # An infinite or pondering search never ends by itself, so it is stopped
+        if self.search:
+            if self.search.infinite or self.search.pondering:
+                self.search.stop()
+            self.search.thread.join()
+
+    def run_search(self, search: UCISearch):
+        engine, board = self.engine, search.board
+        best_move, best_move_eval = None, None
+        if engine.USE_OPENING_BOOKS:
+            book_entry = engine.read_opening_book(board)
+            best_move = book_entry.move if book_entry else None
+        if best_move is None:
+            engine.transposition_table.new_search()
+            statistics = engine.LAST_STATISTICS = SearchStatistics()
+            started_at = time.perf_counter()
+            for depth, best_move, best_move_eval in engine.iterate_depths(
+                    board, search.deadline, engine.transposition_table, statistics, engine.create_move_orderer(),
+                    max_depth=search.max_depth):
+                seconds = time.perf_counter() - started_at
+                nodes = statistics.nodes + statistics.quiescence_nodes
+                if best_move is None:  # checkmated or stalemated, there is no move to show
+                    break
+                self.send(f'info depth {depth} score {uci_score(board, best_move_eval)} nodes {nodes} '
+                          f'nps {int(nodes / seconds) if seconds else 0} time {int(seconds * 1000)} '
+                          f'pv {" ".join(move.uci() for move in engine.LAST_PRINCIPAL_VARIATION or [best_move])}')
+            if best_move_eval is not None and engine.USE_LAST_EVAL:
+                engine.LAST_EVAL = best_move_eval
+        if best_move is None:  # no legal moves
+            best_move = chess.Move.null()
+
+        # While pondering or searching infinitely the best move is sent only after stop or ponderhit
+        while search.infinite or search.pondering:
+            search.ponder_hit_or_stop.wait()
+            if search.stop_event.is_set() or not search.infinite:
+                break
+        self.send(f'bestmove {best_move.uci()}' + self.ponder_move_text(board, best_move))
+
+    def ponder_move_text(self, board: chess.Board, best_move: chess.Move):
+        # The reply expected by the search, from its principal variation or else the transposition table
+        if not best_move:
+            return ''
+        principal_variation = self.engine.LAST_PRINCIPAL_VARIATION or []
+        board.push(best_move)
+        try:
+            if principal_variation[:1] == [best_move] and len(principal_variation) > 1:
+                ponder_move = principal_variation[1]
+            else:
+                ponder_move = self.engine.transposition_table.get_best_move(position_key(board))
+            return f' ponder {ponder_move.uci()}' if ponder_move and board.is_legal(ponder_move) else ''
+        finally:
+            board.pop()
+
+
+def main():
+    protocol = UCIProtocol()  # the books are loaded by the OwnBook option
+    for line in sys.stdin:
+        if not protocol.handle(line):
+            return
+    protocol.wait_for_search()  # the input has ended, e.g. commands piped from a file
+
+
+if __name__ == '__main__':
+    main()